@@ -0,0 +1,225 @@
+import os
+
+# Backend configuration, read once from environment variables at import time.
+# Create a `.env` file in `backend/` (or export the variables) to override the defaults.
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Directory for on-disk caches and archives (relative to the working directory unless absolute).
+DATA_DIR = os.getenv("VOCAHIRE_DATA_DIR", "data")
+
+# How the worker process pools (evaluation, PDF rendering, Whisper) start their processes. They are created on first
+# use, when the server already runs threads (log writer, codec and TTS pools); a forked child can inherit a lock one of
+# those threads held and deadlock, so the server process itself is never forked ("forkserver" or "spawn").
+PROCESS_START_METHOD = os.getenv("VOCAHIRE_PROCESS_START_METHOD", "forkserver" if os.name == "posix" else "spawn")
+
+# --- Logging ---
+# Records go through a bounded in-memory queue to a background thread, so logging never blocks
+# the event loop on stdout (records are dropped, and counted, if the queue is full).
+LOG_LEVEL = os.getenv("VOCAHIRE_LOG_LEVEL", "INFO").upper()
+# Per-module levels, e.g. "services.tts_service=DEBUG,main=WARNING" (names relative to backend.app).
+LOG_LEVELS = os.getenv("VOCAHIRE_LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("VOCAHIRE_LOG_FORMAT", "text") # "text" or "json" (one object per line)
+LOG_QUEUE_SIZE = _env_int("VOCAHIRE_LOG_QUEUE_SIZE", 10000)
+# High-frequency events (per audio chunk / TTS segment) are logged 1 in this many times (1 = all).
+LOG_SAMPLE_EVERY = _env_int("VOCAHIRE_LOG_SAMPLE_EVERY", 20)
+
+# --- Session storage ---
+# "memory" keeps sessions in the worker process (single worker only).
+# "redis" shares sessions between workers/nodes through a Redis-compatible server.
+SESSION_STORE_BACKEND = os.getenv("VOCAHIRE_SESSION_STORE", "memory")
+REDIS_URL = os.getenv("VOCAHIRE_REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = os.getenv("VOCAHIRE_REDIS_KEY_PREFIX", "vocahire:session:")
+
+# --- Interview (LLM) state ---
+# Per-session conversation state is kept in a bounded LRU/TTL registry.
+LLM_STATE_MAX_SESSIONS = _env_int("VOCAHIRE_LLM_STATE_MAX_SESSIONS", 1000)
+LLM_STATE_TTL_SECONDS = _env_float("VOCAHIRE_LLM_STATE_TTL_SECONDS", 2 * 60 * 60)
+INTERVIEW_PERSONA = os.getenv(
+    "VOCAHIRE_INTERVIEW_PERSONA",
+    "a friendly, professional interviewer conducting a general job interview",
+)
+# Rough token budget for one interview (prompts + responses). The interview is wrapped up once it is spent.
+INTERVIEW_TOKEN_BUDGET = _env_int("VOCAHIRE_INTERVIEW_TOKEN_BUDGET", 16000)
+# Prompt history window: older turns beyond this many tokens are folded into a rolling summary.
+LLM_HISTORY_TOKEN_BUDGET = _env_int("VOCAHIRE_LLM_HISTORY_TOKEN_BUDGET", 1500)
+LLM_HISTORY_MIN_TURNS = _env_int("VOCAHIRE_LLM_HISTORY_MIN_TURNS", 4)
+LLM_HISTORY_SUMMARY_TOKENS = _env_int("VOCAHIRE_LLM_HISTORY_SUMMARY_TOKENS", 300)
+
+# --- LLM provider ---
+# "simulated" (scripted interviewer, no API calls) or "gemini" (Gemini REST API, needs httpx and an API key).
+LLM_PROVIDER = os.getenv("VOCAHIRE_LLM_PROVIDER", "simulated")
+GEMINI_API_KEY = os.getenv("VOCAHIRE_GEMINI_API_KEY", os.getenv("GEMINI_API_KEY", ""))
+GEMINI_MODEL = os.getenv("VOCAHIRE_GEMINI_MODEL", "gemini-1.5-flash")
+# Point at backend/tools/mock_gemini_server.py (e.g. http://127.0.0.1:8001/v1beta) for local tests
+GEMINI_BASE_URL = os.getenv("VOCAHIRE_GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+LLM_MAX_OUTPUT_TOKENS = _env_int("VOCAHIRE_LLM_MAX_OUTPUT_TOKENS", 256)
+LLM_TEMPERATURE = _env_float("VOCAHIRE_LLM_TEMPERATURE", 0.7)
+# One pooled HTTP client per worker: connection limits and timeouts (the read timeout applies between streamed chunks)
+LLM_MAX_CONNECTIONS = _env_int("VOCAHIRE_LLM_MAX_CONNECTIONS", 32)
+LLM_MAX_KEEPALIVE_CONNECTIONS = _env_int("VOCAHIRE_LLM_MAX_KEEPALIVE_CONNECTIONS", 16)
+LLM_CONNECT_TIMEOUT_SECONDS = _env_float("VOCAHIRE_LLM_CONNECT_TIMEOUT_SECONDS", 5.0)
+LLM_READ_TIMEOUT_SECONDS = _env_float("VOCAHIRE_LLM_READ_TIMEOUT_SECONDS", 20.0)
+# Requests in flight per provider and worker; further requests wait for a slot.
+LLM_MAX_CONCURRENCY = _env_int("VOCAHIRE_LLM_MAX_CONCURRENCY", 16)
+# Failed requests (connection errors, timeouts, 429/5xx) are retried with full-jitter exponential backoff,
+# unless part of the response was already streamed.
+LLM_MAX_RETRIES = _env_int("VOCAHIRE_LLM_MAX_RETRIES", 3)
+LLM_RETRY_BASE_DELAY_SECONDS = _env_float("VOCAHIRE_LLM_RETRY_BASE_DELAY_SECONDS", 0.5)
+LLM_RETRY_MAX_DELAY_SECONDS = _env_float("VOCAHIRE_LLM_RETRY_MAX_DELAY_SECONDS", 8.0)
+
+# --- Audio input / voice activity detection ---
+# Incoming candidate audio is expected as 16-bit little-endian mono PCM at this rate.
+AUDIO_SAMPLE_RATE = _env_int("VOCAHIRE_AUDIO_SAMPLE_RATE", 16000)
+VAD_ENABLED = _env_bool("VOCAHIRE_VAD_ENABLED", True)
+VAD_FRAME_MS = _env_int("VOCAHIRE_VAD_FRAME_MS", 20)
+# Frames louder than this (dBFS) are speech candidates; the threshold adapts upwards to the noise floor.
+VAD_ENERGY_THRESHOLD_DB = _env_float("VOCAHIRE_VAD_ENERGY_THRESHOLD_DB", -45.0)
+VAD_NOISE_MARGIN_DB = _env_float("VOCAHIRE_VAD_NOISE_MARGIN_DB", 10.0)
+# Frames with a higher zero-crossing rate are treated as noise unless they are very loud.
+VAD_MAX_ZERO_CROSSING_RATE = _env_float("VOCAHIRE_VAD_MAX_ZERO_CROSSING_RATE", 0.35)
+VAD_MIN_SPEECH_MS = _env_int("VOCAHIRE_VAD_MIN_SPEECH_MS", 60)
+# Silence needed after speech before an utterance is considered finished.
+VAD_HANGOVER_MS = _env_int("VOCAHIRE_VAD_HANGOVER_MS", 400)
+# Silence needed after the last utterance before the server ends the candidate's turn (0 disables).
+VAD_END_OF_TURN_MS = _env_int("VOCAHIRE_VAD_END_OF_TURN_MS", 1500)
+
+# --- Speech-to-text ---
+# "simulated" (placeholder results) or "whisper" (local CPU model in a worker process, needs faster-whisper).
+STT_BACKEND = os.getenv("VOCAHIRE_STT_BACKEND", "simulated")
+STT_LANGUAGE = os.getenv("VOCAHIRE_STT_LANGUAGE", "en")
+STT_WHISPER_MODEL = os.getenv("VOCAHIRE_STT_WHISPER_MODEL", "base.en") # Model name or path to a converted model
+STT_WHISPER_COMPUTE_TYPE = os.getenv("VOCAHIRE_STT_WHISPER_COMPUTE_TYPE", "int8")
+STT_WHISPER_THREADS = _env_int("VOCAHIRE_STT_WHISPER_THREADS", 0) # 0 = let CTranslate2 decide
+# Utterances from concurrent sessions are batched: up to this many per inference call, waiting at most this long.
+STT_BATCH_MAX_SIZE = _env_int("VOCAHIRE_STT_BATCH_MAX_SIZE", 8)
+STT_BATCH_WINDOW_MS = _env_float("VOCAHIRE_STT_BATCH_WINDOW_MS", 50)
+
+# --- Simulated services ---
+# Latency of the placeholder STT/LLM/TTS (see services/simulation.py):
+#   "realistic": sampled from per-operation distributions (seed them with SIMULATION_SEED for reproducible runs)
+#   "zero": no delays, for tests and benchmarks
+#   "replay": the latencies recorded in SIMULATION_TRACE_PATH, in order
+SIMULATION_PROFILE = os.getenv("VOCAHIRE_SIMULATION_PROFILE", "realistic")
+SIMULATION_SEED = int(os.environ["VOCAHIRE_SIMULATION_SEED"]) if os.getenv("VOCAHIRE_SIMULATION_SEED") else None
+SIMULATION_TRACE_PATH = os.getenv("VOCAHIRE_SIMULATION_TRACE_PATH", "")
+# Multiplies every simulated delay (e.g. 0.1 runs the realistic profile 10x faster).
+SIMULATION_TIME_SCALE = _env_float("VOCAHIRE_SIMULATION_TIME_SCALE", 1.0)
+# When set, the STT/LLM latencies observed by this worker (with any backend) are written to this file at
+# shutdown, in the format the replay profile reads.
+SIMULATION_RECORD_PATH = os.getenv("VOCAHIRE_SIMULATION_RECORD_PATH", "")
+# Random streams (one per operation and session) are kept in a bounded LRU/TTL registry.
+SIMULATION_MAX_STREAMS = _env_int("VOCAHIRE_SIMULATION_MAX_STREAMS", 10000)
+SIMULATION_STREAM_TTL_SECONDS = _env_float("VOCAHIRE_SIMULATION_STREAM_TTL_SECONDS", 2 * 60 * 60)
+
+# --- Audio ingest ---
+# Per-connection ring buffer between the WebSocket and STT (default: 10 s of 16 kHz 16-bit audio).
+INGEST_BUFFER_BYTES = _env_int("VOCAHIRE_INGEST_BUFFER_BYTES", 320000)
+# When buffered audio reaches the high-water mark the policy kicks in:
+#   "pause": stop reading from the socket until the buffer drains to the low-water mark (TCP backpressure)
+#   "drop_oldest": overwrite the oldest buffered audio
+#   "drop_newest": discard incoming audio that doesn't fit
+INGEST_HIGH_WATER_BYTES = _env_int("VOCAHIRE_INGEST_HIGH_WATER_BYTES", 240000)
+INGEST_LOW_WATER_BYTES = _env_int("VOCAHIRE_INGEST_LOW_WATER_BYTES", 80000)
+INGEST_OVERFLOW_POLICY = os.getenv("VOCAHIRE_INGEST_OVERFLOW_POLICY", "pause")
+# Largest chunk handed to STT at once; a backlog is coalesced into chunks of up to this size.
+INGEST_MAX_READ_BYTES = _env_int("VOCAHIRE_INGEST_MAX_READ_BYTES", 16000)
+# After the VAD ended a turn, audio at the start of the next turn is held back for up to this long in case it is
+# the rest of the previous answer (dropped once its END_OF_STREAM arrives), for clients that keep recording until then.
+INGEST_STALE_AUDIO_GRACE_MS = _env_float("VOCAHIRE_INGEST_STALE_AUDIO_GRACE_MS", 1000)
+# Per-session counters of received audio (GET /api/interview/{id}/audio-telemetry), in a bounded LRU/TTL registry.
+AUDIO_TELEMETRY_MAX_SESSIONS = _env_int("VOCAHIRE_AUDIO_TELEMETRY_MAX_SESSIONS", 1000)
+AUDIO_TELEMETRY_TTL_SECONDS = _env_float("VOCAHIRE_AUDIO_TELEMETRY_TTL_SECONDS", 2 * 60 * 60)
+
+# --- Evaluation ---
+# Role keyword set used for keyword coverage (see evaluation_service.ROLE_KEYWORDS).
+EVALUATION_ROLE = os.getenv("VOCAHIRE_EVALUATION_ROLE", "general")
+# Worker processes for transcript scoring (0 scores in a thread instead).
+EVALUATION_WORKERS = _env_int("VOCAHIRE_EVALUATION_WORKERS", 2)
+# Running per-session evaluation state (see evaluation_service.EvaluationAccumulator).
+EVALUATION_ACCUMULATOR_MAX_SESSIONS = _env_int("VOCAHIRE_EVALUATION_ACCUMULATOR_MAX_SESSIONS", 1000)
+EVALUATION_ACCUMULATOR_TTL_SECONDS = _env_float("VOCAHIRE_EVALUATION_ACCUMULATOR_TTL_SECONDS", 4 * 60 * 60)
+
+# --- Summary cache ---
+SUMMARY_CACHE_MAX_ENTRIES = _env_int("VOCAHIRE_SUMMARY_CACHE_MAX_ENTRIES", 500)
+SUMMARY_CACHE_TTL_SECONDS = _env_float("VOCAHIRE_SUMMARY_CACHE_TTL_SECONDS", 15 * 60)
+
+# --- PDF reports ---
+PDF_CACHE_DIR = os.getenv("VOCAHIRE_PDF_CACHE_DIR", os.path.join(DATA_DIR, "reports"))
+PDF_CACHE_MAX_FILES = _env_int("VOCAHIRE_PDF_CACHE_MAX_FILES", 5000)
+PDF_WORKERS = _env_int("VOCAHIRE_PDF_WORKERS", 1)
+
+# --- Session lifecycle ---
+# Ended/summarized sessions are archived to SQLite and evicted from the session store after the retention period
+# (with archiving disabled they are simply dropped).
+SESSION_ARCHIVE_ENABLED = _env_bool("VOCAHIRE_SESSION_ARCHIVE_ENABLED", True)
+SESSION_ARCHIVE_PATH = os.getenv("VOCAHIRE_SESSION_ARCHIVE_PATH", os.path.join(DATA_DIR, "session_archive.sqlite3"))
+SESSION_RETENTION_SECONDS = _env_float("VOCAHIRE_SESSION_RETENTION_SECONDS", 15 * 60)
+# Sessions still marked active this long after they started are treated as abandoned and archived too.
+SESSION_MAX_AGE_SECONDS = _env_float("VOCAHIRE_SESSION_MAX_AGE_SECONDS", 12 * 60 * 60)
+LIFECYCLE_INTERVAL_SECONDS = _env_float("VOCAHIRE_LIFECYCLE_INTERVAL_SECONDS", 60)
+
+# --- Audio codecs ---
+# Threads for encoding Opus output. Container input is decoded in a dedicated thread per speaking candidate.
+AUDIO_CODEC_WORKERS = _env_int("VOCAHIRE_AUDIO_CODEC_WORKERS", 8)
+# Container bytes a decoder may have queued before the socket reader waits for it (~16 s of Opus at 32 kbit/s).
+AUDIO_DECODER_MAX_PENDING_BYTES = _env_int("VOCAHIRE_AUDIO_DECODER_MAX_PENDING_BYTES", 64 * 1024)
+# Opus bitrate for TTS audio when the client doesn't ask for one, and the range clients can pick from.
+OPUS_BITRATE = _env_int("VOCAHIRE_OPUS_BITRATE", 24000)
+OPUS_MIN_BITRATE = _env_int("VOCAHIRE_OPUS_MIN_BITRATE", 6000)
+OPUS_MAX_BITRATE = _env_int("VOCAHIRE_OPUS_MAX_BITRATE", 128000)
+
+# --- TTS cache ---
+# Synthesized segments are cached by hash of (engine, voice, format, text): an in-memory LRU tier in front of a directory on disk.
+# The engine is part of the key so a new engine (or engine version) never serves audio cached from the old one.
+TTS_ENGINE = os.getenv("VOCAHIRE_TTS_ENGINE", "placeholder-pcm")
+TTS_VOICE = os.getenv("VOCAHIRE_TTS_VOICE", "default")
+TTS_FORMAT = os.getenv("VOCAHIRE_TTS_FORMAT", "wav")
+TTS_CACHE_ENABLED = _env_bool("VOCAHIRE_TTS_CACHE_ENABLED", True)
+TTS_CACHE_MAX_ENTRIES = _env_int("VOCAHIRE_TTS_CACHE_MAX_ENTRIES", 2000)
+TTS_CACHE_DIR = os.getenv("VOCAHIRE_TTS_CACHE_DIR", os.path.join(DATA_DIR, "tts_cache"))
+TTS_CACHE_MAX_FILES = _env_int("VOCAHIRE_TTS_CACHE_MAX_FILES", 20000)
+# Pre-synthesize the scripted greeting, questions and closing at startup.
+TTS_WARMUP_ENABLED = _env_bool("VOCAHIRE_TTS_WARMUP_ENABLED", True)
+
+# --- Speculative prefetch ---
+# While the candidate answers, the likely next question is generated and synthesized ahead of
+# time, and used if the final transcript leads to it (discarded otherwise).
+SPECULATIVE_PREFETCH_ENABLED = _env_bool("VOCAHIRE_SPECULATIVE_PREFETCH_ENABLED", True)
+
+# --- Session resume ---
+# A client that drops without END_INTERVIEW can reconnect to the same session within this window and continue
+# from its last completed turn; after that the session is ended.
+SESSION_RESUME_WINDOW_SECONDS = _env_float("VOCAHIRE_SESSION_RESUME_WINDOW_SECONDS", 10 * 60)
+# On resume, resend the audio of the last AI turn if this worker still has it.
+RESUME_REPLAY_AUDIO = _env_bool("VOCAHIRE_RESUME_REPLAY_AUDIO", True)
+# Per-session cache of the last AI turn's audio used for that replay.
+REPLAY_AUDIO_MAX_SESSIONS = _env_int("VOCAHIRE_REPLAY_AUDIO_MAX_SESSIONS", 500)
+REPLAY_AUDIO_MAX_BYTES = _env_int("VOCAHIRE_REPLAY_AUDIO_MAX_BYTES", 2 * 1024 * 1024)
+
+# --- Transcript write-ahead log ---
+# Optional crash recovery: every worker appends session events to its own (locked) DATA_DIR/wal/wal-<pid>-<id>.jsonl and
+# fsyncs them in batches (group commit). At startup, logs no running worker holds are replayed into the session store.
+WAL_ENABLED = _env_bool("VOCAHIRE_WAL_ENABLED", False)
+WAL_DIR = os.getenv("VOCAHIRE_WAL_DIR", os.path.join(DATA_DIR, "wal"))
+# A batch is committed every interval, or as soon as this many records are pending.
+WAL_FLUSH_INTERVAL_SECONDS = _env_float("VOCAHIRE_WAL_FLUSH_INTERVAL_SECONDS", 0.2)
+WAL_FLUSH_RECORDS = _env_int("VOCAHIRE_WAL_FLUSH_RECORDS", 64)
+# The log is compacted to the sessions still in the store once it grows past this size.
+WAL_MAX_BYTES = _env_int("VOCAHIRE_WAL_MAX_BYTES", 64 * 1024 * 1024)
@@ -0,0 +1,202 @@
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+import copy
+import datetime
+import json
+import logging
+import queue
+import sys
+
+from backend.app import config
+
+# Structured, non-blocking logging for the backend.
+#
+# Modules log through `get_logger(__name__)` with keyword fields instead of formatted strings:
+#
+#     logger.info("Utterance ended", utterance=2, text=text)
+#
+# `session_id` and `turn` are added from the current context (see `bind`), so every record of an
+# interview carries them without threading them through each call. Records are put on a bounded
+# queue and written by a background thread; a full queue drops records rather than blocking the
+# event loop. Events that happen per audio chunk or TTS segment are logged with `sample=True` and
+# only every LOG_SAMPLE_EVERY-th one is kept.
+
+ROOT_LOGGER = "backend.app"
+
+session_id_var: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+turn_var: ContextVar[Optional[int]] = ContextVar("turn", default=None)
+
+def bind(session_id: Optional[str] = None, turn: Optional[int] = None):
+    """Sets the session (and turn) logged with every record of the current task and the tasks it starts."""
+    if session_id is not None:
+        session_id_var.set(session_id)
+    if turn is not None:
+        turn_var.set(turn)
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger taking structured keyword fields; `sample=True` marks high-frequency events."""
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+        self._sample_counts: Dict[str, int] = {}
+
+    def log(self, level: int, msg: str, *args: Any, exc_info: Any = None, sample: bool = False, **fields: Any):
+        if not self.logger.isEnabledFor(level):
+            return
+        if sample and config.LOG_SAMPLE_EVERY > 1:
+            count = self._sample_counts.get(msg, 0)
+            self._sample_counts[msg] = count + 1
+            if count % config.LOG_SAMPLE_EVERY:
+                return
+            fields["sample_every"] = config.LOG_SAMPLE_EVERY
+        self.logger.log(level, msg, *args, exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, msg: str, *args: Any, **kwargs: Any):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg: str, *args: Any, **kwargs: Any):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg: str, *args: Any, **kwargs: Any):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg: str, *args: Any, **kwargs: Any):
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+    def exception(self, msg: str, *args: Any, **kwargs: Any):
+        self.log(logging.ERROR, msg, *args, exc_info=True, **kwargs)
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(name))
+
+
+class _ContextFilter(logging.Filter):
+    """Stamps the caller's session/turn on the record (runs in the logging task, before queueing)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = getattr(record, "fields", None)
+        if fields is None:
+            record.fields = fields = {}
+        fields.setdefault("session_id", session_id_var.get())
+        fields.setdefault("turn", turn_var.get())
+        return True
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped (and counted) while the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now; the fields stay structured for the formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _short_name(name: str) -> str:
+    return name[len(ROOT_LOGGER) + 1:] if name.startswith(ROOT_LOGGER + ".") else name
+
+class TextFormatter(logging.Formatter):
+    """`time LEVEL [module - Session id, turn n] message key=value ...`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = dict(getattr(record, "fields", {}))
+        session_id, turn = fields.pop("session_id", None), fields.pop("turn", None)
+        context = _short_name(record.name)
+        if session_id is not None:
+            context += f" - Session {session_id}"
+        if turn is not None:
+            context += f", turn {turn}"
+        line = f"{self.formatTime(record)} {record.levelname} [{context}] {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value!r}" for key, value in fields.items() if value is not None)
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, with the structured fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": _short_name(record.name),
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in getattr(record, "fields", {}).items() if value is not None)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Parses "services.tts_service=DEBUG,main=WARNING" into absolute logger names and levels."""
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        name = name.strip()
+        if not name.startswith(ROOT_LOGGER):
+            name = f"{ROOT_LOGGER}.{name}"
+        level_number = logging.getLevelName(level.strip().upper())
+        if not isinstance(level_number, int):
+            raise ValueError(f"Unknown log level for {name}: {level!r}")
+        levels[name] = level_number
+    return levels
+
+
+_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+def configure():
+    """Installs the queue handler and starts the writer thread (idempotent)."""
+    global _handler, _listener
+    if _handler is not None:
+        return
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter() if config.LOG_FORMAT == "json" else TextFormatter())
+    _handler = _DroppingQueueHandler(queue.Queue(maxsize=config.LOG_QUEUE_SIZE))
+    _handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(config.LOG_LEVEL)
+    root.addHandler(_handler)
+    root.propagate = False # Not duplicated through uvicorn's/the root logger's handlers
+    for name, level in parse_levels(config.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+def shutdown():
+    """Writes out the queued records and stops the writer thread (called on application shutdown)."""
+    global _handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+        _handler = None
+
+def stats() -> Dict[str, int]:
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+    }
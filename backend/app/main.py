@@ -1,33 +1,97 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Path
-from fastapi.responses import JSONResponse, HTMLResponse # Added HTMLResponse for root
-from typing import Dict, List, AsyncGenerator
+from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse, Response, FileResponse # Added HTMLResponse for root
+from contextlib import aclosing, asynccontextmanager
+from typing import Dict, List, AsyncGenerator, Optional
 import asyncio
 import uuid
 import time
 
+from backend.app import config, log
 from backend.app.models.interview_models import (
     AIResponse, SessionSummary, EvaluationMetrics, InterviewTurn, SummaryRequest
 )
+from backend.app.services.audio_ingest import AudioIngest
+from backend.app.services.summary_cache import CachedSummary, summary_cache
+from backend.app.services.tts_cache import tts_cache
+from backend.app.services.ws_protocol import InterviewChannel
 from backend.app.services import (
+    audio_codec,
     stt_service,
     llm_service,
     tts_service,
     evaluation_service,
     session_service,
+    speculation_service,
+    metrics_service,
+    vad_service,
+    audio_telemetry,
+    pdf_renderer,
+    lifecycle_service,
+    transcript_wal,
+    simulation,
+    ws_protocol,
 )
+from backend.app.log import get_logger
+
+# Structured logging through a background writer thread (see log.py)
+log.configure()
+logger = get_logger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the STT model (if the backend has one) before the first interview needs it
+    await stt_service.start()
+    await llm_service.start()
+    logger.info("Simulated services", profile=simulation.profile.name, seed=config.SIMULATION_SEED,
+                time_scale=config.SIMULATION_TIME_SCALE, recording=bool(config.SIMULATION_RECORD_PATH))
+    # Optional transcript WAL: replay sessions of crashed workers so their clients can resume
+    if transcript_wal.start(live_sessions=session_service.list_session_ids):
+        for session_id in await session_service.recover_sessions_from_wal():
+            llm_service.restore_interview_state(session_id, await session_service.get_transcript(session_id))
+    # Pre-synthesize the scripted interviewer lines in the background
+    if config.TTS_WARMUP_ENABLED:
+        warm_up_task = asyncio.create_task(tts_service.warm_up(llm_service.static_utterances()))
+    # Archive and evict finished sessions in the background (never ones connected to this worker)
+    lifecycle_service.start(is_connected=lambda session_id: session_id in active_connections)
+    yield
+    if config.TTS_WARMUP_ENABLED:
+        warm_up_task.cancel()
+    await lifecycle_service.stop()
+    await transcript_wal.stop()
+    await stt_service.shutdown()
+    await llm_service.shutdown()
+    simulation.shutdown() # Writes the recorded latency trace, if enabled
+    evaluation_service.shutdown()
+    pdf_renderer.shutdown()
+    audio_codec.shutdown()
+    log.shutdown() # Last, so the shutdown of everything else is logged
 
 app = FastAPI(
     title="VocaHire Backend",
     description="FastAPI backend for the VocaHire real-time AI voice interview simulator.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-# Store active WebSocket connections and session data
-# In a production environment, consider using Redis or another shared store
+# Store active WebSocket connections (local to this worker).
+# Session data itself lives in session_service's SessionStore, which can be shared across workers.
 active_connections: Dict[str, WebSocket] = {}
-interview_sessions: Dict[str, Dict[str, any]] = {}
 
 
+# Gauges exported at GET /metrics, read at scrape time
+metrics_service.register_gauge("vocahire_active_sessions", "Interview WebSocket connections open on this worker.",
+                               lambda: len(active_connections))
+metrics_service.register_gauge("vocahire_tts_active_pipelines", "AI turns currently being synthesized.",
+                               tts_service.active_pipelines)
+metrics_service.register_gauge("vocahire_stt_queued_utterances", "Utterances waiting for an STT batch.",
+                               lambda: stt_service.stats().get("queued", 0))
+metrics_service.register_gauge("vocahire_llm_in_flight_requests", "LLM requests in progress.",
+                               lambda: llm_service.stats().get("in_flight", 0))
+metrics_service.register_gauge("vocahire_llm_waiting_requests", "LLM requests waiting for a concurrency slot.",
+                               lambda: llm_service.stats().get("waiting", 0))
+metrics_service.register_gauge("vocahire_log_queue_depth", "Log records waiting for the writer thread.",
+                               lambda: log.stats()["queued"])
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
     return """
@@ -43,226 +107,386 @@ async def read_root():
     </html>
     """
 
-async def audio_chunk_generator_from_websocket(websocket: WebSocket, session_id: str) -> AsyncGenerator[bytes, None]:
-    """
-    Receives audio chunks from WebSocket and yields them.
-    Terminates when a special "END_OF_AUDIO" message is received or connection closes.
+async def stream_ai_response(channel: InterviewChannel, session_id: str, response_stream: AsyncGenerator[str, None],
+                             prepared_audio: Optional[Dict[str, "asyncio.Task[bytes]"]] = None) -> str:
     """
-    chunk_index = 0
-    try:
-        while True:
-            data = await websocket.receive()
-            if "bytes" in data:
-                audio_chunk = data["bytes"]
-                print(f"[WebSocket - Session {session_id}] Received audio chunk {chunk_index} of length {len(audio_chunk)} bytes.")
-                session_service.add_to_transcript(session_id, "Candidate_Audio_Marker", f"Audio chunk {chunk_index} received") # Simplified marker
-                yield audio_chunk
-                chunk_index += 1
-            elif "text" in data:
-                message = data["text"]
-                if message == "END_OF_STREAM": # Client signals end of its audio transmission for this turn
-                    print(f"[WebSocket - Session {session_id}] Client signaled END_OF_STREAM for current turn.")
-                    break # Stop yielding for this turn, STT will finalize.
-                elif message == "END_INTERVIEW":
-                    print(f"[WebSocket - Session {session_id}] Client signaled END_INTERVIEW.")
-                    # Handle interview termination logic if needed by generator
-                    # For now, just break, main loop will handle.
-                    break
-    except WebSocketDisconnect:
-        print(f"[WebSocket - Session {session_id}] Client disconnected during audio streaming.")
-    except Exception as e:
-        print(f"[WebSocket - Session {session_id}] Error receiving audio: {e}")
-    finally:
-        print(f"[WebSocket - Session {session_id}] Audio chunk generator finished.")
+    Runs the LLM -> TTS -> WebSocket pipeline for one AI turn and returns the full response text.
 
+    The LLM producer, the TTS synthesizer and the socket sender run concurrently: each sentence
+    is synthesized as soon as the LLM closes it and its audio is sent while later sentences
+    are still being generated. Time to first audio byte is recorded in metrics_service.
+    Segments in `prepared_audio` (synthesized speculatively) are not synthesized again.
+    """
+    turn_started_at = time.perf_counter()
+    response_text_buffer = ""
+    # Create a queue for text chunks from LLM to TTS
+    llm_to_tts_queue = asyncio.Queue()
+
+    async def process_llm_to_tts():
+        nonlocal response_text_buffer
+        try:
+            # Closed even if this task is cancelled between chunks, so the LLM request ends with it
+            async with aclosing(response_stream):
+                async for text_chunk in response_stream:
+                    response_text_buffer += text_chunk
+                    await llm_to_tts_queue.put(text_chunk)
+        finally:
+            await llm_to_tts_queue.put(None) # Signal end of text stream
 
-@app.websocket("/ws/interview/{session_id}")
-async def interview_websocket_endpoint(websocket: WebSocket, session_id: str = Path(...)):
-    await websocket.accept()
-    active_connections[session_id] = websocket
-    session_service.initialize_session(session_id)
-    await llm_service.reset_interview_state() # Reset LLM state for new session
-
-    print(f"[WebSocket] Client connected: {session_id}")
+    # Start TTS and LLM text production concurrently; TTS returns its audio queue right away
+    tts_audio_stream_queue = await tts_service.convert_text_to_speech_stream(llm_to_tts_queue, session_id, prepared_audio)
+    llm_task = asyncio.create_task(process_llm_to_tts())
 
     try:
-        # Send initial greeting / first question from AI
-        initial_greeting_stream = llm_service.generate_interview_response("", [], session_id)
-        
-        ai_response_text_buffer = ""
-        # Create a queue for text chunks from LLM to TTS
-        llm_to_tts_queue = asyncio.Queue()
-
-        async def process_llm_to_tts():
-            nonlocal ai_response_text_buffer
-            async for text_chunk in initial_greeting_stream:
-                ai_response_text_buffer += text_chunk
-                await llm_to_tts_queue.put(text_chunk)
-            await llm_to_tts_queue.put(None) # Signal end of text stream
-
-        # Start TTS stream processing in parallel
-        tts_audio_stream_queue = await tts_service.convert_text_to_speech_stream(llm_to_tts_queue, session_id)
-        
-        # Concurrently run LLM-to-TTS text production and TTS audio consumption
-        llm_task = asyncio.create_task(process_llm_to_tts())
-        
-        # Stream audio back to client
+        # Stream audio back to client as segments become available
+        first_audio_sent = False
+        sent_audio: List[bytes] = []
         while True:
             audio_chunk = await tts_audio_stream_queue.get()
             if audio_chunk is None: # End of TTS audio stream
                 tts_audio_stream_queue.task_done()
                 break
-            await websocket.send_bytes(audio_chunk)
+            # Encoded to the client's negotiated format (e.g. Opus) in the codec pool
+            audio_chunk = await audio_codec.encode_for_client(audio_chunk, channel.audio_format)
+            await channel.send_audio(audio_chunk)
+            sent_audio.append(audio_chunk)
             tts_audio_stream_queue.task_done()
-        
+            if not first_audio_sent:
+                first_audio_sent = True
+                metrics_service.record_first_audio_latency(session_id, time.perf_counter() - turn_started_at)
+
         await llm_task # Ensure LLM text production is complete
-        
-        session_service.add_to_transcript(session_id, "AI", ai_response_text_buffer)
-        await websocket.send_text(f"AI_ zegt: {ai_response_text_buffer}") # Also send text for debugging/UI
+        # Kept so a client that reconnects can hear this turn again without re-running TTS
+        tts_service.remember_response_audio(session_id, response_text_buffer, sent_audio, channel.audio_format.output_key)
+    finally:
+        if not llm_task.done():
+            llm_task.cancel()
+    return response_text_buffer
+
+
+async def respond_to_candidate(channel: InterviewChannel, session_id: str, candidate_text: str,
+                               speculation: Optional[speculation_service.Speculation] = None) -> str:
+    """
+    Generates, speaks and records the AI reply to the candidate's latest answer. Returns its text.
+    A speculation started while the candidate was speaking supplies the reply if it predicted it.
+    """
+    # Only the turns added since the last prompt are fetched; the history window stays bounded
+    seen_turns = (await llm_service.get_interview_state(session_id)).history.turns_seen
+    history_for_llm = await llm_service.get_prompt_history(session_id, await session_service.get_transcript_since(session_id, seen_turns))
+
+    ai_response_stream = llm_service.generate_interview_response(candidate_text, history_for_llm, session_id,
+                                                                 prediction=speculation.prediction if speculation else None)
+
+    # Convert AI response to speech (TTS) and stream back, pipelined sentence by sentence
+    ai_response_text_buffer = await stream_ai_response(channel, session_id, ai_response_stream,
+                                                       speculation.prepared_audio if speculation else None)
+
+    await session_service.add_to_transcript(session_id, "AI", ai_response_text_buffer)
+    await channel.send_event("ai_response", ai_response_text_buffer)
+    return ai_response_text_buffer
+
+async def resume_interview(channel: InterviewChannel, session_id: str) -> str:
+    """
+    Continues an active session on a new connection from its last completed turn and returns
+    the text of the AI turn the candidate should answer next.
+
+    Nothing already produced is generated again: the last AI turn is resent as text (and as
+    audio if this worker still has it cached). Only if the connection dropped after the
+    candidate's answer was transcribed but before the reply was recorded is the reply generated.
+    """
+    transcript = await session_service.get_transcript(session_id)
+    if session_id not in llm_service.interview_states:
+        # The state was lost (worker restart or another worker served the session)
+        llm_service.restore_interview_state(session_id, transcript)
+    await session_service.mark_reconnected(session_id)
+    await channel.send_event("session_resumed", turns=len(transcript))
+
+    last_turn = transcript[-1]
+    if last_turn.speaker != "AI":
+        return await respond_to_candidate(channel, session_id, last_turn.text)
+
+    replay_audio = None
+    if config.RESUME_REPLAY_AUDIO:
+        replay_audio = tts_service.get_response_audio(session_id, last_turn.text, channel.audio_format.output_key)
+    for audio_chunk in replay_audio or []:
+        await channel.send_audio(audio_chunk)
+    await channel.send_event("ai_response", last_turn.text)
+    return last_turn.text
+
+def is_concluding_response(ai_response_text: str) -> bool:
+    return "that concludes the main part of the interview" in ai_response_text.lower()
+
+
+@app.websocket("/ws/interview/{session_id}")
+async def interview_websocket_endpoint(websocket: WebSocket, session_id: str = Path(...)):
+    # Framed protocol if the client offers it as a subprotocol, the legacy text protocol otherwise
+    channel = await ws_protocol.accept(websocket, session_id)
+    log.bind(session_id=session_id) # Every record of this connection (and its tasks) carries the session
+    try:
+        channel.audio_format = audio_codec.negotiate(websocket.query_params)
+    except ValueError as e:
+        logger.warning("Rejecting connection", reason=str(e))
+        await websocket.close(code=1003, reason=str(e))
+        return
+    previous_connection = active_connections.get(session_id)
+    active_connections[session_id] = websocket
+    if previous_connection is not None:
+        # A reconnect while the old socket hasn't noticed it's dead yet: the new connection takes over
+        try:
+            await previous_connection.close(code=4000, reason="Replaced by a new connection")
+        except Exception:
+            pass
+
+    # An active session with turns is a reconnect: resume it instead of restarting the interview
+    resuming = session_service.is_resumable(await session_service.get_session_data(session_id)) and await session_service.get_turn_count(session_id) > 0
+    if not resuming:
+        await session_service.initialize_session(session_id)
+        await llm_service.reset_interview_state(session_id) # Reset this session's LLM state
+
+    logger.info("Client connected", resuming=resuming, protocol=channel.protocol)
+    audio_ingest: Optional[AudioIngest] = None
+    speculation: Optional[speculation_service.Speculation] = None
+    interview_over = False # Set when the interview ends for good (not just the connection)
+
+    try:
+        if any(param in websocket.query_params for param in audio_codec.NEGOTIATION_PARAMS):
+            # Tell the client what it got (e.g. WAV if Opus was asked for but isn't available)
+            audio_format = channel.audio_format
+            await channel.send_event("audio_format", input_format=audio_format.input_format,
+                                     output_format=audio_format.output_format, opus_bitrate=audio_format.opus_bitrate)
+        if resuming:
+            ai_response_text_buffer = await resume_interview(channel, session_id)
+        else:
+            # Send initial greeting / first question from AI
+            initial_greeting_stream = llm_service.generate_interview_response("", [], session_id)
+
+            ai_response_text_buffer = await stream_ai_response(channel, session_id, initial_greeting_stream)
+
+            await session_service.add_to_transcript(session_id, "AI", ai_response_text_buffer)
+            await channel.send_event("ai_greeting", ai_response_text_buffer) # Also send text for debugging/UI
 
         # Main interview loop
         turn_count = 0
-        while True:
+        turn_vad = vad_service.create_detector() # Kept across turns so the noise floor estimate carries over
+        server_ended_last_turn = False
+        # Bounded ring buffer between the socket and STT, reused for every turn of this connection
+        audio_ingest = AudioIngest(channel, session_id, input_format=channel.audio_format.input_format)
+        while not is_concluding_response(ai_response_text_buffer):
             turn_count +=1
-            print(f"[WebSocket - Session {session_id}] Waiting for candidate audio (Turn {turn_count})...")
+            # Frames of this exchange are stamped with the transcript index of the candidate's answer
+            channel.turn = await session_service.get_turn_count(session_id)
+            log.bind(turn=channel.turn)
+            logger.debug("Waiting for candidate audio", turn_count=turn_count)
             
             # 1. Receive audio from client and transcribe (STT)
-            candidate_audio_stream = audio_chunk_generator_from_websocket(websocket, session_id)
+            candidate_audio_stream = audio_ingest.stream_turn(skip_stale_end_of_stream=server_ended_last_turn)
+            if turn_vad:
+                turn_vad.reset_turn()
             
             transcribed_text_final = ""
-            async for text_part, is_final in stt_service.transcribe_audio_stream(candidate_audio_stream, session_id):
-                await websocket.send_text(f"STT_part: {text_part}{' (final)' if is_final else ''}") # Send partial transcripts
+            speculated = False
+            async for text_part, is_final in stt_service.transcribe_audio_stream(candidate_audio_stream, session_id, vad=turn_vad):
+                if not speculated:
+                    # The candidate is answering: prepare the likely reply while they speak
+                    speculation = await speculation_service.start(session_id)
+                    speculated = True
+                await channel.send_event("stt_partial", text_part, final=is_final) # Send partial transcripts
                 if is_final:
                     transcribed_text_final += text_part + " " # Accumulate final parts for the turn
+            await candidate_audio_stream.aclose()
+
+            if audio_ingest.end_message == ws_protocol.END_INTERVIEW:
+                logger.info("END_INTERVIEW received, terminating loop")
+                interview_over = True
+                raise WebSocketDisconnect(code=1000, reason="Interview ended by client")
+            if audio_ingest.disconnected:
+                raise WebSocketDisconnect(code=1001, reason="Client disconnected during audio streaming")
+
+            # VAD detected the end of the candidate's turn before the client sent END_OF_STREAM
+            server_ended_last_turn = bool(turn_vad and turn_vad.turn_ended)
+            if server_ended_last_turn:
+                await channel.send_event("end_of_turn_detected")
             
             transcribed_text_final = transcribed_text_final.strip()
             if not transcribed_text_final:
-                 # Check if client sent special text command instead of audio bytes
-                async for message_obj in websocket.iter_text(): # Check for text messages if audio stream was empty
-                    if message_obj == "END_INTERVIEW":
-                        print(f"[WebSocket - Session {session_id}] END_INTERVIEW received, terminating loop.")
-                        raise WebSocketDisconnect(code=1000, reason="Interview ended by client")
-                    # Handle other text commands if necessary
-                print(f"[WebSocket - Session {session_id}] No transcription received for turn {turn_count}.")
+                logger.info("No transcription received", turn_count=turn_count)
                 # Potentially ask to repeat, or if multiple empty, end interview
                 # For now, let's try to get another AI response to prompt user
                 # transcribed_text_final = "..." # Placeholder to trigger LLM
                 if turn_count > 5 and not transcribed_text_final: # Arbitrary limit for empty turns
-                    await websocket.send_text("AI_says: It seems I'm not receiving audio. Ending interview.")
+                    await channel.send_event("ai_response", "It seems I'm not receiving audio. Ending interview.")
+                    interview_over = True
                     raise WebSocketDisconnect(code=1000, reason="No audio from client after multiple turns")
 
 
-            session_service.add_to_transcript(session_id, "Candidate", transcribed_text_final)
-            await websocket.send_text(f"Candidate_says: {transcribed_text_final}")
+            await session_service.add_to_transcript(session_id, "Candidate", transcribed_text_final)
+            await channel.send_event("candidate_text", transcribed_text_final)
 
 
-            # 2. Get AI response (LLM)
-            current_transcript = session_service.get_transcript(session_id)
-            history_for_llm = [{"role": "AI" if t.speaker == "AI" else "user", "content": t.text} for t in current_transcript]
-            
-            ai_response_stream = llm_service.generate_interview_response(transcribed_text_final, history_for_llm, session_id)
-            
-            ai_response_text_buffer = ""
-            llm_to_tts_queue_loop = asyncio.Queue()
-
-            async def process_llm_to_tts_loop():
-                nonlocal ai_response_text_buffer
-                async for text_chunk in ai_response_stream:
-                    ai_response_text_buffer += text_chunk
-                    await llm_to_tts_queue_loop.put(text_chunk)
-                await llm_to_tts_queue_loop.put(None)
-
-            tts_audio_stream_queue_loop = await tts_service.convert_text_to_speech_stream(llm_to_tts_queue_loop, session_id)
-            llm_task_loop = asyncio.create_task(process_llm_to_tts_loop())
-
-            # 3. Convert AI response to speech (TTS) and stream back
-            while True:
-                audio_chunk = await tts_audio_stream_queue_loop.get()
-                if audio_chunk is None:
-                    tts_audio_stream_queue_loop.task_done()
-                    break
-                await websocket.send_bytes(audio_chunk)
-                tts_audio_stream_queue_loop.task_done()
-            
-            await llm_task_loop # Ensure LLM text production is complete
-
-            session_service.add_to_transcript(session_id, "AI", ai_response_text_buffer)
-            await websocket.send_text(f"AI_says: {ai_response_text_buffer}")
+            # 2. Get AI response (LLM) and 3. speak it (TTS)
+            ai_response_text_buffer = await respond_to_candidate(channel, session_id, transcribed_text_final, speculation)
+            if speculation:
+                speculation.finish()
+                speculation = None
 
-            if "that concludes the main part of the interview" in ai_response_text_buffer.lower():
-                print(f"[WebSocket - Session {session_id}] AI signaled end of questions. Preparing to close.")
-                await websocket.send_text("INTERVIEW_ENDED_BY_AI")
-                break # Exit the main interview loop
+        # The loop exits once the AI has concluded the interview
+        logger.info("AI signaled end of questions, preparing to close")
+        await channel.send_event("interview_ended")
+        interview_over = True
+        await session_service.end_session(session_id)
 
     except WebSocketDisconnect as e:
-        print(f"[WebSocket - Session {session_id}] Client disconnected. Code: {e.code}, Reason: {e.reason}")
-        session_service.end_session(session_id)
+        logger.info("Client disconnected", code=e.code, reason=e.reason)
+        if active_connections.get(session_id) is websocket: # Not replaced by a newer connection
+            if interview_over:
+                await session_service.end_session(session_id)
+            else:
+                await session_service.mark_disconnected(session_id)
     except Exception as e:
-        print(f"[WebSocket - Session {session_id}] Error in WebSocket connection: {e}")
+        logger.exception("Error in WebSocket connection")
+        if active_connections.get(session_id) is websocket:
+            await session_service.mark_disconnected(session_id) # The client may retry and resume
         await websocket.close(code=1011, reason=f"Server error: {str(e)}")
     finally:
-        if session_id in active_connections:
+        if speculation:
+            speculation.finish()
+        if audio_ingest:
+            audio_ingest.close()
+        if active_connections.get(session_id) is websocket:
             del active_connections[session_id]
-        print(f"[WebSocket - Session {session_id}] Connection closed.")
+        logger.info("Connection closed")
         # Session summary could be triggered here or by client request
         # For now, let's assume client requests it via HTTP GET
 
-@app.post("/api/interview/summary", response_model=SessionSummary)
+# The summary endpoints serve the JSON pre-serialized by summary_cache, so there is no response_model
+# to validate against; the schema is documented for the OpenAPI docs instead
+SUMMARY_RESPONSES = {
+    200: {"model": SessionSummary, "description": "The session summary"},
+    404: {"description": "No transcript or summary for the session"},
+}
+
+@app.post("/api/interview/summary", responses=SUMMARY_RESPONSES)
 async def get_interview_summary(summary_request: SummaryRequest):
     """
     Generates and returns the interview session summary.
     This endpoint would typically be called after the WebSocket session ends.
+    The result is cached per transcript version, so repeated or concurrent requests share one generation.
     """
     session_id = summary_request.session_id
-    print(f"[API] Request for summary for session: {session_id}")
-
-    # Retrieve transcript and perform evaluation
-    transcript = session_service.get_transcript(session_id)
-    if not transcript:
-        raise HTTPException(status_code=404, detail=f"Transcript for session {session_id} not found or empty.")
-
-    evaluation_results = await evaluation_service.analyze_transcript(transcript, session_id)
-    session_service.store_evaluation(session_id, evaluation_results)
-    
-    summary = await session_service.generate_session_summary(session_id)
-    if not summary:
-        raise HTTPException(status_code=404, detail=f"Summary for session {session_id} could not be generated or not found.")
-    
-    # Optionally, save the summary (e.g., to JSON or PDF)
-    json_summary = await session_service.export_summary_to_json(summary, session_id)
-    # For testing, print it. In prod, save to a file or return as part of response.
-    print(f"[API - Session {session_id}] JSON Summary:\n{json_summary}")
-    
-    # pdf_summary_bytes = await session_service.export_summary_to_pdf(summary, session_id)
-    # This would be saved or made available for download.
-
-    return summary
-
-@app.get("/api/interview/{session_id}/summary", response_model=Optional[SessionSummary])
-async def retrieve_interview_summary(session_id: str):
+    logger.info("Summary requested", session_id=session_id)
+
+    async def build_summary() -> Optional[SessionSummary]:
+        # Finalize the evaluation (kept up to date turn by turn) and store it
+        evaluation_results = await session_service.evaluate_session(session_id)
+        if not evaluation_results:
+            raise HTTPException(status_code=404, detail=f"Transcript for session {session_id} not found or empty.")
+
+        summary = await session_service.generate_session_summary(session_id)
+        if not summary:
+            raise HTTPException(status_code=404, detail=f"Summary for session {session_id} could not be generated or not found.")
+        return summary
+
+    cached = await summary_cache.get_or_compute(session_id, await session_service.get_turn_count(session_id), build_summary)
+    return Response(content=cached.json_bytes, media_type="application/json")
+
+async def get_cached_summary(session_id: str) -> Optional[CachedSummary]:
     """
-    Retrieves a previously generated interview session summary.
+    Returns the session's summary from the summary cache, loading or generating it if needed.
+    The cache is keyed by transcript version, so the summary always matches the current transcript.
     """
-    print(f"[API] Retrieval request for summary for session: {session_id}")
-    summary = session_service.get_session_summary_from_store(session_id)
-    if not summary:
-        # Attempt to generate if not found and session data exists
-        # This logic might be better if summary generation is explicitly triggered
-        session_data = session_service.active_sessions.get(session_id)
-        if session_data and session_data.get("transcript"):
-            print(f"[API - Session {session_id}] Summary not found in store, attempting to generate now...")
-            # Ensure evaluation is done first
-            if not session_data.get("evaluation"):
-                 transcript = session_data.get("transcript")
-                 evaluation_results = await evaluation_service.analyze_transcript(transcript, session_id)
-                 session_service.store_evaluation(session_id, evaluation_results)
+    transcript_version = await session_service.get_turn_count(session_id)
 
+    async def load_or_generate_summary() -> Optional[SessionSummary]:
+        summary = await session_service.get_session_summary_from_store(session_id)
+        if summary and len(summary.full_transcript) == transcript_version:
+            return summary
+        # Attempt to generate if not found (or outdated) and session data exists
+        # This logic might be better if summary generation is explicitly triggered
+        if await session_service.get_session_data(session_id) and transcript_version:
+            logger.info("Summary not found in store, attempting to generate now", session_id=session_id)
+            # generate_session_summary evaluates the session first if needed
             summary = await session_service.generate_session_summary(session_id)
+        return summary
 
-        if not summary:
-            raise HTTPException(status_code=404, detail=f"Summary for session {session_id} not found.")
-            
-    return summary
+    return await summary_cache.get_or_compute(session_id, transcript_version, load_or_generate_summary)
+
+@app.get("/api/interview/{session_id}/summary", responses=SUMMARY_RESPONSES)
+async def retrieve_interview_summary(session_id: str):
+    """
+    Retrieves a previously generated interview session summary.
+    Served from the summary cache when the transcript hasn't changed since it was generated.
+    """
+    logger.info("Summary retrieval requested", session_id=session_id)
+    cached = await get_cached_summary(session_id)
+    if not cached:
+        raise HTTPException(status_code=404, detail=f"Summary for session {session_id} not found.")
+    return Response(content=cached.json_bytes, media_type="application/json")
+
+@app.get("/api/interview/{session_id}/summary.pdf", response_class=FileResponse)
+async def download_interview_summary_pdf(session_id: str):
+    """
+    Downloads the interview report as a PDF (transcript, score chart, tips).
+    Reports are rendered in a worker process, cached on disk by content and sent as a file.
+    """
+    logger.info("PDF summary requested", session_id=session_id)
+    cached = await get_cached_summary(session_id)
+    if not cached:
+        raise HTTPException(status_code=404, detail=f"Summary for session {session_id} not found.")
+    pdf_path = await pdf_renderer.get_summary_pdf_path(cached.summary, cached.json_bytes)
+    return FileResponse(pdf_path, media_type="application/pdf", filename=f"vocahire-report-{session_id}.pdf")
+
+@app.get("/api/interview/{session_id}/audio-telemetry")
+async def get_audio_telemetry(session_id: str):
+    """Returns counters for the candidate audio received in a session (chunks, bytes, timing)."""
+    telemetry = audio_telemetry.get_audio_telemetry(session_id)
+    if not telemetry:
+        raise HTTPException(status_code=404, detail=f"No audio received for session {session_id}.")
+    return telemetry.summary()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """Stage latency histograms, traffic counters and queue/session gauges in Prometheus text format."""
+    return PlainTextResponse(metrics_service.prometheus_report(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/metrics/latency")
+async def get_latency_metrics():
+    """Returns recent latency percentiles (e.g. time to first audio byte per AI turn)."""
+    return metrics_service.latency_report()
+
+@app.get("/api/metrics/ingest")
+async def get_ingest_metrics():
+    """Returns buffered/dropped audio bytes and backpressure pauses per connected session."""
+    return metrics_service.ingest_report()
+
+@app.get("/api/metrics/protocol")
+async def get_protocol_metrics():
+    """Returns WebSocket messages and bytes per protocol and direction since startup."""
+    return metrics_service.protocol_report()
+
+@app.get("/api/metrics/tts-cache")
+async def get_tts_cache_metrics():
+    """Returns TTS cache hits per tier and misses (empty if the cache is disabled)."""
+    return tts_cache.stats() if tts_cache else {}
+
+@app.get("/api/metrics/stt")
+async def get_stt_metrics():
+    """Returns the STT backend in use and its batching statistics (batches, mean batch size, queue)."""
+    return stt_service.stats()
+
+@app.get("/api/metrics/llm")
+async def get_llm_metrics():
+    """Returns the LLM provider in use with its request, retry and failure counts and current concurrency."""
+    return llm_service.stats()
+
+@app.get("/api/metrics/logging")
+async def get_logging_metrics():
+    """Returns log records waiting for the writer thread and records dropped because the queue was full."""
+    return log.stats()
+
+@app.get("/api/metrics/speculation")
+async def get_speculation_metrics():
+    """Returns how many speculatively prepared replies were used or discarded."""
+    return speculation_service.report()
 
 
 if __name__ == "__main__":
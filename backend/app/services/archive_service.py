@@ -0,0 +1,115 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from backend.app import config
+from backend.app.models.interview_models import SessionSummary, EvaluationMetrics, InterviewTurn
+
+# On-disk archive for finished sessions (SQLite, one zlib-compressed JSON record per session).
+# The lifecycle task moves ended/summarized sessions here and evicts them from the session
+# store; session_service rehydrates them transparently when they are requested again.
+
+
+class SessionArchive:
+    def __init__(self, path: str = config.SESSION_ARCHIVE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Used from the event loop thread (rehydration) and from worker threads (archiving)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS archived_sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " start_time REAL NOT NULL,"
+            " archived_at REAL NOT NULL,"
+            " data BLOB NOT NULL,"
+            " last_active_at REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(archived_sessions)")}
+        if "last_active_at" not in columns: # Archives created before the column existed
+            self._db.execute("ALTER TABLE archived_sessions ADD COLUMN last_active_at REAL")
+        self._db.commit()
+
+    @staticmethod
+    def _encode(metadata: Dict[str, Any], transcript: List[InterviewTurn]) -> bytes:
+        summary: Optional[SessionSummary] = metadata.get("summary")
+        evaluation: Optional[EvaluationMetrics] = metadata.get("evaluation")
+        record = {
+            "metadata": {k: v for k, v in metadata.items() if k not in ("summary", "evaluation")},
+            "evaluation": evaluation.model_dump() if evaluation else None,
+            # The summary's transcript is a prefix of the session transcript; store only its length
+            "summary": summary.model_dump(exclude={"full_transcript"}) if summary else None,
+            "summary_turn_count": len(summary.full_transcript) if summary else 0,
+            "transcript": [(turn.speaker, turn.text, turn.timestamp) for turn in transcript],
+        }
+        return zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def _decode(data: bytes) -> Tuple[Dict[str, Any], List[InterviewTurn]]:
+        record = json.loads(zlib.decompress(data))
+        transcript = [InterviewTurn(speaker=speaker, text=text, timestamp=timestamp) for speaker, text, timestamp in record["transcript"]]
+        metadata = dict(record["metadata"])
+        metadata["evaluation"] = EvaluationMetrics(**record["evaluation"]) if record["evaluation"] else None
+        metadata["summary"] = None
+        if record["summary"]:
+            metadata["summary"] = SessionSummary(**record["summary"], full_transcript=transcript[:record["summary_turn_count"]])
+        return metadata, transcript
+
+    def archive(self, session_id: str, metadata: Dict[str, Any], transcript: List[InterviewTurn]) -> bool:
+        """
+        Stores a session, unless the archive already holds this version of it (same
+        last_active_at), so archiving a session again is a no-op. Returns True if it was written.
+        """
+        last_active_at = metadata.get("last_active_at")
+        with self._lock:
+            row = self._db.execute("SELECT last_active_at FROM archived_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is not None and last_active_at is not None and row[0] == last_active_at:
+            return False
+        data = self._encode(metadata, transcript)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO archived_sessions (session_id, status, start_time, archived_at, data, last_active_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, metadata.get("status", ""), metadata.get("start_time", 0.0), time.time(), data, last_active_at),
+            )
+            self._db.commit()
+        return True
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], List[InterviewTurn]]]:
+        """Returns (metadata, transcript) of an archived session, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT data FROM archived_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def contains(self, session_id: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM archived_sessions WHERE session_id = ?", (session_id,)).fetchone() is not None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_archive: Optional[SessionArchive] = None
+
+def get_archive() -> Optional[SessionArchive]:
+    """Returns the configured archive, opening it on first use (None if archiving is disabled)."""
+    global _archive
+    if not config.SESSION_ARCHIVE_ENABLED:
+        return None
+    if _archive is None:
+        _archive = SessionArchive()
+    return _archive
+
+def close():
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
@@ -0,0 +1,253 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncGenerator, Callable, Mapping, Optional
+import asyncio
+import io
+import threading
+
+import numpy as np
+
+from backend.app import config
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Audio codec stage (requires PyAV for anything but raw PCM).
+#
+# Incoming: browsers' MediaRecorder sends container audio (webm/ogg with Opus). A
+# ContainerDecoder demuxes and decodes it incrementally to 16 kHz mono 16-bit PCM, which is
+# what the VAD and STT consume. Outgoing: TTS audio (16-bit PCM WAV) is encoded to Ogg Opus at
+# the bitrate the client asked for. Codec work runs off the event loop: each decoder in its own
+# thread (it lives for a whole turn), encoding in a shared thread pool.
+#
+# Clients negotiate formats with query parameters on the WebSocket URL:
+#   input_format=pcm_s16le|webm|ogg   output_format=wav|opus   opus_bitrate=<bits per second>
+
+INPUT_PCM = "pcm_s16le"
+# Container formats and the PyAV demuxer that reads them
+CONTAINER_DEMUXERS = {"webm": "matroska", "ogg": "ogg"}
+OUTPUT_WAV = "wav"
+OUTPUT_OPUS = "opus"
+
+NEGOTIATION_PARAMS = ("input_format", "output_format", "opus_bitrate")
+
+
+def starts_container(input_format: str, data: bytes) -> bool:
+    """True if `data` is the beginning of a new recording (EBML header / first Ogg page)."""
+    if input_format == "webm":
+        return data[:4] == b"\x1a\x45\xdf\xa3"
+    if input_format == "ogg":
+        return data[:4] == b"OggS" and len(data) > 5 and bool(data[5] & 0x02)
+    return True
+
+def codec_available() -> bool:
+    try:
+        import av # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass
+class AudioFormat:
+    """Audio formats negotiated for one connection."""
+    input_format: str = INPUT_PCM
+    output_format: str = OUTPUT_WAV
+    opus_bitrate: int = config.OPUS_BITRATE
+
+    @property
+    def output_key(self) -> str:
+        """Identifies the encoded output (e.g. for caching what was sent)."""
+        return f"{OUTPUT_OPUS}@{self.opus_bitrate}" if self.output_format == OUTPUT_OPUS else self.output_format
+
+def negotiate(params: Mapping[str, str]) -> AudioFormat:
+    """
+    Returns the audio formats for a connection from its query parameters.
+    Opus output falls back to WAV if PyAV isn't installed; raises ValueError for an input
+    format that can't be decoded.
+    """
+    audio_format = AudioFormat()
+    input_format = params.get("input_format", INPUT_PCM).lower()
+    if input_format != INPUT_PCM:
+        if input_format not in CONTAINER_DEMUXERS:
+            raise ValueError(f"Unsupported input_format: {input_format}")
+        if not codec_available():
+            raise ValueError(f"input_format {input_format} requires PyAV on the server")
+    audio_format.input_format = input_format
+
+    output_format = params.get("output_format", OUTPUT_WAV).lower()
+    if output_format == OUTPUT_OPUS and codec_available():
+        audio_format.output_format = OUTPUT_OPUS
+    try:
+        bitrate = int(params.get("opus_bitrate", config.OPUS_BITRATE))
+    except ValueError:
+        bitrate = config.OPUS_BITRATE
+    audio_format.opus_bitrate = min(max(bitrate, config.OPUS_MIN_BITRATE), config.OPUS_MAX_BITRATE)
+    return audio_format
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Short encoding jobs only; decoders never occupy these threads
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.AUDIO_CODEC_WORKERS, thread_name_prefix="audio-codec")
+    return _executor
+
+def shutdown():
+    """Stops the encoding threads (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class _BlockingPipe(io.RawIOBase):
+    """
+    File-like object the demuxer reads from; read() blocks until data is fed or the pipe is closed.
+    The writer keeps at most `max_bytes` queued: `on_drain` is called (from the reading thread)
+    when a read makes room in a full pipe.
+    """
+
+    def __init__(self, max_bytes: int, on_drain: Callable[[], None]):
+        self._buffer = bytearray()
+        self.bytes_fed = 0
+        self.max_bytes = max_bytes
+        self._on_drain = on_drain
+        self._closed_for_writing = False
+        self._condition = threading.Condition()
+
+    def readable(self) -> bool:
+        return True
+
+    @property
+    def full(self) -> bool:
+        return len(self._buffer) >= self.max_bytes
+
+    def feed(self, data: bytes):
+        with self._condition:
+            self._buffer += data
+            self.bytes_fed += len(data)
+            self._condition.notify()
+
+    def close_for_writing(self):
+        with self._condition:
+            self._closed_for_writing = True
+            self._condition.notify()
+
+    def readinto(self, target) -> int:
+        with self._condition:
+            while not self._buffer and not self._closed_for_writing:
+                self._condition.wait()
+            was_full = self.full
+            size = min(len(target), len(self._buffer))
+            target[:size] = self._buffer[:size]
+            del self._buffer[:size]
+        if was_full and size:
+            self._on_drain()
+        return size
+
+
+class ContainerDecoder:
+    """
+    Incremental decoder for one turn of container audio.
+
+    `feed()` takes container bytes as they arrive, waiting while VOCAHIRE_AUDIO_DECODER_MAX_PENDING_BYTES
+    are queued so a slow decoder holds up the socket reader rather than buffering without limit;
+    `pcm()` yields 16 kHz mono 16-bit PCM as soon as it is decoded; `close()` marks the end of the
+    input. The demuxer runs in a thread of its own for the whole turn, so concurrent speakers never
+    hold up Opus encoding.
+    """
+
+    def __init__(self, input_format: str, session_id: str, sample_rate: int = config.AUDIO_SAMPLE_RATE,
+                 max_pending_bytes: int = config.AUDIO_DECODER_MAX_PENDING_BYTES):
+        self.demuxer = CONTAINER_DEMUXERS[input_format]
+        self.session_id = session_id
+        self.sample_rate = sample_rate
+        self._loop = asyncio.get_running_loop()
+        self._drained = asyncio.Event()
+        self._finished = False # Set once the decoder thread stops reading
+        self._pipe = _BlockingPipe(max_pending_bytes, on_drain=lambda: self._loop.call_soon_threadsafe(self._drained.set))
+        self._output: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        self._thread = threading.Thread(target=self._decode, name=f"audio-decode-{session_id}", daemon=True)
+        self._thread.start()
+
+    def _emit(self, pcm: Optional[bytes]):
+        self._loop.call_soon_threadsafe(self._output.put_nowait, pcm)
+
+    def _on_finished(self):
+        self._finished = True
+        self._drained.set()
+
+    def _decode(self):
+        # Runs in this decoder's thread
+        import av
+        try:
+            with av.open(self._pipe, mode="r", format=self.demuxer) as container:
+                resampler = av.AudioResampler(format="s16", layout="mono", rate=self.sample_rate)
+                for frame in container.decode(audio=0):
+                    for resampled in resampler.resample(frame):
+                        self._emit(resampled.to_ndarray().tobytes())
+                for resampled in resampler.resample(None):
+                    self._emit(resampled.to_ndarray().tobytes())
+        except Exception as e:
+            # A turn cut short (or a truncated container) ends decoding with what was decoded so far
+            if self._pipe.bytes_fed: # An empty turn (no recording at all) isn't worth reporting
+                logger.warning("Stopped decoding input", session_id=self.session_id, demuxer=self.demuxer, error=str(e))
+        finally:
+            self._loop.call_soon_threadsafe(self._on_finished)
+            self._emit(None)
+
+    async def feed(self, data: bytes):
+        while self._pipe.full and not self._finished:
+            self._drained.clear()
+            if not self._pipe.full: # Drained between the check and the clear
+                break
+            await self._drained.wait()
+        if self._finished:
+            return # Decoding stopped (e.g. a corrupt container); the rest of the turn can't be decoded
+        self._pipe.feed(data)
+
+    def close(self):
+        self._pipe.close_for_writing()
+
+    async def pcm(self) -> AsyncGenerator[bytes, None]:
+        while True:
+            chunk = await self._output.get()
+            if chunk is None:
+                break
+            if chunk:
+                yield chunk
+
+
+def _wav_to_pcm(wav: bytes) -> tuple:
+    import wave
+    with wave.open(io.BytesIO(wav)) as reader:
+        return reader.readframes(reader.getnframes()), reader.getframerate(), reader.getnchannels()
+
+def encode_opus_sync(wav: bytes, bitrate: int) -> bytes:
+    """Encodes a 16-bit PCM WAV file to an Ogg Opus file (blocking; runs in the codec pool)."""
+    import av
+    pcm, sample_rate, channels = _wav_to_pcm(wav)
+    samples = np.frombuffer(pcm, dtype="<i2").reshape(1, -1)
+    output = io.BytesIO()
+    with av.open(output, mode="w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=48000)
+        stream.bit_rate = bitrate
+        stream.layout = "mono" if channels == 1 else "stereo"
+        frame = av.AudioFrame.from_ndarray(samples, format="s16", layout=stream.layout)
+        frame.sample_rate = sample_rate
+        # The encoder resamples to Opus' 48 kHz and cuts the audio into codec frames
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return output.getvalue()
+
+async def encode_for_client(wav: bytes, audio_format: AudioFormat) -> bytes:
+    """Returns TTS audio in the connection's output format."""
+    if audio_format.output_format != OUTPUT_OPUS:
+        return wav
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), encode_opus_sync, wav, audio_format.opus_bitrate)
@@ -0,0 +1,299 @@
+from typing import AsyncGenerator, List, Optional
+import asyncio
+import time
+
+from fastapi import WebSocketDisconnect
+
+from backend.app import config
+from backend.app.services import audio_codec, audio_telemetry, metrics_service
+from backend.app.services.audio_codec import ContainerDecoder
+from backend.app.services.ws_protocol import END_OF_STREAM, InterviewChannel
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Audio ingest stage between the WebSocket and STT.
+# A reader task receives audio from the connection's channel (any protocol, see ws_protocol) into a preallocated ring buffer while STT
+# consumes from it at its own pace. The buffer is bounded: once it reaches the high-water
+# mark the overflow policy decides whether to stop reading the socket (backpressure) or to
+# drop audio, so a slow STT backend can't make worker memory grow without limit.
+
+POLICY_PAUSE = "pause"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_NEWEST = "drop_newest"
+OVERFLOW_POLICIES = (POLICY_PAUSE, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST)
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity byte ring buffer.
+
+    Writes copy into a preallocated bytearray through a memoryview; reads copy out at most
+    two contiguous slices. No per-chunk concatenation or reallocation happens.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._read_pos = 0
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self._size
+
+    def clear(self):
+        self._read_pos = 0
+        self._size = 0
+
+    def write(self, data: bytes, overwrite: bool = False) -> int:
+        """
+        Copies `data` into the buffer and returns the number of bytes dropped.
+
+        With `overwrite` the oldest buffered bytes make room for new data; otherwise the
+        part of `data` that doesn't fit is dropped.
+        """
+        source = memoryview(data)
+        dropped = 0
+        if len(source) > self.capacity:
+            # Only the newest `capacity` bytes can ever be kept
+            excess = len(source) - self.capacity
+            if overwrite:
+                source = source[excess:]
+            else:
+                source = source[:self.capacity]
+            dropped += excess
+        if len(source) > self.free:
+            if overwrite:
+                overflow = len(source) - self.free
+                self._read_pos = (self._read_pos + overflow) % self.capacity
+                self._size -= overflow
+                dropped += overflow
+            else:
+                dropped += len(source) - self.free
+                source = source[:self.free]
+
+        write_pos = (self._read_pos + self._size) % self.capacity
+        first = min(len(source), self.capacity - write_pos)
+        self._view[write_pos:write_pos + first] = source[:first]
+        if first < len(source):
+            self._view[:len(source) - first] = source[first:]
+        self._size += len(source)
+        return dropped
+
+    def discard(self, count: int) -> int:
+        """Drops up to `count` of the oldest buffered bytes and returns how many were dropped."""
+        count = min(count, self._size)
+        self._read_pos = (self._read_pos + count) % self.capacity
+        self._size -= count
+        return count
+
+    def read(self, max_bytes: int) -> bytes:
+        """Removes and returns up to `max_bytes` of the oldest buffered data."""
+        count = min(max_bytes, self._size)
+        out = bytearray(count)
+        first = min(count, self.capacity - self._read_pos)
+        out[:first] = self._view[self._read_pos:self._read_pos + first]
+        if first < count:
+            out[first:] = self._view[:count - first]
+        self._read_pos = (self._read_pos + count) % self.capacity
+        self._size -= count
+        return bytes(out)
+
+
+class AudioIngest:
+    """
+    Per-connection ingest stage: one ring buffer reused for every candidate turn.
+
+    `stream_turn()` starts a socket reader for the turn and yields buffered audio to STT
+    until the client ends the turn, the connection closes, or the consumer stops.
+    """
+
+    def __init__(self, channel: InterviewChannel, session_id: str,
+                 capacity: int = config.INGEST_BUFFER_BYTES,
+                 high_water_mark: int = config.INGEST_HIGH_WATER_BYTES,
+                 low_water_mark: int = config.INGEST_LOW_WATER_BYTES,
+                 overflow_policy: str = config.INGEST_OVERFLOW_POLICY,
+                 max_read_bytes: int = config.INGEST_MAX_READ_BYTES,
+                 input_format: str = audio_codec.INPUT_PCM,
+                 stale_audio_grace_ms: float = config.INGEST_STALE_AUDIO_GRACE_MS):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown ingest overflow policy: {overflow_policy!r}")
+        self.channel = channel
+        self.session_id = session_id
+        self.ring = AudioRingBuffer(capacity)
+        self.high_water_mark = min(high_water_mark, capacity)
+        self.low_water_mark = min(low_water_mark, self.high_water_mark)
+        self.overflow_policy = overflow_policy
+        self.max_read_bytes = max_read_bytes
+        self.input_format = input_format
+        self.stale_audio_grace_seconds = stale_audio_grace_ms / 1000
+
+        self.end_message: Optional[str] = None # Control message that ended the last turn
+        self.disconnected = False
+        self._data_available = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._eof = False
+        self._chunk_index = 0
+        self._container_started = False
+        self._buffered_since: Optional[float] = None # When the buffer last became non-empty
+
+    def _update_gauge(self):
+        metrics_service.set_ingest_buffered_bytes(self.session_id, self.ring.size)
+
+    def _buffer_audio(self, audio_chunk: bytes):
+        dropped = 0
+        excess = self.ring.size + len(audio_chunk) - self.high_water_mark
+        if excess > 0 and self.overflow_policy == POLICY_DROP_OLDEST:
+            dropped += self.ring.discard(min(excess, self.ring.size))
+        elif excess > 0 and self.overflow_policy == POLICY_DROP_NEWEST:
+            keep = max(0, len(audio_chunk) - excess)
+            dropped += len(audio_chunk) - keep
+            audio_chunk = audio_chunk[:keep]
+        # With the pause policy the reader waits for a drain before receiving, so only
+        # a single oversized chunk can exceed the free space here
+        dropped += self.ring.write(audio_chunk, overwrite=self.overflow_policy == POLICY_DROP_OLDEST)
+        if dropped:
+            metrics_service.record_ingest_dropped_bytes(self.session_id, dropped)
+        if self._buffered_since is None and self.ring.size:
+            self._buffered_since = time.perf_counter()
+        self._update_gauge()
+        self._data_available.set()
+
+    async def _pump_decoded(self, decoder: ContainerDecoder):
+        async for pcm in decoder.pcm():
+            self._buffer_audio(pcm)
+
+    async def _receive_audio(self, audio_chunk: bytes, decoder: Optional[ContainerDecoder]):
+        if decoder:
+            if not self._container_started and not audio_codec.starts_container(self.input_format, audio_chunk):
+                # The tail of the previous recording (its turn was ended by the VAD): it can't be
+                # decoded without its container header, and it doesn't belong to this turn anyway
+                metrics_service.record_ingest_dropped_bytes(self.session_id, len(audio_chunk))
+                return
+            self._container_started = True
+            await decoder.feed(audio_chunk)
+        else:
+            self._buffer_audio(audio_chunk)
+        self._chunk_index += 1
+
+    async def _read_socket(self, skip_stale_end_of_stream: bool):
+        # Container input (webm/ogg) is decoded to PCM in a decoder thread as it arrives; one decoder per turn,
+        # since the client starts a new recording (and container) for every answer
+        decoder = ContainerDecoder(self.input_format, self.session_id) if self.input_format != audio_codec.INPUT_PCM else None
+        pump = asyncio.create_task(self._pump_decoded(decoder)) if decoder else None
+        self._container_started = False
+        held: List[bytes] = [] # Audio that may still be the rest of the previous answer (see stream_turn)
+        stale_deadline = time.monotonic() + self.stale_audio_grace_seconds
+        try:
+            while True:
+                if self.overflow_policy == POLICY_PAUSE and self.ring.size >= self.high_water_mark:
+                    # Stop reading the socket so the client is slowed down by TCP flow control
+                    metrics_service.record_ingest_pause(self.session_id)
+                    self._drained.clear()
+                    await self._drained.wait()
+                message = await self.channel.receive()
+                if message is None:
+                    continue
+                if message.audio is not None:
+                    audio_telemetry.record_audio_chunk(self.session_id, len(message.audio))
+                if skip_stale_end_of_stream:
+                    moved_on = ((message.turn is not None and message.turn == self.channel.turn) # Tagged with this turn
+                                or (decoder is not None and message.audio is not None
+                                    and audio_codec.starts_container(self.input_format, message.audio)) # A new recording
+                                or time.monotonic() >= stale_deadline)
+                    if not moved_on and message.control == END_OF_STREAM:
+                        # The previous answer's END_OF_STREAM: the audio held back was the rest of that answer
+                        metrics_service.record_ingest_dropped_bytes(self.session_id, sum(len(chunk) for chunk in held))
+                        held.clear()
+                        skip_stale_end_of_stream = False
+                        continue
+                    if not moved_on and message.audio is not None:
+                        held.append(message.audio)
+                        continue
+                    # This turn's answer (the client doesn't always end a VAD-ended answer with END_OF_STREAM)
+                    skip_stale_end_of_stream = False
+                    for audio_chunk in held:
+                        await self._receive_audio(audio_chunk, decoder)
+                    held.clear()
+                if message.audio is not None:
+                    await self._receive_audio(message.audio, decoder)
+                elif message.control is not None:
+                    # Client ends its audio for this turn / the interview
+                    logger.debug("Client signaled end of audio", session_id=self.session_id, control=message.control)
+                    self.end_message = message.control
+                    if decoder:
+                        # Let the decoder finish the turn's audio before signalling the end of the stream
+                        decoder.close()
+                        await pump
+                    break
+        except WebSocketDisconnect:
+            logger.info("Client disconnected during audio streaming", session_id=self.session_id)
+            self.disconnected = True
+        except Exception as e:
+            logger.error("Error receiving audio", session_id=self.session_id, error=str(e))
+            self.disconnected = True
+        finally:
+            if decoder:
+                decoder.close()
+                if not pump.done():
+                    pump.cancel()
+            self._eof = True
+            self._data_available.set()
+
+    async def stream_turn(self, skip_stale_end_of_stream: bool = False) -> AsyncGenerator[bytes, None]:
+        """
+        Yields the candidate's audio for one turn.
+
+        If the server ended the previous turn itself (VAD end of turn), the client may still send the
+        rest of that answer and its END_OF_STREAM. With `skip_stale_end_of_stream`, audio at the start
+        of the turn is held back: if that END_OF_STREAM arrives, the held audio is dropped with it
+        instead of becoming the start (and end) of this turn. Otherwise it is this turn's audio after
+        all, once `stale_audio_grace_ms` have passed, a new recording starts or a message is tagged
+        with this turn (framed protocol).
+        """
+        self.ring.clear()
+        self.end_message = None
+        self._eof = False
+        self._chunk_index = 0
+        self._buffered_since = None
+        self._data_available.clear()
+        reader = asyncio.create_task(self._read_socket(skip_stale_end_of_stream))
+        try:
+            while True:
+                if self.ring.size:
+                    audio_chunk = self.ring.read(self.max_read_bytes)
+                    # Wait of the oldest byte read; audio left after a partial read keeps the same
+                    # start, so its wait is over- rather than under-estimated
+                    metrics_service.observe_stage("audio_ingest", time.perf_counter() - self._buffered_since)
+                    if not self.ring.size:
+                        self._buffered_since = None
+                    if self.ring.size <= self.low_water_mark:
+                        self._drained.set()
+                    self._update_gauge()
+                    yield audio_chunk
+                elif self._eof:
+                    break
+                else:
+                    self._data_available.clear()
+                    await self._data_available.wait()
+        finally:
+            if not reader.done():
+                reader.cancel()
+                try:
+                    await reader
+                except asyncio.CancelledError:
+                    pass
+            self.ring.clear()
+            self._update_gauge()
+            logger.debug("Audio stream for turn finished", session_id=self.session_id, chunks=self._chunk_index)
+
+    def close(self):
+        metrics_service.discard_ingest_session(self.session_id)
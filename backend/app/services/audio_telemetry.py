@@ -0,0 +1,60 @@
+from array import array
+from typing import Dict, Optional
+import time
+
+from backend.app import config
+from backend.app.services.ttl_cache import TTLCache
+
+# Compact per-session record of the candidate audio received.
+# Kept apart from the transcript, which only holds real speech turns: a chunk costs
+# 12 bytes in two typed arrays instead of a pydantic InterviewTurn. Entries are dropped when the
+# session is evicted; the registry is also bounded (AUDIO_TELEMETRY_*), so sessions this worker
+# never evicts (e.g. resumed on another worker) expire instead of accumulating.
+
+
+class AudioTelemetry:
+    """Array-backed counters of received audio chunks (size and arrival time)."""
+
+    __slots__ = ("chunk_sizes", "arrival_times", "total_bytes")
+
+    def __init__(self):
+        self.chunk_sizes = array("I") # Bytes per chunk
+        self.arrival_times = array("d") # Unix timestamp per chunk
+        self.total_bytes = 0
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunk_sizes)
+
+    def record_chunk(self, size: int, arrived_at: Optional[float] = None):
+        self.chunk_sizes.append(size)
+        self.arrival_times.append(arrived_at if arrived_at is not None else time.time())
+        self.total_bytes += size
+
+    def summary(self) -> Dict[str, float]:
+        first = self.arrival_times[0] if self.arrival_times else 0.0
+        last = self.arrival_times[-1] if self.arrival_times else 0.0
+        return {
+            "chunk_count": self.chunk_count,
+            "total_bytes": self.total_bytes,
+            "first_chunk_at": first,
+            "last_chunk_at": last,
+            "streaming_seconds": round(last - first, 3),
+        }
+
+
+session_audio_telemetry: TTLCache[str, AudioTelemetry] = TTLCache(
+    max_size=config.AUDIO_TELEMETRY_MAX_SESSIONS, ttl_seconds=config.AUDIO_TELEMETRY_TTL_SECONDS)
+
+def record_audio_chunk(session_id: str, size: int):
+    telemetry = session_audio_telemetry.get(session_id)
+    if telemetry is None:
+        telemetry = AudioTelemetry()
+        session_audio_telemetry.set(session_id, telemetry)
+    telemetry.record_chunk(size)
+
+def get_audio_telemetry(session_id: str) -> Optional[AudioTelemetry]:
+    return session_audio_telemetry.get(session_id)
+
+def discard_session(session_id: str):
+    session_audio_telemetry.pop(session_id)
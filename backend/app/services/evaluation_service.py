@@ -1,41 +1,148 @@
-from typing import List, Dict
-import random
-from backend.app.models.interview_models import EvaluationMetrics, InterviewTurn
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Sequence, Set, Tuple
 import asyncio
+import multiprocessing
+import re
 
-# Placeholder for the Evaluation Engine
+import numpy as np
 
-async def analyze_transcript(full_transcript: List[InterviewTurn], session_id: str) -> EvaluationMetrics:
-    """
-    Placeholder for analyzing the full interview transcript.
-    This service would calculate various metrics based on the candidate's responses.
-    
-    Args:
-        full_transcript: A list of InterviewTurn objects representing the conversation.
-        session_id: The session ID for context.
+from backend.app import config
+from backend.app.models.interview_models import EvaluationMetrics, InterviewTurn
+from backend.app.services.ttl_cache import TTLCache
+from backend.app.log import get_logger
 
-    Returns:
-        An EvaluationMetrics object.
+logger = get_logger(__name__)
+
+# Evaluation Engine
+# Deterministic text metrics computed over all candidate turns at once:
+#   - filler-word rate            -> clarity, confidence
+#   - words per minute            -> clarity (from InterviewTurn timestamps)
+#   - lexical diversity           -> depth
+#   - keyword coverage            -> relevance, keyword_match_score
+#   - answer length distribution  -> depth, confidence, answer_length_score
+# Metrics are kept up to date per session as turns are added (EvaluationAccumulator), so a
+# summary only has to finalize them. Full analysis (e.g. for sessions recorded by another
+# worker) runs in a process pool so it never blocks the event loop, and many sessions can
+# be scored in a single batch call.
+
+ROLE_KEYWORDS: Dict[str, Set[str]] = {
+    "general": {
+        "experience", "skill", "skills", "team", "project", "lead", "led", "result", "results",
+        "learn", "learned", "challenge", "goal", "communication", "problem", "solution",
+        "responsibility", "achievement", "collaborate", "improve", "impact", "customer",
+    },
+    "software_engineer": {
+        "experience", "project", "team", "design", "architecture", "code", "testing", "tests",
+        "debug", "performance", "scalability", "api", "database", "deploy", "review",
+        "python", "javascript", "cloud", "latency", "refactor", "problem", "solution",
+    },
+    "sales": {
+        "experience", "customer", "customers", "client", "quota", "pipeline", "revenue",
+        "negotiate", "relationship", "target", "deal", "deals", "prospect", "team", "goal",
+    },
+}
+
+FILLER_WORDS = {"um", "uh", "erm", "ah", "hmm", "like", "basically", "actually", "literally", "so"}
+FILLER_PHRASES = ("you know", "i mean", "kind of", "sort of")
+
+IDEAL_ANSWER_WORDS = (30, 120) # Answers in this range count as well-sized
+IDEAL_WPM = (110, 170)
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_FILLER_PHRASE_RE = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in FILLER_PHRASES) + r")\b")
+
+# Plain data passed to worker processes: (speaker, text, timestamp)
+TurnTuple = Tuple[str, str, float]
+
+
+@dataclass
+class TranscriptFeatures:
+    """
+    Additive aggregates over candidate turns. Everything the metrics need is a sum, a count
+    or a set union, so features can be computed in one vectorised pass or accumulated turn by turn.
     """
-    print(f"[Evaluation Service - Session {session_id}] Analyzing transcript with {len(full_transcript)} turns.")
-    
-    # Simulate analysis delay
-    await asyncio.sleep(1 + random.uniform(0, 0.5))
-
-    candidate_responses = [turn.text for turn in full_transcript if turn.speaker == "Candidate"]
-    
-    # Simulated metrics - replace with actual analysis logic
-    clarity = random.uniform(0.5, 0.95)
-    confidence = random.uniform(0.6, 0.98)
-    relevance = random.uniform(0.5, 0.9)
-    depth = random.uniform(0.4, 0.85)
-    
-    num_keywords_found = sum(1 for response in candidate_responses if "experience" in response.lower() or "skill" in response.lower())
-    keyword_match_score = min(1.0, num_keywords_found / (len(candidate_responses) + 1e-6)) # Avoid division by zero
-    
-    avg_response_length = sum(len(r.split()) for r in candidate_responses) / (len(candidate_responses) + 1e-6)
-    # Assume ideal length is 50 words, score based on proximity
-    answer_length_score = max(0, 1 - abs(avg_response_length - 50) / 50)
+    answer_count: int = 0
+    total_words: int = 0
+    total_words_squared: int = 0
+    filler_count: int = 0
+    speaking_seconds: float = 0.0
+    answers_in_ideal_range: int = 0
+    answers_with_keyword: int = 0
+    vocabulary: Set[str] = field(default_factory=set)
+    keywords_hit: Set[str] = field(default_factory=set)
+
+
+# A candidate turn is recorded when its transcript is final; the time since the previous
+# turn approximates how long the candidate spoke. Clipped to ignore long pauses/reconnects.
+ANSWER_DURATION_BOUNDS = (1.0, 300.0)
+
+def _answer_durations(timestamps: np.ndarray, previous_timestamps: np.ndarray) -> np.ndarray:
+    return np.clip(timestamps - previous_timestamps, *ANSWER_DURATION_BOUNDS)
+
+def _count_fillers(text: str, tokens: List[str]) -> int:
+    return sum(1 for w in tokens if w in FILLER_WORDS) + len(_FILLER_PHRASE_RE.findall(text))
+
+def extract_features(turns: Sequence[TurnTuple], keywords: Set[str]) -> TranscriptFeatures:
+    """Computes TranscriptFeatures for all candidate turns of a transcript in one pass."""
+    features = TranscriptFeatures()
+    candidate_indices = [i for i, (speaker, _, _) in enumerate(turns) if speaker == "Candidate"]
+    if not candidate_indices:
+        return features
+
+    texts = [turns[i][1].lower() for i in candidate_indices]
+    tokens = [_WORD_RE.findall(text) for text in texts]
+    word_counts = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+    filler_counts = np.fromiter((_count_fillers(text, t) for t, text in zip(tokens, texts)), dtype=np.int64, count=len(tokens))
+    keyword_hits = [keywords.intersection(t) for t in tokens]
+
+    all_timestamps = np.fromiter((turn[2] for turn in turns), dtype=np.float64, count=len(turns))
+    indices = np.asarray(candidate_indices)
+    previous = all_timestamps[np.maximum(indices - 1, 0)]
+    durations = np.where(indices > 0, _answer_durations(all_timestamps[indices], previous), 0.0)
+
+    low, high = IDEAL_ANSWER_WORDS
+    features.answer_count = len(candidate_indices)
+    features.total_words = int(word_counts.sum())
+    features.total_words_squared = int((word_counts * word_counts).sum())
+    features.filler_count = int(filler_counts.sum())
+    features.speaking_seconds = float(durations.sum())
+    features.answers_in_ideal_range = int(np.count_nonzero((word_counts >= low) & (word_counts <= high)))
+    features.answers_with_keyword = sum(1 for hits in keyword_hits if hits)
+    features.vocabulary = set().union(*tokens)
+    features.keywords_hit = set().union(*keyword_hits)
+    return features
+
+def _band_score(value: float, ideal: Tuple[float, float], tolerance: float) -> float:
+    """1.0 inside the ideal band, falling linearly to 0.0 `tolerance` outside it."""
+    low, high = ideal
+    if low <= value <= high:
+        return 1.0
+    distance = low - value if value < low else value - high
+    return max(0.0, 1.0 - distance / tolerance)
+
+def metrics_from_features(features: TranscriptFeatures, keyword_set_size: int) -> Dict[str, float]:
+    """Turns aggregated features into the (rounded) EvaluationMetrics fields."""
+    if features.answer_count == 0 or features.total_words == 0:
+        return {name: 0.0 for name in EvaluationMetrics.model_fields}
+
+    n = features.answer_count
+    mean_words = features.total_words / n
+    variance = max(0.0, features.total_words_squared / n - mean_words * mean_words)
+    length_cv = (variance ** 0.5) / mean_words # Consistency of answer lengths
+
+    filler_rate = features.filler_count / features.total_words
+    wpm = features.total_words / (features.speaking_seconds / 60) if features.speaking_seconds else 0.0
+    wpm_score = _band_score(wpm, IDEAL_WPM, 80) if wpm else 0.5 # No timing info: neutral
+    # Guiraud's index (types / sqrt(tokens)) is less length-biased than a plain type-token ratio
+    lexical_diversity = min(1.0, len(features.vocabulary) / (features.total_words ** 0.5) / 7.0)
+    keyword_coverage = min(1.0, len(features.keywords_hit) / max(1, min(keyword_set_size, 8)))
+
+    clarity = 0.6 * max(0.0, 1 - filler_rate / 0.10) + 0.4 * wpm_score
+    confidence = 0.7 * max(0.0, 1 - filler_rate / 0.08) + 0.3 * max(0.0, 1 - min(1.0, length_cv))
+    relevance = 0.5 * (features.answers_with_keyword / n) + 0.5 * keyword_coverage
+    depth = 0.5 * lexical_diversity + 0.5 * min(1.0, mean_words / 80)
+    keyword_match_score = keyword_coverage
+    answer_length_score = 0.5 * (features.answers_in_ideal_range / n) + 0.5 * _band_score(mean_words, IDEAL_ANSWER_WORDS, 50)
 
     # Simple weighted average for overall score
     overall_score = (
@@ -46,16 +153,158 @@ async def analyze_transcript(full_transcript: List[InterviewTurn], session_id: s
         0.15 * keyword_match_score +
         0.10 * answer_length_score
     )
-    
-    metrics = EvaluationMetrics(
-        clarity=round(clarity, 2),
-        confidence=round(confidence, 2),
-        relevance=round(relevance, 2),
-        depth=round(depth, 2),
-        keyword_match_score=round(keyword_match_score, 2),
-        answer_length_score=round(answer_length_score, 2),
-        overall_score=round(overall_score, 2)
-    )
-    
-    print(f"[Evaluation Service - Session {session_id}] Analysis complete. Overall score: {metrics.overall_score}")
+    return {
+        "clarity": round(clarity, 2),
+        "confidence": round(confidence, 2),
+        "relevance": round(relevance, 2),
+        "depth": round(depth, 2),
+        "keyword_match_score": round(keyword_match_score, 2),
+        "answer_length_score": round(answer_length_score, 2),
+        "overall_score": round(overall_score, 2),
+    }
+
+def get_role_keywords(role: str) -> Set[str]:
+    return ROLE_KEYWORDS.get(role, ROLE_KEYWORDS["general"])
+
+def score_turns(turns: Sequence[TurnTuple], role: str = config.EVALUATION_ROLE) -> Dict[str, float]:
+    keywords = get_role_keywords(role)
+    return metrics_from_features(extract_features(turns, keywords), len(keywords))
+
+def _score_batch(batch: List[Tuple[str, List[TurnTuple]]], role: str) -> Dict[str, Dict[str, float]]:
+    # Runs in a worker process
+    return {session_id: score_turns(turns, role) for session_id, turns in batch}
+
+def _to_tuples(transcript: Sequence[InterviewTurn]) -> List[TurnTuple]:
+    return [(turn.speaker, turn.text, turn.timestamp) for turn in transcript]
+
+
+class EvaluationAccumulator:
+    """
+    Running TranscriptFeatures for one session, updated as each turn is added.
+
+    Produces the same metrics as a full analysis of the transcript, but finalizing it is
+    O(1) in the transcript length, so the summary is ready as soon as the interview ends.
+    """
+
+    def __init__(self, role: str = config.EVALUATION_ROLE):
+        self.keywords = get_role_keywords(role)
+        self.features = TranscriptFeatures()
+        self.turns_seen = 0
+        self._last_timestamp: Optional[float] = None
+
+    def add_turn(self, speaker: str, text: str, timestamp: float):
+        if speaker == "Candidate":
+            lowered = text.lower()
+            tokens = _WORD_RE.findall(lowered)
+            word_count = len(tokens)
+            hits = self.keywords.intersection(tokens)
+            features = self.features
+            features.answer_count += 1
+            features.total_words += word_count
+            features.total_words_squared += word_count * word_count
+            features.filler_count += _count_fillers(lowered, tokens)
+            if self._last_timestamp is not None:
+                low, high = ANSWER_DURATION_BOUNDS
+                features.speaking_seconds += min(max(timestamp - self._last_timestamp, low), high)
+            low, high = IDEAL_ANSWER_WORDS
+            features.answers_in_ideal_range += int(low <= word_count <= high)
+            features.answers_with_keyword += int(bool(hits))
+            features.vocabulary.update(tokens)
+            features.keywords_hit.update(hits)
+        self._last_timestamp = timestamp
+        self.turns_seen += 1
+
+    def finalize(self) -> EvaluationMetrics:
+        return EvaluationMetrics(**metrics_from_features(self.features, len(self.keywords)))
+
+
+# Accumulators of sessions whose turns were added in this worker
+accumulators: TTLCache[str, EvaluationAccumulator] = TTLCache(
+    max_size=config.EVALUATION_ACCUMULATOR_MAX_SESSIONS, ttl_seconds=config.EVALUATION_ACCUMULATOR_TTL_SECONDS
+)
+
+def record_turn(session_id: str, turn: InterviewTurn, turn_index: int):
+    """
+    Updates the session's accumulator with a new transcript turn.
+    `turn_index` is the turn's position in the transcript; an accumulator is only started at index 0
+    so it always covers the whole transcript.
+    """
+    accumulator = accumulators.get(session_id)
+    if accumulator is None:
+        if turn_index != 0:
+            return # Session started elsewhere (another worker, before a restart); use a full analysis
+        accumulator = EvaluationAccumulator()
+        accumulators.set(session_id, accumulator)
+    if accumulator.turns_seen != turn_index:
+        accumulators.pop(session_id) # Missed a turn; the running state can't be trusted anymore
+        return
+    accumulator.add_turn(turn.speaker, turn.text, turn.timestamp)
+
+def finalize_session(session_id: str, transcript_length: int) -> Optional[EvaluationMetrics]:
+    """
+    Returns the metrics from the session's running state, or None if this worker hasn't
+    seen all `transcript_length` turns (the caller should fall back to analyze_transcript).
+    """
+    accumulator = accumulators.get(session_id)
+    if accumulator is None or accumulator.turns_seen != transcript_length:
+        return None
+    return accumulator.finalize()
+
+def discard_session(session_id: str):
+    accumulators.pop(session_id)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    global _process_pool
+    if config.EVALUATION_WORKERS <= 0:
+        return None # Score in the default thread pool instead
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=config.EVALUATION_WORKERS,
+                                            mp_context=multiprocessing.get_context(config.PROCESS_START_METHOD))
+    return _process_pool
+
+def shutdown():
+    """Stops the evaluation worker processes (called on application shutdown)."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+async def analyze_transcripts_batch(transcripts: Dict[str, Sequence[InterviewTurn]], role: str = config.EVALUATION_ROLE) -> Dict[str, EvaluationMetrics]:
+    """
+    Scores many sessions in a single call to a worker process.
+
+    Args:
+        transcripts: Transcript per session ID.
+        role: Key into ROLE_KEYWORDS used for keyword coverage.
+
+    Returns:
+        EvaluationMetrics per session ID.
+    """
+    if not transcripts:
+        return {}
+    batch = [(session_id, _to_tuples(transcript)) for session_id, transcript in transcripts.items()]
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(_get_process_pool(), _score_batch, batch, role)
+    return {session_id: EvaluationMetrics(**metrics) for session_id, metrics in results.items()}
+
+async def analyze_transcript(full_transcript: List[InterviewTurn], session_id: str, role: str = config.EVALUATION_ROLE) -> EvaluationMetrics:
+    """
+    Analyzes the full interview transcript off the event loop.
+    Calculates the metrics from the candidate's responses (see module notes).
+
+    Args:
+        full_transcript: A list of InterviewTurn objects representing the conversation.
+        session_id: The session ID for context.
+        role: Key into ROLE_KEYWORDS used for keyword coverage.
+
+    Returns:
+        An EvaluationMetrics object.
+    """
+    logger.info("Analyzing transcript", session_id=session_id, turns=len(full_transcript))
+    results = await analyze_transcripts_batch({session_id: full_transcript}, role)
+    metrics = results[session_id]
+    logger.info("Analysis complete", session_id=session_id, overall_score=metrics.overall_score)
     return metrics
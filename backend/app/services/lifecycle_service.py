@@ -0,0 +1,114 @@
+from typing import Callable, Optional
+import asyncio
+import time
+
+from backend.app import config
+from backend.app.services import (
+    archive_service,
+    audio_telemetry,
+    evaluation_service,
+    llm_service,
+    metrics_service,
+    session_service,
+    tts_service,
+)
+from backend.app.services.summary_cache import summary_cache
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Session lifecycle manager.
+# A background task periodically archives sessions that have ended (or been summarized)
+# for longer than the retention period, or that were abandoned while active, and evicts
+# them from the session store and from this worker's per-session caches. Archived
+# sessions are rehydrated on demand by session_service. Sessions whose client disconnected
+# and didn't resume within SESSION_RESUME_WINDOW_SECONDS are ended first.
+
+ENDED_STATUSES = ("ended_pending_summary", "summarized")
+
+
+def _is_expired(session_data: dict, now: float) -> bool:
+    status = session_data.get("status")
+    if status in ENDED_STATUSES:
+        last_active_at = session_data.get("last_active_at") or session_data.get("start_time", now)
+        return now - last_active_at > config.SESSION_RETENTION_SECONDS
+    return now - session_data.get("start_time", now) > config.SESSION_MAX_AGE_SECONDS
+
+def _resume_window_passed(session_data: dict, now: float) -> bool:
+    disconnected_at = session_data.get("disconnected_at")
+    return (session_data.get("status") == "active" and disconnected_at is not None
+            and now - disconnected_at > config.SESSION_RESUME_WINDOW_SECONDS)
+
+def discard_worker_state(session_id: str):
+    """Drops everything this worker keeps in memory for a session."""
+    llm_service.discard_interview_state(session_id)
+    evaluation_service.discard_session(session_id)
+    audio_telemetry.discard_session(session_id)
+    tts_service.discard_session(session_id)
+    metrics_service.discard_session(session_id)
+    summary_cache.invalidate(session_id)
+
+async def sweep(is_connected: Callable[[str], bool] = lambda session_id: False) -> int:
+    """
+    Archives and evicts expired sessions once. Returns the number of sessions evicted.
+
+    Args:
+        is_connected: Tells whether a session has a live WebSocket in this worker; those are never evicted.
+    """
+    archive = archive_service.get_archive()
+    now = time.time()
+    evicted = 0
+    for session_id in await session_service.list_session_ids():
+        if is_connected(session_id):
+            continue
+        snapshot = await session_service.snapshot_session(session_id)
+        if snapshot is not None and _resume_window_passed(snapshot[0], now):
+            # The client never came back: end the interview so it follows the normal retention
+            await session_service.end_session(session_id)
+            continue
+        if snapshot is None or not _is_expired(snapshot[0], now):
+            continue
+        if snapshot[0].get("status") == "active":
+            # Abandoned past SESSION_MAX_AGE_SECONDS: end it so it can be evicted once archived
+            await session_service.end_session(session_id)
+            snapshot = await session_service.snapshot_session(session_id)
+            if snapshot is None:
+                continue
+        session_data, transcript = snapshot
+        if archive:
+            # SQLite writes happen off the event loop
+            await asyncio.to_thread(archive.archive, session_id, session_data, transcript)
+        if await session_service.evict_session(session_id, session_data.get("last_active_at")):
+            discard_worker_state(session_id)
+            evicted += 1
+    if evicted:
+        logger.info("Archived and evicted sessions", sessions=evicted)
+    return evicted
+
+async def run(is_connected: Callable[[str], bool] = lambda session_id: False,
+              interval_seconds: float = config.LIFECYCLE_INTERVAL_SECONDS):
+    """Runs `sweep()` every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await sweep(is_connected)
+        except Exception as e:
+            logger.exception("Error during session sweep")
+
+_task: Optional[asyncio.Task] = None
+
+def start(is_connected: Callable[[str], bool] = lambda session_id: False):
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(run(is_connected))
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    archive_service.close()
@@ -0,0 +1,236 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, List, Optional
+import asyncio
+import json
+import random
+
+from backend.app import config
+from backend.app.services import simulation
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# LLM providers.
+#
+# llm_service decides what the interviewer should do next and builds an LLMRequest; a provider
+# streams the response text. Providers are selected with VOCAHIRE_LLM_PROVIDER:
+#   "simulated": streams the scripted response word by word, no API calls (default)
+#   "gemini": the Gemini REST API (streamGenerateContent over server-sent events), through one
+#             pooled httpx.AsyncClient per worker, with timeouts, jittered retries and a
+#             per-provider concurrency limit.
+
+
+class LLMProviderError(RuntimeError):
+    pass
+
+
+@dataclass
+class LLMRequest:
+    system_instruction: str
+    messages: List[Dict[str, str]] = field(default_factory=list) # {"role": "AI"|"user"|"system", "content": ...}
+    scripted_response: str = "" # What the scripted interviewer would say (used by the simulator)
+    # The response must be exactly `scripted_response` (greeting, closing line); nothing is generated
+    fixed_response: bool = False
+    session_id: str = ""
+
+
+class LLMProvider(ABC):
+    name = ""
+    # True if responses are the scripted lines, so they can be generated before the candidate's answer is known
+    scripted = False
+
+    async def start(self):
+        """Prepares the provider (called on application startup)."""
+
+    @abstractmethod
+    def stream(self, request: LLMRequest) -> AsyncGenerator[str, None]:
+        """Yields the response text in chunks as it is generated."""
+
+    def stats(self) -> Dict[str, float]:
+        return {}
+
+    async def close(self):
+        pass
+
+
+class SimulatedLLMProvider(LLMProvider):
+    """Streams the scripted response with Gemini-like timing."""
+
+    name = "simulated"
+    scripted = True
+
+    async def stream(self, request: LLMRequest) -> AsyncGenerator[str, None]:
+        await simulation.sleep("llm_first_token", session_id=request.session_id) # Simulate thinking time
+        words = request.scripted_response.split()
+        for i, word in enumerate(words):
+            yield word + (" " if i < len(words) -1 else "")
+            await simulation.sleep("llm_token", session_id=request.session_id) # Simulate word-by-word generation
+
+
+def _retry_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(max_delay, base_delay * 2^attempt)]."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+class _RetryableError(Exception):
+    """Wraps a failed response that is worth retrying."""
+
+    def __init__(self, error: Exception):
+        super().__init__(str(error))
+        self.error = error
+
+def _sse_text(line: str) -> str:
+    """Returns the text in one server-sent event line of a streamGenerateContent response."""
+    if not line.startswith("data:"):
+        return ""
+    try:
+        event = json.loads(line[len("data:"):].strip())
+    except json.JSONDecodeError:
+        return ""
+    candidates = event.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+class GeminiLLMProvider(LLMProvider):
+    """Gemini REST API with a pooled HTTP client, streaming, retries and bounded concurrency."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str = config.GEMINI_API_KEY,
+                 model: str = config.GEMINI_MODEL,
+                 base_url: str = config.GEMINI_BASE_URL,
+                 max_concurrency: int = config.LLM_MAX_CONCURRENCY,
+                 max_retries: int = config.LLM_MAX_RETRIES):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self._client = None # httpx.AsyncClient, created on first use
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            # Shared by every session on this worker, so TCP/TLS connections are reused between requests
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=config.LLM_MAX_CONNECTIONS,
+                                    max_keepalive_connections=config.LLM_MAX_KEEPALIVE_CONNECTIONS),
+                timeout=httpx.Timeout(config.LLM_READ_TIMEOUT_SECONDS, connect=config.LLM_CONNECT_TIMEOUT_SECONDS),
+                headers={"x-goog-api-key": self.api_key},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def start(self):
+        if not self.api_key:
+            logger.warning("VOCAHIRE_LLM_PROVIDER=gemini but no Gemini API key is set")
+        self._get_client()
+
+    def _payload(self, request: LLMRequest) -> dict:
+        system_parts = [request.system_instruction] + [m["content"] for m in request.messages if m["role"] == "system"]
+        contents: List[dict] = []
+        for message in request.messages:
+            if message["role"] == "system":
+                continue
+            role = "model" if message["role"] == "AI" else "user"
+            if contents and contents[-1]["role"] == role:
+                # Gemini expects alternating roles; merge consecutive turns of one speaker
+                contents[-1]["parts"][0]["text"] += "\n" + message["content"]
+            else:
+                contents.append({"role": role, "parts": [{"text": message["content"]}]})
+        return {
+            "systemInstruction": {"parts": [{"text": "\n\n".join(system_parts)}]},
+            "contents": contents,
+            "generationConfig": {"maxOutputTokens": config.LLM_MAX_OUTPUT_TOKENS, "temperature": config.LLM_TEMPERATURE},
+        }
+
+    async def stream(self, request: LLMRequest) -> AsyncGenerator[str, None]:
+        import httpx
+
+        if request.fixed_response:
+            yield request.scripted_response
+            return
+        client = self._get_client()
+        url = f"{self.base_url}/models/{self.model}:streamGenerateContent"
+        payload = self._payload(request)
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            attempt = 0
+            while True:
+                yielded = False
+                try:
+                    async with client.stream("POST", url, params={"alt": "sse"}, json=payload) as response:
+                        if response.status_code != 200:
+                            body = (await response.aread())[:200].decode("utf-8", "replace")
+                            error = LLMProviderError(f"Gemini returned HTTP {response.status_code}: {body}")
+                            if not _is_retryable_status(response.status_code):
+                                raise error
+                            raise _RetryableError(error)
+                        async for line in response.aiter_lines():
+                            text = _sse_text(line)
+                            if text:
+                                yielded = True
+                                yield text
+                    return
+                except (httpx.TransportError, _RetryableError) as e:
+                    cause = e.error if isinstance(e, _RetryableError) else e
+                    # Once text reached the caller a retry would repeat it; give up with what was sent
+                    if yielded or attempt >= self.max_retries:
+                        self.failures += 1
+                        raise LLMProviderError(f"Gemini request failed after {attempt + 1} attempt(s): {cause!r}") from cause
+                    delay = _retry_delay(attempt, config.LLM_RETRY_BASE_DELAY_SECONDS, config.LLM_RETRY_MAX_DELAY_SECONDS)
+                    logger.warning("Gemini request failed, retrying", session_id=request.session_id, error=repr(cause), attempt=attempt + 1, delay_seconds=round(delay, 2))
+                    attempt += 1
+                    self.retries += 1
+                    await asyncio.sleep(delay)
+                except LLMProviderError:
+                    self.failures += 1
+                    raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+LLM_PROVIDERS = {
+    SimulatedLLMProvider.name: SimulatedLLMProvider,
+    GeminiLLMProvider.name: GeminiLLMProvider,
+}
+
+def create_llm_provider(name: str = config.LLM_PROVIDER) -> LLMProvider:
+    """Builds the LLM provider selected by configuration (see LLM_PROVIDERS)."""
+    if name not in LLM_PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name!r}")
+    return LLM_PROVIDERS[name]()
@@ -1,17 +1,34 @@
-from typing import List, Dict, Any, AsyncGenerator
+from typing import List, Dict, Any, AsyncGenerator, Deque, Iterable, Optional, Set
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, field
 import asyncio
-import random
-
-# Placeholder for actual LLM integration (e.g., Google Gemini API via google-generativeai library)
-# You would need to install the google-generativeai library and configure API keys.
-# For a real implementation, you would initialize the Gemini client here,
-# likely using an API key from environment variables.
-# Example:
-# import google.generativeai as genai
-# genai.configure(api_key="YOUR_GEMINI_API_KEY")
-# model = genai.GenerativeModel('gemini-pro') # Or another suitable model
-
-current_question_index = 0
+import time
+
+from backend.app import config
+from backend.app.models.interview_models import InterviewTurn
+from backend.app.services import metrics_service, session_service, simulation
+from backend.app.services.llm_providers import LLMProvider, LLMProviderError, LLMRequest, create_llm_provider
+from backend.app.services.ttl_cache import TTLCache
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# The interview flow (question order, greeting, closing, token budget) is decided here; the
+# response text is streamed by a pluggable LLM provider (see llm_providers.py), selected with
+# VOCAHIRE_LLM_PROVIDER. The default simulated provider speaks the scripted interviewer lines.
+provider: LLMProvider = create_llm_provider()
+
+async def start():
+    """Prepares the configured provider (called on application startup)."""
+    await provider.start()
+
+async def shutdown():
+    await provider.close()
+
+def stats() -> Dict[str, float]:
+    return {"provider": provider.name, **provider.stats()}
+
 interview_questions = [
     "Can you tell me about yourself?",
     "What are your strengths?",
@@ -23,59 +40,295 @@ interview_questions = [
     "Do you have any questions for me?"
 ]
 
-async def generate_interview_response(transcript_segment: str, interview_history: List[Dict[str, str]], session_id: str) -> AsyncGenerator[str, None]:
+CONCLUDING_RESPONSE = "Thank you for your responses. That concludes the main part of the interview. Do you have any final questions for VocaHire?"
+GREETING = "Hello! Welcome to your VocaHire interview. Let's begin. "
+ACKNOWLEDGEMENTS = ["Okay, thank you.", "Understood.", "Thanks for sharing that.", "I see.", "Alright."]
+
+def static_utterances() -> List[str]:
+    """Every response the scripted interviewer can produce (used to warm up the TTS cache)."""
+    utterances = [GREETING + interview_questions[0], CONCLUDING_RESPONSE]
+    utterances.extend(f"{ack} Now, {question}" for ack in ACKNOWLEDGEMENTS for question in interview_questions)
+    return utterances
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+class ConversationHistory:
+    """
+    Incremental, token-bounded view of the conversation for LLM prompts.
+
+    Turns are appended as they happen (never rebuilt from the full transcript) and a running
+    token estimate is kept. When the window exceeds `token_budget`, the oldest turns (always
+    keeping the last `min_turns`) are folded into a short rolling summary, so the prompt size
+    stays roughly constant however long the interview runs.
+    """
+
+    def __init__(self, token_budget: int = config.LLM_HISTORY_TOKEN_BUDGET,
+                 min_turns: int = config.LLM_HISTORY_MIN_TURNS,
+                 summary_token_budget: int = config.LLM_HISTORY_SUMMARY_TOKENS):
+        self.token_budget = token_budget
+        self.min_turns = min_turns
+        self.summary_token_budget = summary_token_budget
+        self.turns_seen = 0 # Number of transcript turns consumed so far
+        self._window: Deque[Dict[str, str]] = deque()
+        self._window_token_counts: Deque[int] = deque()
+        self.window_tokens = 0
+        self.rolling_summary = ""
+
+    @property
+    def token_estimate(self) -> int:
+        return self.window_tokens + estimate_tokens(self.rolling_summary)
+
+    def append(self, role: str, content: str):
+        tokens = estimate_tokens(content)
+        self._window.append({"role": role, "content": content})
+        self._window_token_counts.append(tokens)
+        self.window_tokens += tokens
+        self._enforce_budget()
+
+    def extend_from_transcript(self, new_turns: Iterable[InterviewTurn]):
+        """Appends transcript turns that haven't been seen yet (see `turns_seen`)."""
+        for turn in new_turns:
+            self.append("AI" if turn.speaker == "AI" else "user", turn.text)
+            self.turns_seen += 1
+
+    def _enforce_budget(self):
+        while self.window_tokens > self.token_budget and len(self._window) > self.min_turns:
+            dropped = self._window.popleft()
+            self.window_tokens -= self._window_token_counts.popleft()
+            self._fold_into_summary(dropped)
+
+    def _fold_into_summary(self, turn: Dict[str, str]):
+        # Keep the gist of each dropped turn: its first sentence, capped in length
+        gist = turn["content"].split(". ")[0][:160]
+        speaker = "Interviewer" if turn["role"] == "AI" else "Candidate"
+        self.rolling_summary = f"{self.rolling_summary} {speaker}: {gist}.".strip()
+        max_chars = self.summary_token_budget * 4
+        if len(self.rolling_summary) > max_chars:
+            # Oldest context goes first
+            self.rolling_summary = "..." + self.rolling_summary[-max_chars:]
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Returns the prompt history: the rolling summary (if any) followed by the recent turns."""
+        history = [{"role": "system", "content": f"Earlier in the interview: {self.rolling_summary}"}] if self.rolling_summary else []
+        history.extend(self._window)
+        return history
+
+
+@dataclass
+class InterviewState:
+    """Conversation state for one interview session."""
+    session_id: str
+    question_index: int = 0 # Cursor into interview_questions
+    asked_questions: Set[int] = field(default_factory=set)
+    persona: str = config.INTERVIEW_PERSONA
+    token_budget: int = config.INTERVIEW_TOKEN_BUDGET
+    tokens_used: int = 0
+    created_at: float = field(default_factory=time.time)
+    history: ConversationHistory = field(default_factory=ConversationHistory)
+
+    @property
+    def budget_exhausted(self) -> bool:
+        return self.tokens_used >= self.token_budget
+
+    def next_question(self) -> str:
+        """Returns the question under the cursor and advances it."""
+        question = interview_questions[self.question_index]
+        self.asked_questions.add(self.question_index)
+        self.question_index = (self.question_index + 1) % len(interview_questions)
+        return question
+
+
+# Per-session states, bounded so abandoned sessions don't accumulate in a long-lived worker.
+interview_states: TTLCache[str, InterviewState] = TTLCache(
+    max_size=config.LLM_STATE_MAX_SESSIONS, ttl_seconds=config.LLM_STATE_TTL_SECONDS
+)
+
+async def get_interview_state(session_id: str) -> InterviewState:
+    """
+    Returns the conversation state for a session. If it isn't cached (evicted by the TTL/LRU
+    bounds, or the session was started by another worker), it is rebuilt from the stored
+    transcript, so the interview carries on from its last question instead of starting over.
+    """
+    state = interview_states.get(session_id)
+    if state is None:
+        transcript = await session_service.get_transcript(session_id)
+        state = interview_states.get(session_id) # Another task may have rebuilt it meanwhile
+        if state is None:
+            state = restore_interview_state(session_id, transcript)
+    return state
+
+async def get_prompt_history(session_id: str, new_turns: Iterable[InterviewTurn]) -> List[Dict[str, str]]:
+    """
+    Appends the transcript turns added since the last call to the session's history and
+    returns the bounded prompt history. `new_turns` should start at `history.turns_seen`.
+    """
+    history = (await get_interview_state(session_id)).history
+    history.extend_from_transcript(new_turns)
+    return history.messages()
+
+@dataclass
+class PredictedResponse:
+    """
+    The likely reply to the answer the candidate is still giving: acknowledge it and ask the
+    question under the cursor. The reply text is generated right away (`generation`).
+    """
+    question_index: int
+    question: str
+    text: str # The scripted reply
+    generation: Optional["asyncio.Task[str]"] = None
+    used: bool = False # Set once generate_interview_response has taken it
+
+    def cancel(self):
+        if self.generation is not None and not self.used:
+            self.generation.cancel()
+
+def _acknowledge_and_ask(question: str, session_id: str) -> str:
+    # Drawn from the session's own stream, so speculation in other sessions doesn't change this one's wording
+    return f"{simulation.choice(ACKNOWLEDGEMENTS, 'acknowledgement', session_id)} Now, {question}"
+
+async def predict_next_response(session_id: str) -> Optional[PredictedResponse]:
+    """
+    Predicts the reply to the candidate's current answer without advancing the interview.
+    Returns None if the reply can't be known in advance (the provider isn't scripted, so its
+    wording is only known once it has the answer) or the interview would conclude instead (no
+    question left or budget spent).
     """
-    Placeholder for LLM (Gemini) to generate the next interview question or feedback.
-    This function would interact with the Gemini API.
+    if not provider.scripted:
+        return None
+    state = await get_interview_state(session_id)
+    if state.question_index >= len(interview_questions) -1 or state.budget_exhausted:
+        return None
+    question = interview_questions[state.question_index]
+    prediction = PredictedResponse(state.question_index, question, _acknowledge_and_ask(question, session_id))
+    request = LLMRequest(system_instruction="", scripted_response=prediction.text, session_id=session_id)
+    prediction.generation = asyncio.create_task(_collect(_stream(request)))
+    return prediction
+
+async def _stream(request: LLMRequest) -> AsyncGenerator[str, None]:
+    """Streams the provider's response, recording its latencies for simulation traces (see simulation.record)."""
+    started_at = time.perf_counter()
+    first_token_seconds: Optional[float] = None
+    words = 0
+    # Closed as soon as this generator is, so the provider's concurrency slot isn't held until garbage collection
+    async with aclosing(provider.stream(request)) as chunks:
+        async for chunk in chunks:
+            if first_token_seconds is None:
+                first_token_seconds = time.perf_counter() - started_at
+            words += len(chunk.split())
+            yield chunk
+    if first_token_seconds is not None and not request.fixed_response:
+        simulation.record("llm_first_token", first_token_seconds)
+        simulation.record("llm_token", time.perf_counter() - started_at - first_token_seconds, units=words - 1)
+
+async def _collect(stream: AsyncGenerator[str, None]) -> str:
+    return "".join([chunk async for chunk in stream])
+
+def _system_instruction(state: InterviewState, next_question: str) -> str:
+    return (
+        f"You are {state.persona}, interviewing a candidate by voice. Your replies are spoken aloud, so keep "
+        "them short and conversational, in plain sentences without lists or markdown. Briefly acknowledge the "
+        f"candidate's last answer in one sentence, then ask exactly this next question: \"{next_question}\""
+    )
+
+async def generate_interview_response(transcript_segment: str, interview_history: List[Dict[str, str]], session_id: str,
+                                      prediction: Optional[PredictedResponse] = None) -> AsyncGenerator[str, None]:
+    """
+    Generates the next interview question or feedback with the configured LLM provider.
+    The greeting and the closing line are fixed; answers get an acknowledgement and the next question.
     
     Args:
         transcript_segment: The latest transcribed segment from the candidate.
         interview_history: A list of previous turns in the conversation.
         session_id: The session ID for context.
+        prediction: Reply prepared while the candidate was answering (see predict_next_response).
+            It is used (and marked `used`) if the interview asks the predicted question next.
 
     Yields:
-        The AI's response, potentially in chunks if streaming from LLM.
+        The AI's response in chunks, as the provider streams it.
     """
-    global current_question_index
-    print(f"[LLM Service - Session {session_id}] Simulating Gemini. Received transcript: '{transcript_segment}'")
-    print(f"[LLM Service - Session {session_id}] Current history length: {len(interview_history)}")
-
-    # Simulate LLM (Gemini) processing delay
-    await asyncio.sleep(0.5 + random.uniform(0,1)) # Simulate thinking time
-
-    # In a real Gemini implementation, you would construct a prompt from
-    # transcript_segment and interview_history, then call:
-    # response_stream = await model.generate_content_async(prompt_parts, stream=True)
-    # async for chunk in response_stream:
-    #     yield chunk.text
-    # For this placeholder, we use the predefined question list.
+    state = await get_interview_state(session_id)
+    logger.debug("Generating response", session_id=session_id, provider=provider.name,
+                 transcript=transcript_segment, history_length=len(interview_history))
 
-    ai_response_text = ""
+    request = LLMRequest(system_instruction="", messages=list(interview_history), session_id=session_id, fixed_response=True)
     if not transcript_segment and not interview_history: # Start of interview
-        ai_response_text = "Hello! Welcome to your VocaHire interview. Let's begin. " + interview_questions[current_question_index]
-        current_question_index = (current_question_index + 1) % len(interview_questions)
-    elif "question for me" in transcript_segment.lower() or current_question_index >= len(interview_questions) -1 : # End of questions
-         ai_response_text = "Thank you for your responses. That concludes the main part of the interview. Do you have any final questions for VocaHire?"
-         # In a real scenario, Gemini might decide to end or ask for candidate questions.
-    elif transcript_segment: # Candidate responded
-        # Simple logic: Acknowledge and ask next question
-        acknowledgements = ["Okay, thank you.", "Understood.", "Thanks for sharing that.", "I see.", "Alright."]
-        ai_response_text = f"{random.choice(acknowledgements)} Now, {interview_questions[current_question_index]}"
-        current_question_index = (current_question_index + 1) % len(interview_questions)
+        request.scripted_response = GREETING + state.next_question()
+    elif "question for me" in transcript_segment.lower() or state.question_index >= len(interview_questions) -1 or state.budget_exhausted: # End of questions
+         request.scripted_response = CONCLUDING_RESPONSE
+    elif transcript_segment: # Candidate responded: acknowledge and ask the next question
+        question_index = state.question_index
+        question = state.next_question()
+        if prediction is not None and prediction.question_index == question_index:
+            prediction.used = True
+            request.scripted_response = prediction.text
+        else:
+            prediction = None
+            request.scripted_response = _acknowledge_and_ask(question, session_id)
+        request.system_instruction = _system_instruction(state, question)
+        request.fixed_response = False
+        if not interview_history or interview_history[-1]["content"] != transcript_segment:
+            request.messages.append({"role": "user", "content": transcript_segment})
     else: # Fallback or error
-        ai_response_text = "I'm sorry, I didn't quite catch that. Could you please repeat?"
+        request.scripted_response = "I'm sorry, I didn't quite catch that. Could you please repeat?"
+
+    ai_response_text = ""
+    requested_at = time.perf_counter()
+    try:
+        if prediction is not None and prediction.generation is not None:
+            # Generated while the candidate was speaking; at most the rest of the generation is waited for
+            ai_response_text = await prediction.generation
+            metrics_service.observe_stage("llm_first_token", time.perf_counter() - requested_at)
+            yield ai_response_text
+        else:
+            async with aclosing(_stream(request)) as chunks:
+                async for chunk in chunks:
+                    if not ai_response_text:
+                        metrics_service.observe_stage("llm_first_token", time.perf_counter() - requested_at)
+                    ai_response_text += chunk
+                    yield chunk
+        metrics_service.observe_stage("llm_total", time.perf_counter() - requested_at)
+    except LLMProviderError as e:
+        logger.error("LLM provider failed", session_id=session_id, error=str(e))
+        if not ai_response_text:
+            # Keep the interview going with the scripted line rather than dropping the turn
+            ai_response_text = request.scripted_response
+            yield ai_response_text
+    finally:
+        # Account for prompt + response against the session's token budget
+        prompt_tokens = estimate_tokens(transcript_segment) + sum(estimate_tokens(turn["content"]) for turn in interview_history)
+        state.tokens_used += prompt_tokens + estimate_tokens(ai_response_text)
 
-    # Simulate streaming response (Gemini API can stream responses)
-    words = ai_response_text.split()
-    for i, word in enumerate(words):
-        yield word + (" " if i < len(words) -1 else "")
-        await asyncio.sleep(0.05) # Simulate word-by-word generation
+    logger.debug("AI response", session_id=session_id, provider=provider.name, text=ai_response_text)
 
-    print(f"[LLM Service - Session {session_id}] Simulated Gemini AI response: '{ai_response_text}'")
+async def reset_interview_state(session_id: str):
+    """Resets the conversation state (question cursor, budget) for one interview session."""
+    interview_states.set(session_id, InterviewState(session_id=session_id))
+    logger.debug("Interview state reset", session_id=session_id)
+
+def restore_interview_state(session_id: str, transcript: List[InterviewTurn]) -> InterviewState:
+    """
+    Rebuilds the conversation state of a session from its transcript (e.g. after a crash
+    recovery), so the interview continues after the last question asked instead of starting over.
+    The prompt history is rebuilt from the transcript on the next get_prompt_history() call.
+    """
+    state = InterviewState(session_id=session_id)
+    for turn in transcript:
+        state.tokens_used += estimate_tokens(turn.text)
+        if turn.speaker != "AI":
+            continue
+        for index, question in enumerate(interview_questions):
+            if question in turn.text:
+                state.asked_questions.add(index)
+                state.question_index = (index + 1) % len(interview_questions)
+    interview_states.set(session_id, state)
+    logger.info("Interview state restored", session_id=session_id, question_index=state.question_index)
+    return state
 
-async def reset_interview_state():
-    """Resets the question index for a new interview session."""
-    global current_question_index
-    current_question_index = 0
-    print("[LLM Service] Interview state (question index) reset.")
+def discard_interview_state(session_id: str):
+    """Drops the conversation state of a finished session."""
+    interview_states.pop(session_id)
 
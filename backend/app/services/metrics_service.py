@@ -0,0 +1,200 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+import bisect
+
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# In-process latency metrics for the interview pipeline.
+
+# Number of recent samples kept per metric for percentile reporting.
+MAX_SAMPLES = 2048
+
+
+class LatencyTracker:
+    """Keeps the most recent latency samples (in seconds) and reports percentiles over them."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "p50_ms": _to_ms(self.percentile(0.50)),
+            "p95_ms": _to_ms(self.percentile(0.95)),
+            "p99_ms": _to_ms(self.percentile(0.99)),
+            "last_ms": _to_ms(self._samples[-1] if self._samples else None),
+        }
+
+
+def _to_ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+# Time from the start of an AI turn (LLM request) to the first audio byte sent on the socket.
+first_audio_latency = LatencyTracker()
+# Last observed first-audio latency per session, for debugging individual interviews.
+last_first_audio_latency_by_session: Dict[str, float] = {}
+
+def record_first_audio_latency(session_id: str, seconds: float):
+    first_audio_latency.record(seconds)
+    observe_stage("turn_first_audio", seconds)
+    last_first_audio_latency_by_session[session_id] = seconds
+    logger.debug("Time to first audio byte", session_id=session_id, ms=round(seconds * 1000, 1))
+
+def discard_session(session_id: str):
+    last_first_audio_latency_by_session.pop(session_id, None)
+
+def latency_report() -> Dict[str, Dict[str, Optional[float]]]:
+    return {"time_to_first_audio": first_audio_latency.summary()}
+
+
+# --- Stage latency histograms ---
+# Fixed-bucket histograms (seconds) per pipeline stage, exported at GET /metrics. Observing is a
+# bisect and three increments; all observations happen on the event loop thread, so no locks.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGES = {
+    "audio_ingest": "Time candidate audio waits in the ingest buffer before STT reads it",
+    "stt_partial": "STT time per audio chunk (streaming backends)",
+    "stt_final": "Time from the end of an utterance to its final transcript",
+    "llm_first_token": "Time from the LLM request to the first response text",
+    "llm_total": "Time from the LLM request to the end of the response",
+    "tts_first_audio": "Time from the first response text reaching TTS to the first synthesized audio",
+    "turn_first_audio": "Time from the start of an AI turn to its first audio byte sent",
+    "ws_send": "Time to send one WebSocket message",
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram; `bucket_counts[i]` counts observations <= buckets[i] (the last one is +Inf)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[int]:
+        counts, total = [], 0
+        for count in self.bucket_counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+stage_latency: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+
+def observe_stage(stage: str, seconds: float):
+    stage_latency[stage].observe(seconds)
+
+
+# --- Gauges ---
+# Read when /metrics is scraped, from callbacks registered by the modules that own the values.
+_gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float]):
+    _gauges[name] = (help_text, read)
+
+
+# --- Audio ingest ---
+# Audio currently buffered between the socket and STT, per session.
+ingest_buffered_bytes: Dict[str, int] = {}
+ingest_dropped_bytes: Dict[str, int] = {}
+ingest_pauses: Dict[str, int] = {}
+
+def set_ingest_buffered_bytes(session_id: str, buffered: int):
+    ingest_buffered_bytes[session_id] = buffered
+
+def record_ingest_dropped_bytes(session_id: str, dropped: int):
+    ingest_dropped_bytes[session_id] = ingest_dropped_bytes.get(session_id, 0) + dropped
+
+def record_ingest_pause(session_id: str):
+    ingest_pauses[session_id] = ingest_pauses.get(session_id, 0) + 1
+
+def discard_ingest_session(session_id: str):
+    ingest_buffered_bytes.pop(session_id, None)
+    ingest_dropped_bytes.pop(session_id, None)
+    ingest_pauses.pop(session_id, None)
+
+def ingest_report() -> Dict[str, Dict[str, int]]:
+    return {
+        session_id: {
+            "buffered_bytes": buffered,
+            "dropped_bytes": ingest_dropped_bytes.get(session_id, 0),
+            "pauses": ingest_pauses.get(session_id, 0),
+        }
+        for session_id, buffered in ingest_buffered_bytes.items()
+    }
+
+
+# --- WebSocket protocol traffic ---
+# Messages and bytes per protocol ("legacy", "vocahire.v1", ...) and direction ("in"/"out"), since startup.
+protocol_messages: Dict[str, int] = {}
+protocol_bytes: Dict[str, int] = {}
+
+def record_protocol_traffic(protocol: str, direction: str, size: int):
+    key = f"{protocol}:{direction}"
+    protocol_messages[key] = protocol_messages.get(key, 0) + 1
+    protocol_bytes[key] = protocol_bytes.get(key, 0) + size
+
+def protocol_report() -> Dict[str, Dict[str, int]]:
+    return {key: {"messages": count, "bytes": protocol_bytes.get(key, 0)} for key, count in protocol_messages.items()}
+
+
+# --- Prometheus export ---
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def prometheus_report() -> str:
+    """Renders the stage histograms, counters and gauges in the Prometheus text exposition format."""
+    lines = [
+        "# HELP vocahire_stage_latency_seconds Latency of each interview pipeline stage.",
+        "# TYPE vocahire_stage_latency_seconds histogram",
+    ]
+    for stage, histogram in stage_latency.items():
+        bounds = [_format_value(bound) for bound in histogram.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, histogram.cumulative_counts()):
+            lines.append(f'vocahire_stage_latency_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+        lines.append(f'vocahire_stage_latency_seconds_sum{{stage="{stage}"}} {_format_value(histogram.sum)}')
+        lines.append(f'vocahire_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+    lines += ["# HELP vocahire_ws_messages_total WebSocket messages by protocol and direction.",
+              "# TYPE vocahire_ws_messages_total counter"]
+    lines += [f'vocahire_ws_messages_total{{protocol="{key.rsplit(":", 1)[0]}",direction="{key.rsplit(":", 1)[1]}"}} {count}'
+              for key, count in protocol_messages.items()]
+    lines += ["# HELP vocahire_ws_bytes_total WebSocket payload bytes by protocol and direction.",
+              "# TYPE vocahire_ws_bytes_total counter"]
+    lines += [f'vocahire_ws_bytes_total{{protocol="{key.rsplit(":", 1)[0]}",direction="{key.rsplit(":", 1)[1]}"}} {count}'
+              for key, count in protocol_bytes.items()]
+
+    lines += ["# HELP vocahire_ingest_buffered_bytes Candidate audio buffered between the socket and STT.",
+              "# TYPE vocahire_ingest_buffered_bytes gauge",
+              f"vocahire_ingest_buffered_bytes {sum(ingest_buffered_bytes.values())}"]
+    for name, (help_text, read) in _gauges.items():
+        try:
+            value = read()
+        except Exception as e:
+            logger.warning("Gauge read failed", gauge=name, error=str(e))
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_format_value(value)}"]
+    return "\n".join(lines) + "\n"
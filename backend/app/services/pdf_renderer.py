@@ -0,0 +1,142 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from xml.sax.saxutils import escape
+import asyncio
+import datetime
+import hashlib
+import multiprocessing
+import os
+import tempfile
+
+from backend.app import config
+from backend.app.models.interview_models import SessionSummary
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# PDF report renderer for session summaries (requires reportlab).
+# Rendering runs in a process pool so it never blocks the event loop. Reports are written to
+# a content-addressed cache on disk (named by the hash of the summary JSON), so downloading
+# the same report again is just a file send.
+
+_METRIC_LABELS = [
+    ("clarity", "Clarity"),
+    ("confidence", "Confidence"),
+    ("relevance", "Relevance"),
+    ("depth", "Depth"),
+    ("keyword_match_score", "Keyword match"),
+    ("answer_length_score", "Answer length"),
+    ("overall_score", "Overall"),
+]
+
+
+def _score_chart(summary: SessionSummary):
+    from reportlab.graphics.shapes import Drawing, Rect, String
+    from reportlab.lib import colors
+
+    bar_height, gap, label_width, bar_width = 14, 6, 110, 300
+    drawing = Drawing(label_width + bar_width + 50, len(_METRIC_LABELS) * (bar_height + gap))
+    for row, (field, label) in enumerate(_METRIC_LABELS):
+        score = getattr(summary.evaluation, field)
+        y = drawing.height - (row + 1) * (bar_height + gap)
+        drawing.add(String(0, y + 3, label, fontName="Helvetica", fontSize=9))
+        drawing.add(Rect(label_width, y, bar_width, bar_height, fillColor=colors.whitesmoke, strokeColor=colors.lightgrey))
+        fill = colors.HexColor("#2f855a") if score >= 0.7 else colors.HexColor("#d69e2e") if score >= 0.4 else colors.HexColor("#c53030")
+        drawing.add(Rect(label_width, y, bar_width * score, bar_height, fillColor=fill, strokeColor=None))
+        drawing.add(String(label_width + bar_width + 6, y + 3, f"{score:.2f}", fontName="Helvetica", fontSize=9))
+    return drawing
+
+def render_summary_pdf(summary_json: str, output_path: str):
+    """
+    Renders a SessionSummary (given as JSON) to a PDF file.
+    Runs in a worker process; the file is written next to `output_path` and moved into place atomically.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    summary = SessionSummary.model_validate_json(summary_json)
+    styles = getSampleStyleSheet()
+    started = datetime.datetime.fromtimestamp(summary.started_at).strftime("%Y-%m-%d %H:%M")
+
+    story = [
+        Paragraph("VocaHire Interview Report", styles["Title"]),
+        Paragraph(f"Session: {escape(summary.session_id)}<br/>Started: {started}<br/>Duration: {summary.duration_seconds / 60:.1f} min", styles["Normal"]),
+        Spacer(1, 0.5 * cm),
+        Paragraph("Scores", styles["Heading2"]),
+        _score_chart(summary),
+        Spacer(1, 0.5 * cm),
+    ]
+    if summary.tips_for_improvement:
+        story.append(Paragraph("Tips for improvement", styles["Heading2"]))
+        story.extend(Paragraph(f"&bull; {escape(tip)}", styles["Normal"]) for tip in summary.tips_for_improvement)
+        story.append(Spacer(1, 0.5 * cm))
+    story.append(Paragraph("Transcript", styles["Heading2"]))
+    for turn in summary.full_transcript:
+        speaker = "Interviewer" if turn.speaker == "AI" else turn.speaker
+        story.append(Paragraph(f"<b>{escape(speaker)}:</b> {escape(turn.text)}", styles["Normal"]))
+        story.append(Spacer(1, 0.15 * cm))
+
+    directory = os.path.dirname(output_path)
+    fd, temp_path = tempfile.mkstemp(suffix=".pdf.tmp", dir=directory)
+    os.close(fd)
+    try:
+        SimpleDocTemplate(temp_path, pagesize=A4, title=f"VocaHire report {summary.session_id}").build(story)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+# Renders in progress per output file, so concurrent downloads of a new report render it once
+_in_flight: dict = {}
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=config.PDF_WORKERS,
+                                            mp_context=multiprocessing.get_context(config.PROCESS_START_METHOD))
+    return _process_pool
+
+def shutdown():
+    """Stops the PDF worker processes (called on application shutdown)."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+def _prune_cache(cache_dir: Path, max_files: int):
+    reports = sorted(cache_dir.glob("*.pdf"), key=lambda p: p.stat().st_mtime)
+    for stale in reports[:max(0, len(reports) - max_files)]:
+        stale.unlink(missing_ok=True)
+
+async def get_summary_pdf_path(summary: SessionSummary, summary_json: Optional[bytes] = None) -> Path:
+    """
+    Returns the path of the rendered PDF report for a summary, rendering it if it isn't cached.
+
+    Args:
+        summary: The session summary to render.
+        summary_json: The summary's JSON, if already serialised (e.g. from the summary cache).
+    """
+    if summary_json is None:
+        summary_json = summary.model_dump_json().encode("utf-8")
+    cache_dir = Path(config.PDF_CACHE_DIR)
+    output_path = cache_dir / f"{hashlib.sha256(summary_json).hexdigest()}.pdf"
+    if output_path.exists():
+        return output_path
+
+    key = str(output_path)
+    render = _in_flight.get(key)
+    if render is None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        render = loop.run_in_executor(_get_process_pool(), render_summary_pdf, summary_json.decode("utf-8"), key)
+        _in_flight[key] = render
+        render.add_done_callback(lambda _: _in_flight.pop(key, None))
+        logger.info("Rendering report", session_id=summary.session_id, file=output_path.name)
+    await asyncio.shield(render)
+    await asyncio.to_thread(_prune_cache, cache_dir, config.PDF_CACHE_MAX_FILES)
+    return output_path
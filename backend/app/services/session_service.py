@@ -1,45 +1,98 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Any, Optional
 import time
 import json
-import random
 import asyncio
 
 from backend.app.models.interview_models import SessionSummary, EvaluationMetrics, InterviewTurn
+from backend.app.services import archive_service, evaluation_service, pdf_renderer, transcript_wal
+from backend.app.services.session_store import SessionStore, create_session_store
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
 
 # Placeholder for Session Summary service
 
-# In a real application, this would likely be a database or a more robust in-memory store.
-# For simplicity, using a dictionary to store session data.
-active_sessions: Dict[str, Dict] = {}
-
-def initialize_session(session_id: str):
-    if session_id not in active_sessions:
-        active_sessions[session_id] = {
-            "transcript": [],
-            "start_time": time.time(),
-            "evaluation": None,
-            "status": "active"
-        }
-        print(f"[Session Service] Initialized session: {session_id}")
-
-def add_to_transcript(session_id: str, speaker: str, text: str):
-    if session_id in active_sessions:
+# All session data goes through a SessionStore (see session_store.py).
+# The default in-memory store keeps data in this worker; configure VOCAHIRE_SESSION_STORE=redis
+# to share sessions between uvicorn workers and nodes.
+store: SessionStore = create_session_store()
+
+def configure_session_store(new_store: SessionStore):
+    """Replaces the session store (e.g. with a RedisSessionStore backed by fakeredis in tests)."""
+    global store
+    store = new_store
+
+async def initialize_session(session_id: str):
+    start_time = time.time()
+    if await store.create_session(session_id, start_time):
+        transcript_wal.log_session_started(session_id, start_time)
+        logger.info("Initialized session", session_id=session_id)
+
+async def get_session_data(session_id: str) -> Optional[Dict[str, Any]]:
+    """Returns the session metadata (start_time, status, evaluation, summary) or None."""
+    session_data = await store.get_metadata(session_id)
+    if session_data is None and await rehydrate_session(session_id):
+        session_data = await store.get_metadata(session_id)
+    return session_data
+
+async def add_to_transcript(session_id: str, speaker: str, text: str):
+    if await store.session_exists(session_id):
         turn = InterviewTurn(speaker=speaker, text=text, timestamp=time.time())
-        active_sessions[session_id]["transcript"].append(turn)
+        transcript_length = await store.append_turn(session_id, turn)
+        transcript_wal.log_turn(session_id, speaker, text, turn.timestamp)
+        # Keep the running evaluation up to date so the summary doesn't need a full analysis
+        evaluation_service.record_turn(session_id, turn, transcript_length - 1)
     else:
-        print(f"[Session Service] Error: Session {session_id} not found for adding transcript.")
+        logger.error("Session not found for adding transcript", session_id=session_id)
+
+async def get_transcript(session_id: str) -> List[InterviewTurn]:
+    transcript = await store.get_turns(session_id)
+    if not transcript and await rehydrate_session(session_id):
+        transcript = await store.get_turns(session_id)
+    return transcript
 
-def get_transcript(session_id: str) -> List[InterviewTurn]:
-    return active_sessions.get(session_id, {}).get("transcript", [])
+async def get_turn_count(session_id: str) -> int:
+    turn_count = await store.turn_count(session_id)
+    if not turn_count and await rehydrate_session(session_id):
+        turn_count = await store.turn_count(session_id)
+    return turn_count
 
-def store_evaluation(session_id: str, evaluation_results: EvaluationMetrics):
-    if session_id in active_sessions:
-        active_sessions[session_id]["evaluation"] = evaluation_results
+async def get_transcript_since(session_id: str, start: int) -> List[InterviewTurn]:
+    """Returns only the turns from index `start` onwards (e.g. the ones a consumer hasn't seen yet)."""
+    return await store.get_turns(session_id, start)
+
+async def store_evaluation(session_id: str, evaluation_results: EvaluationMetrics, turn_count: Optional[int] = None):
+    """
+    Stores an evaluation along with the number of transcript turns it covers (its transcript
+    version); by default the evaluation is taken to cover the whole current transcript.
+    """
+    if await store.session_exists(session_id):
+        if turn_count is None:
+            turn_count = await store.turn_count(session_id)
+        await store.update_metadata(session_id, evaluation=evaluation_results, evaluation_turns=turn_count)
     else:
-        print(f"[Session Service] Error: Session {session_id} not found for storing evaluation.")
+        logger.error("Session not found for storing evaluation", session_id=session_id)
+
+async def get_evaluation(session_id: str) -> Optional[EvaluationMetrics]:
+    return (await store.get_metadata(session_id) or {}).get("evaluation")
 
-def get_evaluation(session_id: str) -> Optional[EvaluationMetrics]:
-    return active_sessions.get(session_id, {}).get("evaluation", None)
+async def evaluate_session(session_id: str, transcript: Optional[List[InterviewTurn]] = None) -> Optional[EvaluationMetrics]:
+    """
+    Evaluates the session (or the given transcript of it) and stores the result.
+    Uses the running per-turn evaluation when this worker saw every turn (O(1)); otherwise
+    analyzes the full transcript. Returns None if the session has no transcript.
+    """
+    turn_count = len(transcript) if transcript is not None else await store.turn_count(session_id)
+    evaluation_results = evaluation_service.finalize_session(session_id, turn_count)
+    if evaluation_results is None:
+        if transcript is None:
+            transcript = await store.get_turns(session_id)
+        if not transcript:
+            return None
+        turn_count = len(transcript)
+        evaluation_results = await evaluation_service.analyze_transcript(transcript, session_id)
+    await store_evaluation(session_id, evaluation_results, turn_count)
+    return evaluation_results
 
 
 async def generate_session_summary(session_id: str) -> Optional[SessionSummary]:
@@ -53,37 +106,30 @@ async def generate_session_summary(session_id: str) -> Optional[SessionSummary]:
     Returns:
         A SessionSummary object or None if session not found/complete.
     """
-    if session_id not in active_sessions or active_sessions[session_id].get("status") != "active":
-        print(f"[Session Service] Session {session_id} not found or not active for summary.")
+    session_data = await store.get_metadata(session_id)
+    if not session_data or session_data.get("status") != "active":
+        logger.info("Session not found or not active for summary", session_id=session_id)
         # Could also mean it's already summarized or never existed
         # return None
 
-    session_data = active_sessions.get(session_id)
     if not session_data:
-         print(f"[Session Service] Session {session_id} has no data.")
+         logger.info("Session has no data", session_id=session_id)
          return None # Or raise error
 
-    print(f"[Session Service - Session {session_id}] Generating summary.")
+    logger.info("Generating summary", session_id=session_id)
     
-    # Simulate summary generation delay
-    await asyncio.sleep(0.5)
-
-    transcript = session_data.get("transcript", [])
+    transcript = await store.get_turns(session_id)
     evaluation = session_data.get("evaluation")
     start_time = session_data.get("start_time", time.time())
     end_time = time.time() # Current time as end time for summary generation
     
-    if not evaluation:
-        # This case should ideally be handled by ensuring evaluation is done before summary
-        print(f"[Session Service - Session {session_id}] Evaluation not found. Generating placeholder evaluation.")
-        # In a real app, you'd likely call the evaluation service here if not already done.
-        # For now, let's create a dummy one.
-        evaluation = EvaluationMetrics(
-            clarity=random.uniform(0.1, 0.5), confidence=random.uniform(0.1, 0.5), 
-            relevance=random.uniform(0.1, 0.5), depth=random.uniform(0.1, 0.5),
-            keyword_match_score=random.uniform(0.1, 0.5), answer_length_score=random.uniform(0.1, 0.5),
-            overall_score=random.uniform(0.1, 0.5)
-        )
+    if not evaluation or session_data.get("evaluation_turns") != len(transcript):
+        # Missing, or made before the latest turns: the summary must match the transcript it includes
+        logger.info("Evaluation not found or outdated, evaluating now", session_id=session_id)
+        evaluation = await evaluate_session(session_id, transcript)
+        if not evaluation:
+            logger.info("Nothing to evaluate", session_id=session_id)
+            return None
 
 
     tips = [
@@ -102,10 +148,10 @@ async def generate_session_summary(session_id: str) -> Optional[SessionSummary]:
         ended_at=end_time
     )
     
-    active_sessions[session_id]["status"] = "summarized" # Mark as summarized
-    active_sessions[session_id]["summary"] = summary # Store summary
+    await store.update_metadata(session_id, status="summarized", summary=summary, last_active_at=end_time) # Mark as summarized and store summary
+    transcript_wal.log_status(session_id, "summarized", end_time)
 
-    print(f"[Session Service - Session {session_id}] Summary generated.")
+    logger.info("Summary generated", session_id=session_id)
     return summary
 
 async def export_summary_to_json(summary: SessionSummary, session_id: str) -> str:
@@ -113,37 +159,134 @@ async def export_summary_to_json(summary: SessionSummary, session_id: str) -> st
     Exports the session summary to a JSON string.
     In a real application, this might save to a file or database.
     """
-    print(f"[Session Service - Session {session_id}] Exporting summary to JSON.")
+    logger.debug("Exporting summary to JSON", session_id=session_id)
     # Pydantic models have a .model_dump_json() method
     return summary.model_dump_json(indent=2)
 
 async def export_summary_to_pdf(summary: SessionSummary, session_id: str) -> bytes:
     """
-    Placeholder for exporting the session summary to a PDF.
-    This would require a library like ReportLab.
-    """
-    print(f"[Session Service - Session {session_id}] Placeholder: Exporting summary to PDF.")
-    # Simulate PDF generation
-    await asyncio.sleep(1)
-    pdf_content = f"PDF Summary for Session {session_id}\n\n"
-    pdf_content += f"Overall Score: {summary.evaluation.overall_score}\n\n"
-    pdf_content += "Transcript Highlights:\n"
-    for turn in summary.full_transcript[:3]: # First 3 turns
-        pdf_content += f"- {turn.speaker}: {turn.text[:50]}...\n"
-    
-    # This is not a real PDF, just text bytes
-    return pdf_content.encode('utf-8')
+    Exports the session summary to a PDF report (transcript, score chart, tips).
+    Rendering happens in a worker process and the result is cached on disk; see pdf_renderer.
+    """
+    logger.debug("Exporting summary to PDF", session_id=session_id)
+    pdf_path = await pdf_renderer.get_summary_pdf_path(summary)
+    return await asyncio.to_thread(pdf_path.read_bytes)
 
-def get_session_summary_from_store(session_id: str) -> Optional[SessionSummary]:
-    """Retrieves a previously generated summary if available."""
-    return active_sessions.get(session_id, {}).get("summary")
+async def get_session_summary_from_store(session_id: str) -> Optional[SessionSummary]:
+    """Retrieves a previously generated summary if available (rehydrating archived sessions)."""
+    return (await get_session_data(session_id) or {}).get("summary")
 
-def end_session(session_id: str):
+async def end_session(session_id: str):
     """Marks a session as ended, could trigger final processing or cleanup."""
-    if session_id in active_sessions:
-        if active_sessions[session_id]["status"] == "active":
-             active_sessions[session_id]["status"] = "ended_pending_summary"
-        print(f"[Session Service] Session {session_id} marked as ended.")
-        # Optionally, remove from active_sessions after some time or archive
+    session_data = await store.get_metadata(session_id)
+    if session_data:
+        if session_data["status"] == "active":
+             ended_at = time.time()
+             await store.update_metadata(session_id, status="ended_pending_summary", last_active_at=ended_at)
+             transcript_wal.log_status(session_id, "ended_pending_summary", ended_at)
+        logger.info("Session marked as ended", session_id=session_id)
+        # The lifecycle task archives and evicts it after the retention period
     else:
-        print(f"[Session Service] Error: Session {session_id} not found to end.")
+        logger.error("Session not found to end", session_id=session_id)
+
+
+async def mark_disconnected(session_id: str):
+    """
+    Records that the client dropped without ending the interview. The session stays active so
+    the client can reconnect and resume; the lifecycle task ends it after SESSION_RESUME_WINDOW_SECONDS.
+    """
+    if await store.session_exists(session_id):
+        await store.update_metadata(session_id, disconnected_at=time.time())
+        logger.info("Session disconnected; it can be resumed", session_id=session_id)
+
+async def mark_reconnected(session_id: str):
+    await store.update_metadata(session_id, disconnected_at=None)
+    logger.info("Session resumed", session_id=session_id)
+
+def is_resumable(session_data: Optional[Dict[str, Any]]) -> bool:
+    """True if an existing session can be continued by a new connection."""
+    return bool(session_data) and session_data.get("status") == "active"
+
+
+async def snapshot_session(session_id: str) -> Optional[tuple]:
+    """Returns (metadata, transcript) of a session in the store, or None."""
+    session_data = await store.get_metadata(session_id)
+    if session_data is None:
+        return None
+    return session_data, await store.get_turns(session_id)
+
+async def evict_session(session_id: str, expected_last_active_at: Optional[float]) -> bool:
+    """
+    Removes an archived session from the store, unless it has been active again since it
+    was archived (its last_active_at changed). Returns True if it was evicted.
+    """
+    session_data = await store.get_metadata(session_id)
+    if session_data is None:
+        return False
+    if session_data.get("last_active_at") != expected_last_active_at or session_data.get("status") == "active":
+        return False
+    await store.delete_session(session_id)
+    transcript_wal.log_evicted(session_id)
+    return True
+
+async def rehydrate_session(session_id: str) -> bool:
+    """Loads an archived session back into the store. Returns True if it was found in the archive."""
+    if await store.session_exists(session_id):
+        return False
+    archive = archive_service.get_archive()
+    # The SQLite read and decompression happen off the event loop
+    archived = await asyncio.to_thread(archive.load, session_id) if archive else None
+    if archived is None:
+        return False
+    session_data, transcript = archived
+    if await store.create_session(session_id, session_data["start_time"]):
+        for turn in transcript:
+            await store.append_turn(session_id, turn)
+        # Restart the retention period so it isn't evicted again right away
+        fields = {k: v for k, v in session_data.items() if k != "start_time"}
+        fields["last_active_at"] = time.time()
+        await store.update_metadata(session_id, **fields)
+        logger.info("Rehydrated archived session", session_id=session_id)
+    return True
+
+async def list_session_ids() -> List[str]:
+    """IDs of every session in the store (the sessions the WAL keeps when it is compacted)."""
+    return await store.list_session_ids()
+
+async def recover_sessions_from_wal() -> List[str]:
+    """
+    Replays the transcript logs left behind by crashed workers into the session store, so
+    their clients can reconnect and resume. Recovered sessions are re-logged in this worker's
+    WAL before the old logs are removed. Returns the IDs of the recovered sessions.
+    """
+    wal = transcript_wal.get_wal()
+    if wal is None:
+        return []
+    sessions, paths = await asyncio.to_thread(transcript_wal.read_orphaned_logs, wal.directory, wal.path)
+    archive = archive_service.get_archive()
+    recovered = []
+    for session_id, session in sessions.items():
+        if archive and await asyncio.to_thread(archive.contains, session_id):
+            continue # Archived (its eviction record may have been lost); rehydrated from there on request
+        if not await store.create_session(session_id, session["start_time"]):
+            continue # Already in a shared store (or recovered by another worker)
+        transcript_wal.log_session_started(session_id, session["start_time"])
+        for speaker, text, timestamp in session["turns"]:
+            turn = InterviewTurn(speaker=speaker, text=text, timestamp=timestamp)
+            transcript_length = await store.append_turn(session_id, turn)
+            evaluation_service.record_turn(session_id, turn, transcript_length - 1)
+            transcript_wal.log_turn(session_id, speaker, text, timestamp)
+        if session["status"] != "active":
+            # Summaries aren't logged; a summarized session is regenerated on request
+            await store.update_metadata(session_id, status="ended_pending_summary", last_active_at=session["last_active_at"])
+            transcript_wal.log_status(session_id, "ended_pending_summary", session["last_active_at"])
+        else:
+            # Its client lost the connection with the worker: it gets the usual resume window
+            await store.update_metadata(session_id, disconnected_at=time.time())
+        recovered.append(session_id)
+    # Only drop the old logs once their sessions are durable in this worker's log
+    await wal.flush()
+    await asyncio.to_thread(transcript_wal.remove_logs, paths)
+    if recovered:
+        logger.info("Recovered sessions from the transcript log", sessions=len(recovered))
+    return recovered
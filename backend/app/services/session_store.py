@@ -0,0 +1,229 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+import json
+
+from backend.app.models.interview_models import SessionSummary, EvaluationMetrics, InterviewTurn
+from backend.app import config
+
+# Storage backends for interview sessions.
+# session_service talks only to the SessionStore interface, so the same code runs
+# against process-local memory (single worker) or a Redis-compatible server
+# (shared between uvicorn workers and nodes).
+#
+# A session is stored as two parts:
+#   - metadata: start_time, status, evaluation, summary
+#   - transcript: an append-only list of InterviewTurn entries, so adding a turn is O(1)
+
+
+class SessionStore(ABC):
+    """
+    Interface for session storage backends. Every method is a coroutine, so a networked
+    backend never blocks the event loop.
+    """
+
+    @abstractmethod
+    async def create_session(self, session_id: str, start_time: float) -> bool:
+        """Creates the session if it does not exist yet. Returns True if it was created."""
+
+    @abstractmethod
+    async def session_exists(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def get_metadata(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the session metadata (start_time, status, evaluation, summary) or None."""
+
+    @abstractmethod
+    async def update_metadata(self, session_id: str, **fields: Any) -> None:
+        """Updates fields of an existing session (does nothing if the session doesn't exist)."""
+
+    @abstractmethod
+    async def append_turn(self, session_id: str, turn: InterviewTurn) -> int:
+        """Appends a turn and returns the new transcript length."""
+
+    @abstractmethod
+    async def get_turns(self, session_id: str, start: int = 0) -> List[InterviewTurn]:
+        """Returns the transcript turns from index `start` onwards."""
+
+    @abstractmethod
+    async def turn_count(self, session_id: str) -> int:
+        ...
+
+    @abstractmethod
+    async def delete_session(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def list_session_ids(self) -> List[str]:
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store. Fast, but not shared between workers and lost on restart."""
+
+    def __init__(self):
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._transcripts: Dict[str, List[InterviewTurn]] = {}
+
+    async def create_session(self, session_id: str, start_time: float) -> bool:
+        if session_id in self._metadata:
+            return False
+        self._metadata[session_id] = {
+            "start_time": start_time,
+            "status": "active",
+            "evaluation": None,
+            "summary": None,
+        }
+        self._transcripts[session_id] = []
+        return True
+
+    async def session_exists(self, session_id: str) -> bool:
+        return session_id in self._metadata
+
+    async def get_metadata(self, session_id: str) -> Optional[Dict[str, Any]]:
+        metadata = self._metadata.get(session_id)
+        return dict(metadata) if metadata is not None else None
+
+    async def update_metadata(self, session_id: str, **fields: Any) -> None:
+        if session_id in self._metadata:
+            self._metadata[session_id].update(fields)
+
+    async def append_turn(self, session_id: str, turn: InterviewTurn) -> int:
+        transcript = self._transcripts[session_id]
+        transcript.append(turn)
+        return len(transcript)
+
+    async def get_turns(self, session_id: str, start: int = 0) -> List[InterviewTurn]:
+        return self._transcripts.get(session_id, [])[start:]
+
+    async def turn_count(self, session_id: str) -> int:
+        return len(self._transcripts.get(session_id, []))
+
+    async def delete_session(self, session_id: str) -> None:
+        self._metadata.pop(session_id, None)
+        self._transcripts.pop(session_id, None)
+
+    async def list_session_ids(self) -> List[str]:
+        return list(self._metadata)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store backed by a Redis-compatible server (Redis, KeyDB, Valkey, or fakeredis in tests),
+    through the asyncio client.
+
+    Metadata lives in a hash (`<prefix><session_id>:meta`) and the transcript in a list
+    (`<prefix><session_id>:turns`) that is only ever RPUSH-ed to.
+    """
+
+    # Metadata fields holding pydantic models, serialised as JSON strings in the hash.
+    _MODEL_FIELDS = {"evaluation": EvaluationMetrics, "summary": SessionSummary}
+
+    def __init__(self, client: Any = None, url: str = config.REDIS_URL, key_prefix: str = config.REDIS_KEY_PREFIX):
+        if client is None:
+            import redis.asyncio  # Optional dependency, only needed for this backend
+            client = redis.asyncio.Redis.from_url(url)
+        self._redis = client
+        self._prefix = key_prefix
+
+    def _meta_key(self, session_id: str) -> str:
+        return f"{self._prefix}{session_id}:meta"
+
+    def _turns_key(self, session_id: str) -> str:
+        return f"{self._prefix}{session_id}:turns"
+
+    @staticmethod
+    def _decode(value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def _hset_if(self, key: str, mapping: Dict[str, str], exists: bool) -> bool:
+        """
+        Writes `mapping` to the hash in one HSET, only if the hash exists (or doesn't, with
+        `exists=False`). WATCH/MULTI/EXEC makes the check and the write atomic, so concurrent
+        workers can't both create a session and an update can't resurrect an evicted one.
+        Returns True if the hash was written.
+        """
+        from redis.exceptions import WatchError
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    if bool(await pipe.exists(key)) != exists:
+                        await pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    pipe.hset(key, mapping=mapping)
+                    await pipe.execute()
+                    return True
+                except WatchError:
+                    continue # The hash changed between WATCH and EXEC: check again
+
+    async def create_session(self, session_id: str, start_time: float) -> bool:
+        return await self._hset_if(self._meta_key(session_id), {"start_time": repr(start_time), "status": "active"}, exists=False)
+
+    async def session_exists(self, session_id: str) -> bool:
+        return bool(await self._redis.exists(self._meta_key(session_id)))
+
+    async def get_metadata(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.hgetall(self._meta_key(session_id))
+        if not raw:
+            return None
+        fields = {self._decode(k): self._decode(v) for k, v in raw.items()}
+        metadata: Dict[str, Any] = {
+            "start_time": float(fields["start_time"]),
+            "status": fields.get("status", "active"),
+        }
+        for name, model in self._MODEL_FIELDS.items():
+            value = fields.get(name)
+            metadata[name] = model.model_validate_json(value) if value else None
+        for name, value in fields.items():
+            if name not in metadata:
+                metadata[name] = json.loads(value)
+        return metadata
+
+    async def update_metadata(self, session_id: str, **fields: Any) -> None:
+        if not fields:
+            return
+        mapping = {}
+        for name, value in fields.items():
+            if name in self._MODEL_FIELDS:
+                mapping[name] = value.model_dump_json() if value is not None else ""
+            elif name == "status":
+                mapping[name] = value
+            elif name == "start_time":
+                mapping[name] = repr(value)
+            else:
+                mapping[name] = json.dumps(value)
+        await self._hset_if(self._meta_key(session_id), mapping, exists=True)
+
+    async def append_turn(self, session_id: str, turn: InterviewTurn) -> int:
+        return await self._redis.rpush(self._turns_key(session_id), turn.model_dump_json())
+
+    async def get_turns(self, session_id: str, start: int = 0) -> List[InterviewTurn]:
+        raw_turns = await self._redis.lrange(self._turns_key(session_id), start, -1)
+        return [InterviewTurn.model_validate_json(raw) for raw in raw_turns]
+
+    async def turn_count(self, session_id: str) -> int:
+        return await self._redis.llen(self._turns_key(session_id))
+
+    async def delete_session(self, session_id: str) -> None:
+        await self._redis.delete(self._meta_key(session_id), self._turns_key(session_id))
+
+    async def list_session_ids(self) -> List[str]:
+        suffix = ":meta"
+        session_ids = []
+        async for key in self._redis.scan_iter(match=f"{self._prefix}*{suffix}"):
+            key = self._decode(key)
+            session_ids.append(key[len(self._prefix):-len(suffix)])
+        return session_ids
+
+
+def create_session_store(backend: str = config.SESSION_STORE_BACKEND) -> SessionStore:
+    """Builds the session store selected by configuration ("memory" or "redis")."""
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    raise ValueError(f"Unknown session store backend: {backend!r}")
@@ -0,0 +1,182 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
+import asyncio
+import json
+import os
+import random
+
+from backend.app import config
+from backend.app.log import get_logger
+from backend.app.services.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+# Timing and randomness of the simulated services.
+#
+# The placeholder STT/LLM/TTS don't sleep or draw random values themselves; they ask the
+# simulation profile, selected at startup with VOCAHIRE_SIMULATION_PROFILE:
+#   "realistic": delays sampled from per-operation distributions (default). Seeded with
+#                VOCAHIRE_SIMULATION_SEED, a run's delays and scripted choices are reproducible:
+#                every (operation, session) pair draws from its own stream seeded from the seed,
+#                so what a session gets doesn't depend on how it interleaves with other sessions.
+#   "zero": no delays (each simulated wait only yields to the event loop), for tests, CI load
+#           tests and benchmarks.
+#   "replay": per-operation latencies from a trace file, in recorded order (cycling), e.g. one
+#             recorded in production with VOCAHIRE_SIMULATION_RECORD_PATH. Operations missing
+#             from the trace fall back to the realistic distributions. The trace is consumed in
+#             order by all sessions together, so concurrent runs replay it in arrival order.
+#
+# Delays are per unit of an operation (see OPERATIONS) and scaled by VOCAHIRE_SIMULATION_TIME_SCALE.
+# A trace file is JSON: {"version": 1, "operations": {"llm_first_token": [0.61, 0.87, ...], ...}}.
+
+T = TypeVar("T")
+
+# Operation -> (fixed seconds, uniform jitter seconds) per unit, for the realistic profile
+OPERATIONS: Dict[str, tuple] = {
+    "stt_chunk": (0.08, 0.04), # Per streamed audio chunk
+    "stt_utterance": (0.08, 0.04), # Per utterance cut by the VAD
+    "stt_file": (0.8, 0.4), # Per complete recording
+    "llm_first_token": (0.5, 1.0), # Until the first chunk of a response
+    "llm_token": (0.04, 0.02), # Per further word of a response
+    "tts_word": (0.08, 0.04), # Per synthesized word
+    "tts_request": (0.4, 0.2), # Fixed cost of a complete-text synthesis request
+}
+
+TRACE_VERSION = 1
+MAX_RECORDED_PER_OPERATION = 100_000
+
+
+def load_trace(path: str) -> Dict[str, List[float]]:
+    with open(path) as f:
+        trace = json.load(f)
+    if trace.get("version") != TRACE_VERSION:
+        raise ValueError(f"Unsupported latency trace version in {path}: {trace.get('version')!r}")
+    unknown = set(trace["operations"]) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations in latency trace {path}: {sorted(unknown)}")
+    return {operation: [float(value) for value in values] for operation, values in trace["operations"].items()}
+
+
+class SimulationProfile(ABC):
+    name = ""
+
+    def __init__(self, seed: Optional[int] = config.SIMULATION_SEED, time_scale: float = config.SIMULATION_TIME_SCALE):
+        self.seed = seed
+        self.time_scale = time_scale
+        self._streams: TTLCache[Tuple[str, Optional[str]], random.Random] = TTLCache(
+            max_size=config.SIMULATION_MAX_STREAMS, ttl_seconds=config.SIMULATION_STREAM_TTL_SECONDS)
+
+    def stream(self, operation: str, session_id: Optional[str] = None) -> random.Random:
+        """Returns the random generator of an operation in a session (seeded from the profile's seed)."""
+        key = (operation, session_id)
+        generator = self._streams.get(key)
+        if generator is None:
+            generator = random.Random(None if self.seed is None else f"{self.seed}:{operation}:{session_id}")
+            self._streams.set(key, generator)
+        return generator
+
+    @abstractmethod
+    def _sample(self, operation: str, session_id: Optional[str]) -> float:
+        """Returns the seconds one unit of `operation` takes."""
+
+    def delay(self, operation: str, units: float = 1, session_id: Optional[str] = None) -> float:
+        return self._sample(operation, session_id) * units * self.time_scale
+
+    def choice(self, options: Sequence[T], operation: str = "choice", session_id: Optional[str] = None) -> T:
+        return self.stream(operation, session_id).choice(options)
+
+
+class RealisticProfile(SimulationProfile):
+    name = "realistic"
+
+    def _sample(self, operation: str, session_id: Optional[str]) -> float:
+        fixed, jitter = OPERATIONS[operation]
+        return fixed + self.stream(operation, session_id).uniform(0, jitter)
+
+
+class ZeroProfile(SimulationProfile):
+    name = "zero"
+
+    def __init__(self, seed: Optional[int] = config.SIMULATION_SEED, time_scale: float = config.SIMULATION_TIME_SCALE):
+        # Deterministic even without a seed, so every zero-latency run makes the same choices
+        super().__init__(0 if seed is None else seed, time_scale)
+
+    def _sample(self, operation: str, session_id: Optional[str]) -> float:
+        return 0.0
+
+
+class ReplayProfile(RealisticProfile):
+    name = "replay"
+
+    def __init__(self, trace_path: str = config.SIMULATION_TRACE_PATH, seed: Optional[int] = config.SIMULATION_SEED,
+                 time_scale: float = config.SIMULATION_TIME_SCALE):
+        super().__init__(seed, time_scale)
+        if not trace_path:
+            raise ValueError("The replay simulation profile needs VOCAHIRE_SIMULATION_TRACE_PATH")
+        self.trace = load_trace(trace_path)
+        self._cursors: Dict[str, int] = {}
+        logger.info("Loaded latency trace", path=trace_path, samples={operation: len(values) for operation, values in self.trace.items()})
+
+    def _sample(self, operation: str, session_id: Optional[str]) -> float:
+        values = self.trace.get(operation)
+        if not values:
+            return super()._sample(operation, session_id)
+        cursor = self._cursors.get(operation, 0)
+        self._cursors[operation] = cursor + 1
+        return values[cursor % len(values)]
+
+
+SIMULATION_PROFILES = {
+    RealisticProfile.name: RealisticProfile,
+    ZeroProfile.name: ZeroProfile,
+    ReplayProfile.name: ReplayProfile,
+}
+
+def create_simulation_profile(name: str = config.SIMULATION_PROFILE) -> SimulationProfile:
+    """Builds the simulation profile selected by configuration (see SIMULATION_PROFILES)."""
+    if name not in SIMULATION_PROFILES:
+        raise ValueError(f"Unknown simulation profile: {name!r}")
+    return SIMULATION_PROFILES[name]()
+
+profile: SimulationProfile = create_simulation_profile()
+
+def configure(name: str):
+    """Replaces the simulation profile (e.g. with "zero" in benchmarks)."""
+    global profile
+    profile = create_simulation_profile(name)
+
+
+async def sleep(operation: str, units: float = 1, session_id: Optional[str] = None):
+    """Waits as long as `units` of the simulated operation take in a session under the current profile."""
+    await asyncio.sleep(profile.delay(operation, units, session_id))
+
+def choice(options: Sequence[T], operation: str = "choice", session_id: Optional[str] = None) -> T:
+    """Picks one of `options` with the (possibly seeded) random stream of an operation in a session."""
+    return profile.choice(options, operation, session_id)
+
+
+# Latencies observed at the service boundaries (whatever the backend), for VOCAHIRE_SIMULATION_RECORD_PATH
+_recorded: Dict[str, List[float]] = {}
+
+def record(operation: str, seconds: float, units: float = 1):
+    """Records an observed latency of `units` of an operation (no-op unless recording is enabled)."""
+    if not config.SIMULATION_RECORD_PATH or units <= 0:
+        return
+    values = _recorded.setdefault(operation, [])
+    if len(values) < MAX_RECORDED_PER_OPERATION:
+        values.append(round(seconds / units, 6))
+
+def save_trace(path: str = config.SIMULATION_RECORD_PATH) -> int:
+    """Writes the recorded latencies as a replayable trace and returns the number of samples."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"version": TRACE_VERSION, "operations": _recorded}, f)
+    return sum(len(values) for values in _recorded.values())
+
+def shutdown():
+    """Writes the recorded trace, if recording is enabled (called on application shutdown)."""
+    if config.SIMULATION_RECORD_PATH:
+        samples = save_trace()
+        logger.info("Saved latency trace", path=config.SIMULATION_RECORD_PATH, samples=samples)
@@ -0,0 +1,43 @@
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+import asyncio
+
+# Deduplicates concurrent work per key ("single flight"), for the caches in front of
+# expensive calls (summary generation, speech synthesis).
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Runs at most one `work()` per key at a time and shares its outcome with every caller.
+
+    The work runs in its own task rather than in the task of the caller that started it, and
+    every caller waits on it through `asyncio.shield`: a cancelled caller (e.g. a request whose
+    client disconnected) stops waiting, but the work carries on for the others. Exceptions are
+    raised to every caller, and nothing is remembered once the work finishes.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[K, "asyncio.Task[V]"] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def run(self, key: K, work: Callable[[], Awaitable[V]]) -> V:
+        """
+        Returns the result of `work()`, joining the run already in progress for `key` if any.
+
+        Args:
+            key: Identifies the work; concurrent calls with the same key share one run.
+            work: Coroutine factory, only called when no run for `key` is in progress.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(work())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
@@ -0,0 +1,69 @@
+from typing import Dict, Optional
+import asyncio
+
+from backend.app import config
+from backend.app.services import llm_service, tts_service
+from backend.app.services.text_segmenter import segment_text
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Speculative prefetch of the next AI turn.
+#
+# Most replies are an acknowledgement plus the next question from interview_questions, which is
+# known before the candidate finishes answering. As soon as the candidate starts speaking, the
+# predicted reply is generated and its segments are synthesized. When the final transcript arrives
+# the reply either uses the prepared text and audio, or the speculation is cancelled. Only scripted
+# providers are speculated on: a model's wording (and so its TTS segments) isn't known in advance.
+
+stats = {"started": 0, "used": 0, "discarded": 0}
+
+
+class Speculation:
+    """The likely next AI turn of one session, being prepared while the candidate speaks."""
+
+    def __init__(self, session_id: str, prediction: llm_service.PredictedResponse):
+        self.session_id = session_id
+        self.prediction = prediction
+        # Synthesis of each predicted segment, by segment text (handed to the TTS pipeline)
+        self.prepared_audio: Dict[str, "asyncio.Task[bytes]"] = {}
+        self._task = asyncio.create_task(self._pre_synthesize())
+        stats["started"] += 1
+
+    async def _pre_synthesize(self):
+        try:
+            text = await asyncio.shield(self.prediction.generation)
+        except Exception:
+            return # generate_interview_response deals with a failed generation
+        # One segment at a time, in speaking order, like the TTS pipeline itself
+        for segment in segment_text(text):
+            task = asyncio.create_task(tts_service.synthesize_segment(segment, self.session_id))
+            self.prepared_audio[segment] = task
+            await asyncio.wait([task])
+
+    @property
+    def used(self) -> bool:
+        return self.prediction.used
+
+    def finish(self):
+        """Ends the speculation after the turn: cancels whatever the turn didn't use."""
+        stats["used" if self.used else "discarded"] += 1
+        self.prediction.cancel()
+        # Stops before the next segment; a segment already being synthesized completes into the
+        # TTS cache, since other sessions may be waiting on the same cache entry
+        self._task.cancel()
+
+
+async def start(session_id: str) -> Optional[Speculation]:
+    """Starts preparing the reply to the candidate's current answer (None if there's nothing to predict)."""
+    if not config.SPECULATIVE_PREFETCH_ENABLED:
+        return None
+    prediction = await llm_service.predict_next_response(session_id)
+    if prediction is None:
+        return None
+    logger.debug("Preparing next question", session_id=session_id, question=prediction.question)
+    return Speculation(session_id, prediction)
+
+def report() -> Dict[str, float]:
+    finished = stats["used"] + stats["discarded"]
+    return {**stats, "hit_rate": round(stats["used"] / finished, 3) if finished else 0.0}
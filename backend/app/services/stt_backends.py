@@ -0,0 +1,180 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import asyncio
+import io
+import multiprocessing
+import wave
+
+import numpy as np
+
+from backend.app import config
+from backend.app.services import simulation
+from backend.app.services.stt_batcher import MicroBatcher
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Speech-to-text backends.
+#
+# A backend either streams partial results per audio chunk (`streaming_partials`) or
+# transcribes whole utterances, which stt_service cuts with the VAD. Backends are selected
+# with VOCAHIRE_STT_BACKEND:
+#   "simulated": placeholder results, no model (default)
+#   "whisper": a local CPU Whisper model (faster-whisper / CTranslate2, int8) in a dedicated
+#              worker process; utterances from all sessions are micro-batched into one
+#              encoder/decoder pass.
+
+
+class STTBackend(ABC):
+    name = ""
+    # True if the backend produces partial results per chunk; otherwise only whole utterances are transcribed
+    streaming_partials = False
+
+    async def start(self):
+        """Prepares the backend (e.g. loads the model) so the first request doesn't pay for it."""
+
+    async def transcribe_chunk(self, audio_chunk: bytes, session_id: str, chunk_index: int) -> Optional[str]:
+        """Returns partial text for one chunk of an utterance (streaming backends only)."""
+        return None
+
+    @abstractmethod
+    async def transcribe_utterance(self, pcm: bytes, session_id: str) -> str:
+        """Returns the text of one utterance (16 kHz 16-bit mono PCM)."""
+
+    async def transcribe_file(self, audio_data: bytes, session_id: str) -> str:
+        """Returns the text of a complete recording (16-bit PCM WAV, or raw PCM)."""
+        return await self.transcribe_utterance(pcm_from_audio_file(audio_data), session_id)
+
+    def stats(self) -> Dict[str, float]:
+        return {}
+
+    async def close(self):
+        pass
+
+
+def pcm_from_audio_file(audio_data: bytes) -> bytes:
+    if audio_data[:4] != b"RIFF":
+        return audio_data
+    with wave.open(io.BytesIO(audio_data)) as reader:
+        return reader.readframes(reader.getnframes())
+
+
+class SimulatedSTTBackend(STTBackend):
+    """Placeholder results for development without a model."""
+
+    name = "simulated"
+    streaming_partials = True
+
+    async def transcribe_chunk(self, audio_chunk: bytes, session_id: str, chunk_index: int) -> Optional[str]:
+        await simulation.sleep("stt_chunk", session_id=session_id) # Simulate processing time
+        # This is a very simplified simulation.
+        # A real STT would provide more meaningful partial/final transcriptions.
+        return f"Simulated word {chunk_index+1}"
+
+    async def transcribe_utterance(self, pcm: bytes, session_id: str) -> str:
+        await simulation.sleep("stt_utterance", session_id=session_id)
+        return "This is a simulated transcription of the utterance."
+
+    async def transcribe_file(self, audio_data: bytes, session_id: str) -> str:
+        await simulation.sleep("stt_file", session_id=session_id) # Simulate processing time
+        return "This is a simulated transcription of the complete audio."
+
+
+# --- Whisper worker process ---
+# These run in the worker process; the model is loaded once by the pool initializer.
+
+_whisper_model = None
+_whisper_language: Optional[str] = None
+
+def _load_whisper_model(model_name: str, compute_type: str, cpu_threads: int, language: str):
+    global _whisper_model, _whisper_language
+    from faster_whisper import WhisperModel
+    _whisper_model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+    _whisper_language = language
+
+def _whisper_ready() -> bool:
+    return _whisper_model is not None
+
+def _whisper_transcribe_batch(utterances: List[bytes]) -> List[str]:
+    """Transcribes a batch of 16 kHz PCM utterances in one encoder/decoder pass."""
+    from faster_whisper.audio import pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
+
+    model = _whisper_model
+    window = model.feature_extractor.n_samples # 30 s
+    audios = [np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0 for pcm in utterances]
+    texts = [""] * len(audios)
+
+    short = [i for i, audio in enumerate(audios) if 0 < len(audio) <= window]
+    if short:
+        tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language=_whisper_language)
+        prompt = model.get_prompt(tokenizer, previous_tokens=[], without_timestamps=True)
+        features = np.stack([pad_or_trim(model.feature_extractor(audios[i])[..., :-1]) for i in short])
+        encoder_output = model.encode(features)
+        results = model.model.generate(encoder_output, [list(prompt) for _ in short], beam_size=1,
+                                       max_length=model.max_length, suppress_blank=True, suppress_tokens=[-1])
+        for i, result in zip(short, results):
+            texts[i] = tokenizer.decode(result.sequences_ids[0]).strip()
+
+    # Longer recordings (e.g. transcribe_file) go through the regular sliding-window transcription
+    for i, audio in enumerate(audios):
+        if len(audio) > window:
+            segments, _ = model.transcribe(audio, language=_whisper_language, beam_size=1)
+            texts[i] = " ".join(segment.text.strip() for segment in segments)
+    return texts
+
+
+class WhisperSTTBackend(STTBackend):
+    """Local CPU Whisper model in a dedicated worker process, with cross-session micro-batching."""
+
+    name = "whisper"
+    streaming_partials = False
+
+    def __init__(self, model_name: str = config.STT_WHISPER_MODEL,
+                 compute_type: str = config.STT_WHISPER_COMPUTE_TYPE,
+                 cpu_threads: int = config.STT_WHISPER_THREADS,
+                 language: str = config.STT_LANGUAGE):
+        self._init_args = (model_name, compute_type, cpu_threads, language)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.batcher: MicroBatcher[bytes, str] = MicroBatcher(self._run_batch)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # One process owns the model; batching, not more processes, is how it scales
+            self._process_pool = ProcessPoolExecutor(max_workers=1, initializer=_load_whisper_model, initargs=self._init_args,
+                                                     mp_context=multiprocessing.get_context(config.PROCESS_START_METHOD))
+        return self._process_pool
+
+    async def _run_batch(self, utterances: List[bytes]) -> List[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_process_pool(), _whisper_transcribe_batch, utterances)
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_process_pool(), _whisper_ready)
+        logger.info("Whisper model loaded in worker process", model=self._init_args[0])
+
+    async def transcribe_utterance(self, pcm: bytes, session_id: str) -> str:
+        return await self.batcher.submit(pcm)
+
+    def stats(self) -> Dict[str, float]:
+        return self.batcher.stats()
+
+    async def close(self):
+        await self.batcher.close()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
+
+STT_BACKENDS = {
+    SimulatedSTTBackend.name: SimulatedSTTBackend,
+    WhisperSTTBackend.name: WhisperSTTBackend,
+}
+
+def create_stt_backend(name: str = config.STT_BACKEND) -> STTBackend:
+    """Builds the STT backend selected by configuration (see STT_BACKENDS)."""
+    if name not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend: {name!r}")
+    return STT_BACKENDS[name]()
@@ -0,0 +1,96 @@
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+import asyncio
+
+from backend.app import config
+
+# Cross-session micro-batcher for inference calls.
+# Requests from all sessions are queued; a single dispatcher sends them to the model in
+# batches of up to `max_batch_size`, waiting at most `max_wait_ms` for a batch to fill. While a
+# batch is running, new requests accumulate for the next one, so batches grow with load and
+# a CPU model does one forward pass for many sessions instead of one per utterance.
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(self, run_batch: Callable[[List[T]], Awaitable[List[R]]],
+                 max_batch_size: int = config.STT_BATCH_MAX_SIZE,
+                 max_wait_ms: float = config.STT_BATCH_WINDOW_MS):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max_wait_ms / 1000
+        self._pending: List[Tuple[T, "asyncio.Future[R]"]] = []
+        self._has_pending: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item: T) -> R:
+        """Queues one request and returns its result once its batch has run."""
+        if self._dispatcher is None or self._dispatcher.done():
+            self._has_pending = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        future: "asyncio.Future[R]" = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def _dispatch(self):
+        while True:
+            await self._has_pending.wait()
+            if len(self._pending) < self.max_batch_size:
+                # Keep the window open briefly so requests from other sessions can join
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self.max_wait_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            if not self._pending:
+                self._has_pending.clear()
+            if len(self._pending) < self.max_batch_size:
+                self._batch_full.clear()
+            # Requests whose caller went away (e.g. the turn was cancelled) are not run
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            try:
+                results = await self.run_batch([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "queued": len(self._pending),
+        }
@@ -1,70 +1,113 @@
-from typing import AsyncGenerator, Tuple
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
 import time
 
-# Placeholder for actual STT integration (e.g., Whisper)
-# You would need to install and configure an STT library like openai-whisper.
-# Ensure you have ffmpeg installed if using whisper.
+from backend.app.services import metrics_service, simulation
+from backend.app.services.stt_backends import STTBackend, create_stt_backend
+from backend.app.services.vad_service import VoiceActivityDetector, SPEECH_END, END_OF_TURN
+from backend.app.log import get_logger
 
-async def transcribe_audio_stream(audio_chunks: AsyncGenerator[bytes, None], session_id: str) -> AsyncGenerator[Tuple[str, bool], None]:
+logger = get_logger(__name__)
+
+# Speech-to-text entry points. The engine is a pluggable backend (see stt_backends.py),
+# selected with VOCAHIRE_STT_BACKEND; the default simulator needs no model.
+
+backend: STTBackend = create_stt_backend()
+
+async def start():
+    """Prepares the configured backend (called on application startup)."""
+    await backend.start()
+
+async def shutdown():
+    await backend.close()
+
+def stats() -> Dict[str, float]:
+    return {"backend": backend.name, **backend.stats()}
+
+async def transcribe_audio_stream(audio_chunks: AsyncGenerator[bytes, None], session_id: str,
+                                  vad: Optional[VoiceActivityDetector] = None) -> AsyncGenerator[Tuple[str, bool], None]:
     """
-    Placeholder for real-time STT.
-    This function would receive audio chunks, process them, and yield transcriptions.
+    Real-time STT: receives audio chunks and yields transcriptions.
+    Streaming backends yield a partial result per chunk; utterance backends (e.g. Whisper)
+    transcribe each utterance once it ends.
+
+    If a VoiceActivityDetector is given, it decides where utterances start and end: chunks
+    outside speech are not transcribed, a final transcript is yielded at each speech end, and
+    the stream stops as soon as the detector reports the end of the candidate's turn
+    (check `vad.turn_ended` afterwards). Without a detector every chunk is transcribed and
+    the utterance ends with the audio stream.
     
     Args:
-        audio_chunks: An async generator yielding audio byte chunks.
+        audio_chunks: An async generator yielding audio byte chunks (16-bit mono PCM when using VAD).
         session_id: The session ID for context.
+        vad: Optional voice activity detector used for endpointing.
 
     Yields:
         A tuple of (transcribed_text, is_final_transcript_for_utterance).
     """
-    print(f"[STT Service - Session {session_id}] Initializing transcription.")
+    logger.debug("Initializing transcription", session_id=session_id)
     
     full_utterance_text = ""
+    utterance_audio: List[bytes] = [] # Speech of the current utterance, for utterance backends
     utterance_count = 0
+    chunk_index = 0
+    skipped_chunks = 0
+
+    async for audio_chunk in audio_chunks:
+        vad_result = vad.process(audio_chunk) if vad else None
+        if vad_result is None or vad_result.contains_speech:
+            if backend.streaming_partials:
+                started_at = time.perf_counter()
+                partial_text = await backend.transcribe_chunk(audio_chunk, session_id, chunk_index)
+                metrics_service.observe_stage("stt_partial", time.perf_counter() - started_at)
+                simulation.record("stt_chunk", time.perf_counter() - started_at)
+                if partial_text:
+                    full_utterance_text += partial_text + " "
+                    yield (partial_text, False) # Yield intermediate result
+            else:
+                utterance_audio.append(audio_chunk)
+        else:
+            skipped_chunks += 1 # Silence is not sent to the STT engine
+        chunk_index += 1
+
+        for event in (vad_result.events if vad_result else []):
+            utterance_ended_at = time.perf_counter()
+            if event.kind == SPEECH_END and utterance_audio:
+                full_utterance_text = await backend.transcribe_utterance(b"".join(utterance_audio), session_id)
+                simulation.record("stt_utterance", time.perf_counter() - utterance_ended_at)
+                utterance_audio = []
+            if event.kind == SPEECH_END and full_utterance_text:
+                logger.debug("Utterance ended", session_id=session_id, utterance=utterance_count,
+                             stream_time=round(event.stream_time, 2), text=full_utterance_text.strip())
+                metrics_service.observe_stage("stt_final", time.perf_counter() - utterance_ended_at)
+                yield (full_utterance_text.strip(), True) # Yield final part of this utterance
+                full_utterance_text = "" # Reset for next utterance
+                utterance_count += 1
+            elif event.kind == END_OF_TURN:
+                logger.debug("End of turn detected", session_id=session_id, stream_time=round(event.stream_time, 2))
 
-    # Simulate receiving and processing audio chunks
-    async for chunk_index, audio_chunk in enumerate(audio_chunks):
-        # In a real implementation, you'd accumulate chunks and send them to an STT engine.
-        # The STT engine might provide intermediate and final results.
-        print(f"[STT Service - Session {session_id}] Received audio chunk {chunk_index} of length {len(audio_chunk)}.")
-        
-        # Simulate transcription delay and partial results
-        await asyncio.sleep(0.1) # Simulate processing time
-        
-        # This is a very simplified simulation.
-        # A real STT would provide more meaningful partial/final transcriptions.
-        simulated_text = f"Simulated word {chunk_index+1} "
-        full_utterance_text += simulated_text
-        
-        # Yield intermediate result
-        yield (simulated_text.strip(), False)
-        
-        # Simulate end of utterance detection (e.g., VAD or fixed chunk count)
-        if (chunk_index + 1) % 5 == 0: # Arbitrary: assume utterance ends every 5 chunks
-            print(f"[STT Service - Session {session_id}] Utterance {utterance_count} ended: '{full_utterance_text.strip()}'")
-            yield (full_utterance_text.strip(), True) # Yield final part of this utterance
-            full_utterance_text = "" # Reset for next utterance
-            utterance_count += 1
-            await asyncio.sleep(0.5) # Simulate pause between utterances
-
-    # If there's any remaining text not marked as final
+        if vad and vad.turn_ended:
+            break # The server ends the turn; remaining audio belongs to nobody
+
+    # If there's any remaining text (or untranscribed speech) not marked as final
+    utterance_ended_at = time.perf_counter()
+    if utterance_audio:
+        full_utterance_text = await backend.transcribe_utterance(b"".join(utterance_audio), session_id)
+        simulation.record("stt_utterance", time.perf_counter() - utterance_ended_at)
     if full_utterance_text:
-        print(f"[STT Service - Session {session_id}] Finalizing remaining text: '{full_utterance_text.strip()}'")
+        logger.debug("Finalizing remaining text", session_id=session_id, text=full_utterance_text.strip())
+        metrics_service.observe_stage("stt_final", time.perf_counter() - utterance_ended_at)
         yield (full_utterance_text.strip(), True)
 
-    print(f"[STT Service - Session {session_id}] Transcription stream ended.")
+    logger.debug("Transcription stream ended", session_id=session_id, chunks=chunk_index, silent_chunks_skipped=skipped_chunks)
 
 # Example of a non-streaming STT function (more common for Whisper batch processing)
 async def transcribe_single_audio_file(audio_data: bytes, session_id: str) -> str:
     """
-    Placeholder for transcribing a complete audio file/segment.
+    Transcribes a complete audio file/segment (16-bit PCM WAV or raw 16 kHz PCM).
     """
-    print(f"[STT Service - Session {session_id}] Transcribing complete audio segment of length {len(audio_data)}.")
-    # Simulate STT processing
-    await asyncio.sleep(1) # Simulate processing time
-    transcribed_text = "This is a simulated transcription of the complete audio."
-    print(f"[STT Service - Session {session_id}] Transcription complete: '{transcribed_text}'")
+    logger.debug("Transcribing complete audio segment", session_id=session_id, bytes=len(audio_data))
+    started_at = time.perf_counter()
+    transcribed_text = await backend.transcribe_file(audio_data, session_id)
+    simulation.record("stt_file", time.perf_counter() - started_at)
+    logger.debug("Transcription complete", session_id=session_id, text=transcribed_text)
     return transcribed_text
-
-# Python's standard asyncio library
-import asyncio
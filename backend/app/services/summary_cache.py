@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Tuple
+
+from backend.app import config
+from backend.app.models.interview_models import SessionSummary
+from backend.app.services.single_flight import SingleFlight
+from backend.app.services.ttl_cache import TTLCache
+
+# Cache of generated session summaries, keyed by session ID and transcript version
+# (the number of turns). Entries hold the summary together with its serialised JSON so
+# repeated GETs are served without re-running model_dump_json. Concurrent requests for
+# the same session and version share a single computation (single flight).
+
+
+@dataclass
+class CachedSummary:
+    version: int
+    summary: SessionSummary
+    json_bytes: bytes
+
+
+class SummaryCache:
+    def __init__(self, max_entries: int = config.SUMMARY_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = config.SUMMARY_CACHE_TTL_SECONDS):
+        # One entry per session: a newer transcript version replaces the old entry
+        self._entries: TTLCache[str, CachedSummary] = TTLCache(max_size=max_entries, ttl_seconds=ttl_seconds)
+        self._flights: SingleFlight[Tuple[str, int], Optional[CachedSummary]] = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str, version: int) -> Optional[CachedSummary]:
+        entry = self._entries.get(session_id)
+        return entry if entry is not None and entry.version == version else None
+
+    async def get_or_compute(self, session_id: str, version: int,
+                             compute: Callable[[], Awaitable[Optional[SessionSummary]]]) -> Optional[CachedSummary]:
+        """
+        Returns the cached summary for this transcript version, computing it at most once.
+
+        Args:
+            session_id: The session ID.
+            version: Transcript version (turn count) the summary must reflect.
+            compute: Coroutine factory producing the summary (or None if it can't be generated).
+        """
+        entry = self.get(session_id, version)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        flight_key = (session_id, version)
+        if flight_key in self._flights:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return await self._flights.run(flight_key, lambda: self._compute(session_id, version, compute))
+
+    async def _compute(self, session_id: str, version: int,
+                       compute: Callable[[], Awaitable[Optional[SessionSummary]]]) -> Optional[CachedSummary]:
+        summary = await compute()
+        if summary is None:
+            return None
+        entry = CachedSummary(version=version, summary=summary, json_bytes=summary.model_dump_json().encode("utf-8"))
+        self._entries.set(session_id, entry)
+        return entry
+
+    def invalidate(self, session_id: str):
+        self._entries.pop(session_id)
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,80 @@
+from typing import List, Optional
+import re
+
+# Cuts a stream of LLM tokens into speakable segments so TTS can start on the first
+# sentence while the LLM is still generating the rest of the response.
+
+# End of sentence: terminal punctuation (optionally followed by closing quotes/brackets) and whitespace.
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+")
+# End of clause: only used to cut long sentences early.
+_CLAUSE_END = re.compile(r"[,;:—]\s+")
+# Words whose period doesn't end the sentence (lowercase, without the final period). Single letters
+# (initials) are treated the same way. "etc." is left out: it usually ends the sentence it's in.
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "e.g", "i.e", "approx", "dept", "inc", "ltd"}
+
+
+def _is_abbreviation(text: str, match: "re.Match[str]") -> bool:
+    """True if the sentence end `match` is just the period of an abbreviation like "Dr." or "e.g."."""
+    if not match.group().startswith(".") or match.group()[1:2] in (".", "…"):
+        return False
+    end = match.start()
+    start = max(text.rfind(" ", 0, end), text.rfind("\n", 0, end)) + 1
+    word = text[start:end].lstrip("\"'([")
+    return word.lower() in _ABBREVIATIONS or (len(word) == 1 and word.isupper())
+
+
+class TextSegmenter:
+    """
+    Incremental sentence/clause segmenter.
+
+    Feed it text chunks as they arrive; it returns every segment that closed.
+    A sentence closes at terminal punctuation followed by whitespace, except after common
+    abbreviations and initials ("Dr. ", "e.g. ", "J. "). Long sentences are
+    also cut at a clause boundary once they reach `min_clause_chars`, and hard-cut at the
+    last space once they reach `max_chars`, so a run-on response never stalls TTS.
+    """
+
+    def __init__(self, min_clause_chars: int = 60, max_chars: int = 200):
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text_chunk: str) -> List[str]:
+        self._buffer += text_chunk
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """Returns whatever text is left once the LLM stream has ended."""
+        segment, self._buffer = self._buffer.strip(), ""
+        return segment or None
+
+    def _find_cut(self) -> Optional[int]:
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if not _is_abbreviation(self._buffer, match):
+                return match.end()
+        if len(self._buffer) >= self.min_clause_chars:
+            match = _CLAUSE_END.search(self._buffer, self.min_clause_chars - 1)
+            if match:
+                return match.end()
+        if len(self._buffer) >= self.max_chars:
+            space = self._buffer.rfind(" ", 0, self.max_chars)
+            return space + 1 if space > 0 else self.max_chars
+        return None
+
+
+def segment_text(text: str) -> List[str]:
+    """Returns the segments of a complete text, as TTS would receive them if it arrived in one chunk."""
+    segmenter = TextSegmenter()
+    segments = segmenter.feed(text)
+    remaining = segmenter.flush()
+    if remaining:
+        segments.append(remaining)
+    return segments
@@ -0,0 +1,290 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import glob
+import json
+import os
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError: # Windows: orphaned logs are detected by their writer's PID instead
+    fcntl = None
+
+from backend.app import config
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
+
+# Optional write-ahead log (WAL) for session transcripts, for crash recovery.
+#
+# Each worker process appends JSON lines to its own file (wal-<pid>-<random>.jsonl, new for
+# every process start, so a restarted worker that gets its predecessor's PID never mistakes
+# that log for its own) and holds an exclusive flock on it while it runs. Appends only go to an
+# in-memory buffer on the hot path; a background task writes and fsyncs the buffer as one
+# group commit every WAL_FLUSH_INTERVAL_SECONDS, or sooner once WAL_FLUSH_RECORDS records
+# are pending. At startup, every log no running worker holds is replayed into the session
+# store and then folded into this worker's own log. A clean stop compacts the log first, so
+# only the sessions still in the store at shutdown are replayed.
+#
+# Record types ("op"): "init" (session created), "turn" (transcript turn), "status" (status change),
+# "evict" (archived and removed from the store; not replayed even if its records weren't compacted yet).
+
+# Returns the IDs of the sessions still in the store (records of other sessions are dropped on compaction)
+LiveSessionsProvider = Callable[[], Awaitable[Iterable[str]]]
+
+
+def _wal_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"wal-{pid}-{uuid.uuid4().hex[:12]}.jsonl")
+
+def _writer_pid(path: str) -> Optional[int]:
+    try:
+        return int(os.path.basename(path)[len("wal-"):].split("-")[0].split(".")[0])
+    except ValueError:
+        return None
+
+def _try_lock(f) -> bool:
+    """Takes the exclusive lock on an open log without waiting; False if another process holds it."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TranscriptWAL:
+    def __init__(self, directory: str = config.WAL_DIR,
+                 flush_interval: float = config.WAL_FLUSH_INTERVAL_SECONDS,
+                 flush_records: int = config.WAL_FLUSH_RECORDS,
+                 max_bytes: int = config.WAL_MAX_BYTES):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self.max_bytes = max_bytes
+        self.path = _wal_path(directory, os.getpid())
+        self._pending: List[str] = []
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._file = None
+        self._live_sessions: Optional[LiveSessionsProvider] = None
+        self._flush_lock = asyncio.Lock()
+
+    # --- Hot path ---
+
+    def append(self, record: Dict[str, Any]):
+        self._pending.append(json.dumps(record, separators=(",", ":")))
+        if len(self._pending) >= self.flush_records and self._flush_requested is not None:
+            self._flush_requested.set()
+
+    # --- Group commit ---
+
+    def _write(self, lines: List[str]):
+        # Runs in a worker thread
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def flush(self):
+        # Serialised so a flush from stop() can't interleave with one from the background task
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+            await asyncio.to_thread(self._write, lines)
+            if self.max_bytes and self._file.tell() > self.max_bytes:
+                await self._compact()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Error flushing log", error=str(e))
+
+    def start(self, live_sessions: LiveSessionsProvider):
+        """
+        Opens (and locks) this worker's log and starts the background flusher.
+
+        Args:
+            live_sessions: Returns the IDs of the sessions to keep when the log is compacted.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._live_sessions = live_sessions
+        self._file = self._open_locked()
+        self._flush_requested = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._file is not None:
+            await self.flush()
+            async with self._flush_lock:
+                # Drop the sessions that were evicted, so the next start doesn't bring them back
+                await self._compact()
+            self._file.close()
+            self._file = None
+
+    def _open_locked(self):
+        f = open(self.path, "a", encoding="utf-8")
+        if not _try_lock(f): # Can't happen for a fresh name, but never share a log
+            f.close()
+            raise RuntimeError(f"Transcript log {self.path} is locked by another process")
+        return f
+
+    async def _compact(self):
+        """
+        Rewrites this worker's log without the records of sessions no longer in the store.
+        Runs under the flush lock after a flush, so the whole log is on disk; the log is
+        filtered in a worker thread, and only the set of live session IDs is read on the loop.
+        """
+        if self._live_sessions is None:
+            return
+        live = set(await self._live_sessions())
+        temp_path = self.path + ".compact"
+
+        def rewrite() -> int:
+            kept = 0
+            with open(self.path, encoding="utf-8") as source, open(temp_path, "w", encoding="utf-8") as f:
+                for line in source:
+                    try:
+                        session_id = json.loads(line).get("sid")
+                    except json.JSONDecodeError:
+                        continue
+                    if session_id in live:
+                        f.write(line)
+                        kept += 1
+                f.flush()
+                os.fsync(f.fileno())
+            # The lock moves to the new file before the old one is released
+            replacement = open(temp_path, "a", encoding="utf-8")
+            _try_lock(replacement)
+            os.replace(temp_path, self.path)
+            self._file.close()
+            self._file = replacement
+            return kept
+
+        kept = await asyncio.to_thread(rewrite)
+        logger.info("Compacted log", records=kept, sessions=len(live))
+
+
+# Orphaned logs being recovered by this worker, locked until remove_logs()
+_claimed_logs: Dict[str, Any] = {}
+
+def read_orphaned_logs(directory: str = config.WAL_DIR, own_path: Optional[str] = None) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Reads the logs no running worker holds, and keeps them locked (so no other worker starting
+    at the same time replays them too) until they are removed with remove_logs().
+
+    Returns:
+        (sessions, paths): recovered sessions keyed by ID, each with "start_time", "status",
+        "last_active_at" and "turns" (list of (speaker, text, timestamp)); and the log files read.
+    """
+    sessions: Dict[str, Dict[str, Any]] = {}
+    paths = []
+    for path in sorted(glob.glob(os.path.join(directory, "wal-*.jsonl"))):
+        if path == own_path or path in _claimed_logs:
+            continue
+        if fcntl is None:
+            pid = _writer_pid(path)
+            if pid is None or _pid_alive(pid):
+                continue
+        try:
+            f = open(path, encoding="utf-8")
+        except FileNotFoundError:
+            continue # Removed by the worker that recovered it
+        if not _try_lock(f):
+            f.close() # Held by a running worker
+            continue
+        try:
+            replaced = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            f.close() # Removed by a recovering worker, or replaced by its owner's compaction, since we opened it
+            continue
+        _claimed_logs[path] = f
+        paths.append(path)
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break # Torn write at the end of the log: everything before it is intact
+            session_id = record.get("sid")
+            op = record.get("op")
+            if op == "init":
+                sessions.setdefault(session_id, {"start_time": record["start"], "status": "active", "last_active_at": None, "turns": []})
+            elif session_id in sessions and op == "turn":
+                sessions[session_id]["turns"].append((record["speaker"], record["text"], record["ts"]))
+            elif session_id in sessions and op == "status":
+                sessions[session_id]["status"] = record["status"]
+                sessions[session_id]["last_active_at"] = record.get("ts")
+            elif op == "evict":
+                sessions.pop(session_id, None)
+    return sessions, paths
+
+def remove_logs(paths: Iterable[str]):
+    """Deletes recovered logs (once their sessions are durable elsewhere) and releases their locks."""
+    for path in paths:
+        os.remove(path)
+        f = _claimed_logs.pop(path, None)
+        if f is not None:
+            f.close()
+
+
+_wal: Optional[TranscriptWAL] = None
+
+def get_wal() -> Optional[TranscriptWAL]:
+    return _wal
+
+def log_session_started(session_id: str, start_time: float):
+    if _wal is not None:
+        _wal.append({"op": "init", "sid": session_id, "start": start_time})
+
+def log_turn(session_id: str, speaker: str, text: str, timestamp: float):
+    if _wal is not None:
+        _wal.append({"op": "turn", "sid": session_id, "speaker": speaker, "text": text, "ts": timestamp})
+
+def log_status(session_id: str, status: str, timestamp: Optional[float] = None):
+    if _wal is not None:
+        _wal.append({"op": "status", "sid": session_id, "status": status, "ts": timestamp if timestamp is not None else time.time()})
+
+def log_evicted(session_id: str):
+    if _wal is not None:
+        _wal.append({"op": "evict", "sid": session_id})
+
+def start(live_sessions: LiveSessionsProvider) -> Optional[TranscriptWAL]:
+    """Starts this worker's WAL if enabled (VOCAHIRE_WAL_ENABLED)."""
+    global _wal
+    if not config.WAL_ENABLED:
+        return None
+    _wal = TranscriptWAL()
+    _wal.start(live_sessions)
+    return _wal
+
+async def stop():
+    global _wal
+    if _wal is not None:
+        await _wal.stop()
+        _wal = None
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+import time
+
+# Small bounded LRU + TTL map used for per-session registries and caches.
+# Not thread-safe: it is meant to be used from the event loop thread.
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    An LRU map with a maximum size and an idle time-to-live.
+
+    Entries expire `ttl_seconds` after they were last written or read, and the least
+    recently used entry is evicted when `max_size` is exceeded. `on_evict(key, value)`
+    is called for entries removed by expiry or size pressure (not for explicit pops).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None,
+                 on_evict: Optional[Callable[[K, V], None]] = None):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._on_evict = on_evict
+        self._entries: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+
+    def _expired(self, last_access: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - last_access > self.ttl_seconds
+
+    def _evict(self, key: K) -> None:
+        value, _ = self._entries.pop(key)
+        if self._on_evict:
+            self._on_evict(key, value)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        now = time.monotonic()
+        if self._expired(entry[1], now):
+            self._evict(key)
+            return default
+        self._entries[key] = (entry[0], now)
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        self.purge_expired()
+        while len(self._entries) > self.max_size:
+            self._evict(next(iter(self._entries)))
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def purge_expired(self) -> int:
+        """Removes expired entries. Entries are kept in access order, so this stops at the first live one."""
+        if self.ttl_seconds is None:
+            return 0
+        now = time.monotonic()
+        removed = 0
+        while self._entries:
+            key, (_, last_access) = next(iter(self._entries.items()))
+            if not self._expired(last_access, now):
+                break
+            self._evict(key)
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[arg-type]
+        return entry is not None and not self._expired(entry[1], time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._entries))
+
+    def snapshot(self) -> Dict[K, V]:
+        """Returns a plain dict of the current (possibly not yet purged) entries."""
+        return {key: value for key, (value, _) in self._entries.items()}
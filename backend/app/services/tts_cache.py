@@ -0,0 +1,104 @@
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import hashlib
+import os
+import tempfile
+
+from backend.app import config
+from backend.app.services.single_flight import SingleFlight
+from backend.app.services.ttl_cache import TTLCache
+
+# Content-addressed cache of synthesized speech, keyed by the hash of (engine, voice, format, text).
+# Lookups go through an in-memory LRU tier, then a directory on disk shared by all workers;
+# disk hits are promoted to memory. Concurrent misses for the same key synthesize once.
+
+
+def cache_key(text: str, voice: str = config.TTS_VOICE, audio_format: str = config.TTS_FORMAT,
+              engine: str = config.TTS_ENGINE) -> str:
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{engine}\0{voice}\0{audio_format}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    def __init__(self, max_entries: int = config.TTS_CACHE_MAX_ENTRIES,
+                 cache_dir: Optional[str] = config.TTS_CACHE_DIR,
+                 max_files: int = config.TTS_CACHE_MAX_FILES,
+                 audio_format: str = config.TTS_FORMAT):
+        self._memory: TTLCache[str, bytes] = TTLCache(max_size=max_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_files = max_files
+        self.audio_format = audio_format
+        self._flights: SingleFlight[str, bytes] = SingleFlight()
+        self._disk_writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.{self.audio_format}"
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, audio: bytes):
+        # Written next to the final path and moved into place, so readers never see a partial file
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, self._path(key))
+
+    def _prune(self):
+        files = sorted(self.cache_dir.glob(f"*.{self.audio_format}"), key=lambda p: p.stat().st_mtime)
+        for stale in files[:max(0, len(files) - self.max_files)]:
+            stale.unlink(missing_ok=True)
+
+    async def get_or_synthesize(self, text: str, synthesize: Callable[[], Awaitable[bytes]],
+                                voice: str = config.TTS_VOICE) -> bytes:
+        """
+        Returns the cached audio for `text`, synthesizing and storing it on a miss.
+
+        Args:
+            text: The text being spoken.
+            synthesize: Coroutine factory producing the audio on a cache miss.
+            voice: Voice the audio is synthesized with (part of the cache key).
+        """
+        key = cache_key(text, voice, self.audio_format)
+        audio = self._memory.get(key)
+        if audio is not None:
+            self.memory_hits += 1
+            return audio
+
+        if key in self._flights:
+            self.memory_hits += 1
+        return await self._flights.run(key, lambda: self._load_or_synthesize(key, synthesize))
+
+    async def _load_or_synthesize(self, key: str, synthesize: Callable[[], Awaitable[bytes]]) -> bytes:
+        audio = await asyncio.to_thread(self._read, key) if self.cache_dir else None
+        if audio is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            audio = await synthesize()
+            if self.cache_dir:
+                await asyncio.to_thread(self._write, key, audio)
+                self._disk_writes += 1
+                if self._disk_writes % 100 == 0:
+                    await asyncio.to_thread(self._prune)
+        self._memory.set(key, audio)
+        return audio
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+tts_cache: Optional[TTSCache] = TTSCache() if config.TTS_CACHE_ENABLED else None
@@ -1,74 +1,168 @@
+from typing import Dict, List, Optional, Set
 import asyncio
-import base64
+import io
+import time
+import wave
+
+import numpy as np
+
+from backend.app import config
+from backend.app.services import metrics_service, simulation
+from backend.app.services.text_segmenter import TextSegmenter, segment_text
+from backend.app.services.tts_cache import tts_cache
+from backend.app.services.ttl_cache import TTLCache
+from backend.app.log import get_logger
+
+logger = get_logger(__name__)
 
 # Placeholder for actual TTS integration (e.g., Bark, Coqui TTS, or a cloud TTS API)
 # You would need to install and configure a TTS library.
 
-async def convert_text_to_speech_stream(text_stream: asyncio.Queue, session_id: str) -> asyncio.Queue:
+async def convert_text_to_speech_stream(text_stream: asyncio.Queue, session_id: str,
+                                        prepared_audio: Optional[Dict[str, "asyncio.Task[bytes]"]] = None) -> asyncio.Queue:
     """
     Placeholder for real-time TTS from a stream of text.
     Converts text chunks from LLM into audio chunks.
+
+    Returns the audio queue immediately and synthesizes in a background task, so the caller
+    can start the LLM producer and stream audio to the client while later text is still
+    being generated. Text is cut into sentences/clauses (see TextSegmenter) and each segment
+    is synthesized as soon as it closes.
     
     Args:
-        text_stream: An asyncio.Queue from which text chunks are read.
+        text_stream: An asyncio.Queue from which text chunks are read (None ends the stream).
         session_id: The session ID for context.
+        prepared_audio: Segments already being synthesized (e.g. speculatively), by segment text.
 
     Returns:
-        An asyncio.Queue to which audio byte chunks (or URLs) are put.
+        An asyncio.Queue to which audio byte chunks (or URLs) are put, terminated by None.
     """
     audio_output_queue = asyncio.Queue()
-    print(f"[TTS Service - Session {session_id}] Initializing TTS.")
+    logger.debug("Initializing TTS", session_id=session_id)
+
+    task = asyncio.create_task(_run_tts_pipeline(text_stream, audio_output_queue, session_id, prepared_audio or {}))
+    # Keep a reference so the pipeline task isn't garbage collected while it runs
+    _pipeline_tasks.add(task)
+    task.add_done_callback(_pipeline_tasks.discard)
+    return audio_output_queue
+
+_pipeline_tasks: Set[asyncio.Task] = set()
+
+def active_pipelines() -> int:
+    """Number of AI turns currently being synthesized."""
+    return len(_pipeline_tasks)
 
+async def _run_tts_pipeline(text_stream: asyncio.Queue, audio_output_queue: asyncio.Queue, session_id: str,
+                            prepared_audio: Dict[str, "asyncio.Task[bytes]"]):
+    async def speak(segment: str) -> bytes:
+        prepared = prepared_audio.get(segment)
+        if prepared is not None and not prepared.cancelled():
+            try:
+                return await prepared
+            except Exception as e:
+                logger.warning("Prepared audio failed; synthesizing again", session_id=session_id, error=str(e))
+        return await synthesize_segment(segment, session_id)
+
+    segmenter = TextSegmenter()
     full_text_to_speak = ""
-    while True:
-        try:
-            text_chunk = await asyncio.wait_for(text_stream.get(), timeout=5.0) # Wait for text from LLM
+    first_text_at: Optional[float] = None
+    first_audio_sent = False
+
+    async def put_audio(audio: bytes):
+        nonlocal first_audio_sent
+        if not first_audio_sent:
+            first_audio_sent = True
+            metrics_service.observe_stage("tts_first_audio", time.perf_counter() - first_text_at)
+        await audio_output_queue.put(audio)
+
+    try:
+        while True:
+            try:
+                text_chunk = await asyncio.wait_for(text_stream.get(), timeout=5.0) # Wait for text from LLM
+            except asyncio.TimeoutError:
+                logger.warning("Timed out waiting for text from LLM", session_id=session_id)
+                break # Or handle as needed
+            text_stream.task_done()
             if text_chunk is None: # End of text stream signal
                 break
-            
+
+            if first_text_at is None:
+                first_text_at = time.perf_counter()
             full_text_to_speak += text_chunk
-            print(f"[TTS Service - Session {session_id}] Received text chunk: '{text_chunk}'")
-
-            # Simulate TTS processing for the chunk
-            # In a real TTS, this would generate actual audio bytes.
-            # For this placeholder, we'll send back a base64 encoded representation of the text.
-            # This is NOT real audio.
-            simulated_audio_chunk_content = f"Audio for: {text_chunk.strip()}"
-            simulated_audio_chunk_bytes = simulated_audio_chunk_content.encode('utf-8')
-            
-            # To make it resemble an audio format, let's pretend it's a tiny WAV header + data
-            # This is purely for demonstration structure; it's not playable audio.
-            header = b'RIFF' + len(simulated_audio_chunk_bytes).to_bytes(4, 'little') + b'WAVEfmt '
-            placeholder_audio_bytes = header + simulated_audio_chunk_bytes
-            
-            await audio_output_queue.put(placeholder_audio_bytes)
-            print(f"[TTS Service - Session {session_id}] Sent simulated audio chunk for: '{text_chunk.strip()}'")
-            await asyncio.sleep(0.1 * len(text_chunk.split())) # Simulate TTS generation time based on text length
-
-        except asyncio.TimeoutError:
-            print(f"[TTS Service - Session {session_id}] Timed out waiting for text from LLM.")
-            break # Or handle as needed
-        except Exception as e:
-            print(f"[TTS Service - Session {session_id}] Error: {e}")
-            break
-        finally:
-            if 'text_chunk' in locals() and text_chunk is not None: # Ensure task_done is called if item was retrieved
-                 text_stream.task_done()
-
-
-    # Signal end of audio stream
-    await audio_output_queue.put(None)
-    print(f"[TTS Service - Session {session_id}] TTS stream ended for text: '{full_text_to_speak}'")
-    return audio_output_queue
+            for segment in segmenter.feed(text_chunk):
+                await put_audio(await speak(segment))
+
+        remaining = segmenter.flush()
+        if remaining:
+            await put_audio(await speak(remaining))
+    except Exception as e:
+        logger.exception("TTS pipeline failed", session_id=session_id)
+    finally:
+        # Signal end of audio stream
+        await audio_output_queue.put(None)
+        logger.debug("TTS stream ended", session_id=session_id, text=full_text_to_speak)
+
+async def synthesize_segment(segment: str, session_id: str) -> bytes:
+    """
+    Returns the audio for one sentence/clause of speech.
+    Served from the TTS cache when the same text was synthesized before (see tts_cache).
+    """
+    if tts_cache is None:
+        return await _synthesize(segment, session_id)
+    return await tts_cache.get_or_synthesize(segment, lambda: _synthesize(segment, session_id))
+
+def _placeholder_wav(word_count: int, sample_rate: int = config.AUDIO_SAMPLE_RATE) -> bytes:
+    word = np.arange(int(sample_rate * 0.25)) / sample_rate
+    envelope = np.sin(np.pi * word / word[-1]) # Fade each word in and out
+    tone = (0.2 * 32767 * envelope * np.sin(2 * np.pi * 180 * word)).astype("<i2")
+    gap = np.zeros(int(sample_rate * 0.05), dtype="<i2")
+    samples = np.tile(np.concatenate([tone, gap]), max(word_count, 1))
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(samples.tobytes())
+    return output.getvalue()
+
+async def _synthesize(segment: str, session_id: str) -> bytes:
+    """
+    Placeholder for synthesizing one sentence/clause of speech.
+    In a real TTS, this would generate actual audio bytes.
+    """
+    # For this placeholder, we generate a real (if wordless) 16-bit PCM WAV: one soft tone per
+    # word, so clients and the codec stage handle it like actual speech.
+    placeholder_audio_bytes = _placeholder_wav(len(segment.split()))
+
+    await simulation.sleep("tts_word", len(segment.split()), session_id) # Simulate TTS generation time based on text length
+    logger.debug("Synthesized audio segment", session_id=session_id, segment=segment, sample=True)
+    return placeholder_audio_bytes
+
+async def warm_up(utterances: List[str]) -> int:
+    """
+    Pre-synthesizes the segments of known utterances (e.g. the scripted questions) into the
+    TTS cache, so sessions get them without synthesis cost. Returns the number of segments.
+    """
+    if tts_cache is None:
+        return 0
+    segments = set()
+    for utterance in utterances:
+        segments.update(segment_text(utterance))
+    # One at a time, so warming up doesn't compete with live sessions for the TTS engine
+    for segment in sorted(segments):
+        await synthesize_segment(segment, "warm-up")
+    logger.info("Warmed up cache", segments=len(segments), **tts_cache.stats())
+    return len(segments)
 
 async def convert_complete_text_to_speech(text: str, session_id: str) -> bytes:
     """
     Placeholder for converting a complete text string to speech.
     Returns raw audio bytes (e.g., WAV or MP3).
     """
-    print(f"[TTS Service - Session {session_id}] Converting complete text to speech: '{text}'")
+    logger.debug("Converting complete text to speech", session_id=session_id, text=text)
     # Simulate TTS processing
-    await asyncio.sleep(0.5 + 0.1 * len(text.split())) # Simulate generation time
+    await simulation.sleep("tts_request", session_id=session_id) # Simulate generation time
+    await simulation.sleep("tts_word", len(text.split()), session_id)
     
     # This is NOT real audio. It's a placeholder.
     simulated_audio_content = f"This is placeholder audio for the text: {text}"
@@ -76,5 +170,28 @@ async def convert_complete_text_to_speech(text: str, session_id: str) -> bytes:
     # For example, response from Coqui TTS or Bark.
     placeholder_audio_bytes = simulated_audio_content.encode('utf-8')
     
-    print(f"[TTS Service - Session {session_id}] Finished TTS for: '{text}'")
+    logger.debug("Finished TTS", session_id=session_id, text=text)
     return placeholder_audio_bytes
+
+
+# Audio of the last AI turn per session, so a client that reconnects can hear it again
+# without re-running TTS. Keyed by session; entries hold the turn's text, the format the audio
+# was sent in (e.g. "opus@24000") and its audio chunks.
+last_response_audio: TTLCache[str, tuple] = TTLCache(
+    max_size=config.REPLAY_AUDIO_MAX_SESSIONS, ttl_seconds=config.SESSION_RESUME_WINDOW_SECONDS
+)
+
+def remember_response_audio(session_id: str, text: str, audio_chunks: List[bytes], audio_format: str = config.TTS_FORMAT):
+    """Keeps the audio of the AI turn just sent (skipped if it exceeds REPLAY_AUDIO_MAX_BYTES)."""
+    if sum(len(chunk) for chunk in audio_chunks) > config.REPLAY_AUDIO_MAX_BYTES:
+        last_response_audio.pop(session_id)
+        return
+    last_response_audio.set(session_id, (text, audio_format, audio_chunks))
+
+def get_response_audio(session_id: str, text: str, audio_format: str = config.TTS_FORMAT) -> Optional[List[bytes]]:
+    """Returns the cached audio chunks of the AI turn with this text in this format, or None."""
+    entry = last_response_audio.get(session_id)
+    return entry[2] if entry is not None and entry[:2] == (text, audio_format) else None
+
+def discard_session(session_id: str):
+    last_response_audio.pop(session_id)
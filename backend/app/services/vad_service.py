@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from backend.app import config
+
+# Voice activity detection (VAD) for the candidate's audio stream.
+# Energy + zero-crossing rate per frame, computed with NumPy over all frames of a chunk at once.
+# CPU only and cheap enough to run on the event loop for every incoming chunk.
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+END_OF_TURN = "end_of_turn"
+
+_BYTES_PER_SAMPLE = 2 # 16-bit PCM
+
+
+@dataclass
+class VADEvent:
+    kind: str # SPEECH_START, SPEECH_END or END_OF_TURN
+    stream_time: float # Seconds of audio since the start of the stream
+
+
+@dataclass
+class VADResult:
+    events: List[VADEvent]
+    speech_frames: int # Frames in this chunk classified as speech
+    in_speech: bool # Whether the detector is inside an utterance at the end of the chunk
+
+    @property
+    def contains_speech(self) -> bool:
+        return self.speech_frames > 0 or self.in_speech
+
+
+class VoiceActivityDetector:
+    """
+    Streaming VAD over 16-bit mono PCM.
+
+    Feed it audio chunks of any size with `process()`; partial frames are carried over to
+    the next chunk. An utterance starts after `min_speech_ms` of consecutive speech frames
+    and ends after `hangover_ms` of silence. Once `end_of_turn_ms` of further silence has
+    passed after an utterance, an END_OF_TURN event tells the server to end the turn.
+    """
+
+    def __init__(self,
+                 sample_rate: int = config.AUDIO_SAMPLE_RATE,
+                 frame_ms: int = config.VAD_FRAME_MS,
+                 energy_threshold_db: float = config.VAD_ENERGY_THRESHOLD_DB,
+                 noise_margin_db: float = config.VAD_NOISE_MARGIN_DB,
+                 max_zero_crossing_rate: float = config.VAD_MAX_ZERO_CROSSING_RATE,
+                 min_speech_ms: int = config.VAD_MIN_SPEECH_MS,
+                 hangover_ms: int = config.VAD_HANGOVER_MS,
+                 end_of_turn_ms: int = config.VAD_END_OF_TURN_MS):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_seconds = frame_ms / 1000
+        self.energy_threshold_db = energy_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.end_of_turn_frames = end_of_turn_ms // frame_ms if end_of_turn_ms > 0 else 0
+
+        self._remainder = b""
+        self._noise_floor_db: Optional[float] = None
+        self._frames_processed = 0
+        self._in_speech = False
+        self._speech_run = 0 # Consecutive speech frames while not in speech
+        self._silence_run = 0 # Consecutive silent frames since the last speech frame
+        self._had_utterance = False
+        self.turn_ended = False
+
+    def reset_turn(self):
+        """Prepares the detector for a new candidate turn, keeping the noise floor estimate."""
+        self._remainder = b""
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._had_utterance = False
+        self.turn_ended = False
+
+    def classify_frames(self, samples: np.ndarray) -> np.ndarray:
+        """Returns a boolean speech decision per frame for a (n_frames, frame_samples) int16 array."""
+        frames = samples.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20.0 * np.log10(rms + 1e-10)
+        signs = np.signbit(frames)
+        zero_crossing_rate = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+
+        threshold = self.energy_threshold_db
+        if self._noise_floor_db is not None:
+            threshold = max(threshold, self._noise_floor_db + self.noise_margin_db)
+        loud = energy_db > threshold
+        # Fricatives have a high ZCR, so very loud frames count as speech regardless
+        is_speech = loud & ((zero_crossing_rate <= self.max_zero_crossing_rate) | (energy_db > threshold + self.noise_margin_db))
+
+        # Track the noise floor from the quietest frames judged to be non-speech
+        silent_energy = energy_db[~is_speech]
+        if silent_energy.size:
+            observed = float(np.percentile(silent_energy, 20))
+            if self._noise_floor_db is None:
+                self._noise_floor_db = observed
+            else:
+                self._noise_floor_db = 0.9 * self._noise_floor_db + 0.1 * observed
+        return is_speech
+
+    def process(self, pcm_chunk: bytes) -> VADResult:
+        data = self._remainder + pcm_chunk if self._remainder else pcm_chunk
+        frame_bytes = self.frame_samples * _BYTES_PER_SAMPLE
+        n_frames = len(data) // frame_bytes
+        self._remainder = bytes(data[n_frames * frame_bytes:])
+        events: List[VADEvent] = []
+        if n_frames == 0:
+            return VADResult(events=events, speech_frames=0, in_speech=self._in_speech)
+
+        samples = np.frombuffer(data, dtype="<i2", count=n_frames * self.frame_samples).reshape(n_frames, self.frame_samples)
+        decisions = self.classify_frames(samples)
+
+        for offset, is_speech in enumerate(decisions.tolist()):
+            stream_time = (self._frames_processed + offset + 1) * self.frame_seconds
+            if is_speech:
+                self._silence_run = 0
+                if not self._in_speech:
+                    self._speech_run += 1
+                    if self._speech_run >= self.min_speech_frames:
+                        self._in_speech = True
+                        self._had_utterance = True
+                        self._speech_run = 0
+                        events.append(VADEvent(SPEECH_START, stream_time - self.min_speech_frames * self.frame_seconds))
+                continue
+
+            self._speech_run = 0
+            self._silence_run += 1
+            if self._in_speech and self._silence_run >= self.hangover_frames:
+                self._in_speech = False
+                events.append(VADEvent(SPEECH_END, stream_time - self._silence_run * self.frame_seconds))
+            elif (not self._in_speech and self._had_utterance and not self.turn_ended and self.end_of_turn_frames
+                  and self._silence_run >= self.hangover_frames + self.end_of_turn_frames):
+                self.turn_ended = True
+                events.append(VADEvent(END_OF_TURN, stream_time))
+
+        self._frames_processed += n_frames
+        return VADResult(events=events, speech_frames=int(np.count_nonzero(decisions)), in_speech=self._in_speech)
+
+
+def create_detector() -> Optional[VoiceActivityDetector]:
+    """Returns a detector configured from settings, or None if VAD is disabled."""
+    return VoiceActivityDetector() if config.VAD_ENABLED else None
@@ -0,0 +1,229 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import json
+import struct
+import time
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from backend.app.services import metrics_service
+from backend.app.services.audio_codec import AudioFormat
+
+# Interview WebSocket protocols.
+#
+# Legacy (no subprotocol): raw audio as binary messages, ad-hoc text messages
+# ("STT_part: ...", "AI_says: ...", "END_OF_STREAM", ...).
+#
+# Framed ("vocahire.v1" with JSON control payloads, "vocahire.v1.msgpack" with msgpack ones):
+# every message is a binary frame with a fixed 12-byte header
+#
+#     version (u8) | frame type (u8) | turn (u16) | sequence (u32) | payload length (u32)
+#
+# in network byte order, followed by the payload. The turn is the transcript index of the candidate
+# answer the exchange belongs to (0 before the first answer). AUDIO frames carry raw audio; their sequence
+# number is the client's AudioInput.sequence_number (client -> server) or the server's own
+# chunk counter (server -> client). CONTROL frames carry an object with a "type" field:
+#   client -> server: end_of_stream, end_interview
+#   server -> client: ai_greeting, ai_response, stt_partial, candidate_text, end_of_turn_detected,
+#                     interview_ended, session_resumed, audio_format
+# Server events also carry "last_audio_sequence", the last audio chunk received from the client.
+
+PROTOCOL_VERSION = 1
+SUBPROTOCOL_JSON = "vocahire.v1"
+SUBPROTOCOL_MSGPACK = "vocahire.v1.msgpack"
+
+FRAME_HEADER = struct.Struct("!BBHII")
+FRAME_AUDIO = 1
+FRAME_CONTROL = 2
+
+# Client control messages, as reported by AudioIngest.end_message
+END_OF_STREAM = "END_OF_STREAM"
+END_INTERVIEW = "END_INTERVIEW"
+_CONTROL_TYPES = {"end_of_stream": END_OF_STREAM, "end_interview": END_INTERVIEW}
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+@dataclass
+class IncomingMessage:
+    audio: Optional[bytes] = None # Set for audio chunks
+    control: Optional[str] = None # END_OF_STREAM / END_INTERVIEW
+    sequence: Optional[int] = None
+    turn: Optional[int] = None
+
+
+def pack_frame(frame_type: int, turn: int, sequence: int, payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(PROTOCOL_VERSION, frame_type, turn & 0xFFFF, sequence & 0xFFFFFFFF, len(payload)) + payload
+
+def unpack_frame(frame: bytes) -> tuple:
+    """Returns (frame_type, turn, sequence, payload). Raises ProtocolError on a malformed frame."""
+    if len(frame) < FRAME_HEADER.size:
+        raise ProtocolError(f"Frame shorter than its header ({len(frame)} bytes)")
+    version, frame_type, turn, sequence, length = FRAME_HEADER.unpack_from(frame)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    if length != len(frame) - FRAME_HEADER.size:
+        raise ProtocolError(f"Payload length {length} doesn't match frame size {len(frame)}")
+    return frame_type, turn, sequence, frame[FRAME_HEADER.size:]
+
+def _msgpack_available() -> bool:
+    try:
+        import msgpack # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def negotiate_subprotocol(offered: List[str]) -> Optional[str]:
+    """Picks the protocol for a connection from the client's offered subprotocols (None = legacy)."""
+    if SUBPROTOCOL_MSGPACK in offered and _msgpack_available():
+        return SUBPROTOCOL_MSGPACK
+    if SUBPROTOCOL_JSON in offered:
+        return SUBPROTOCOL_JSON
+    return None
+
+
+class InterviewChannel(ABC):
+    """
+    Base class for one interview connection: sends audio and typed events, receives audio and
+    control messages. `turn` is set by the endpoint and stamped on outgoing frames.
+    """
+
+    protocol = "legacy"
+
+    def __init__(self, websocket: WebSocket, session_id: str):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.turn = 0
+        self.audio_format = AudioFormat() # Negotiated by the endpoint (see audio_codec)
+        self.last_audio_sequence: Optional[int] = None # Last audio chunk received from the client
+        self._audio_received = 0
+
+    async def _send_bytes(self, data: bytes):
+        started_at = time.perf_counter()
+        await self.websocket.send_bytes(data)
+        metrics_service.observe_stage("ws_send", time.perf_counter() - started_at)
+        metrics_service.record_protocol_traffic(self.protocol, "out", len(data))
+
+    async def _send_text(self, text: str):
+        started_at = time.perf_counter()
+        await self.websocket.send_text(text)
+        metrics_service.observe_stage("ws_send", time.perf_counter() - started_at)
+        metrics_service.record_protocol_traffic(self.protocol, "out", len(text))
+
+    async def receive(self) -> Optional[IncomingMessage]:
+        """Returns the next audio chunk or control message (None for messages to ignore)."""
+        data = await self.websocket.receive()
+        if data.get("type") == "websocket.disconnect":
+            raise WebSocketDisconnect(code=data.get("code", 1000))
+        payload = data.get("bytes") if data.get("bytes") is not None else data.get("text")
+        if payload is None:
+            return None
+        metrics_service.record_protocol_traffic(self.protocol, "in", len(payload))
+        message = self._parse(data)
+        if message is not None and message.audio is not None:
+            if message.sequence is None:
+                message.sequence = self._audio_received
+            self._audio_received += 1
+            self.last_audio_sequence = message.sequence
+        return message
+
+    @abstractmethod
+    def _parse(self, data: Dict[str, Any]) -> Optional[IncomingMessage]:
+        """Turns a received WebSocket message into an audio chunk or control message (None to ignore it)."""
+
+    @abstractmethod
+    async def send_audio(self, audio: bytes):
+        ...
+
+    @abstractmethod
+    async def send_event(self, event: str, text: Optional[str] = None, **fields: Any):
+        """Sends a typed event (e.g. "ai_response") with optional text and extra fields."""
+
+
+class LegacyChannel(InterviewChannel):
+    """The original text-prefix protocol."""
+
+    _TEXT_FORMATS = {
+        "ai_greeting": "AI_ zegt: {text}",
+        "ai_response": "AI_says: {text}",
+        "candidate_text": "Candidate_says: {text}",
+        "end_of_turn_detected": "END_OF_TURN_DETECTED",
+        "interview_ended": "INTERVIEW_ENDED_BY_AI",
+        "session_resumed": "SESSION_RESUMED: {turns}",
+        "audio_format": "AUDIO_FORMAT: {input_format} {output_format} {opus_bitrate}",
+    }
+
+    def _parse(self, data: Dict[str, Any]) -> Optional[IncomingMessage]:
+        if data.get("bytes") is not None:
+            return IncomingMessage(audio=data["bytes"])
+        if data["text"] in (END_OF_STREAM, END_INTERVIEW):
+            return IncomingMessage(control=data["text"])
+        return None
+
+    async def send_audio(self, audio: bytes):
+        await self._send_bytes(audio)
+
+    async def send_event(self, event: str, text: Optional[str] = None, **fields: Any):
+        if event == "stt_partial":
+            message = f"STT_part: {text}{' (final)' if fields.get('final') else ''}"
+        else:
+            message = self._TEXT_FORMATS[event].format(text=text, **fields)
+        await self._send_text(message)
+
+
+class FramedChannel(InterviewChannel):
+    """The binary framed protocol, with JSON or msgpack control payloads."""
+
+    def __init__(self, websocket: WebSocket, session_id: str, subprotocol: str = SUBPROTOCOL_JSON):
+        super().__init__(websocket, session_id)
+        self.protocol = subprotocol
+        self._sequence = 0 # Server -> client frame counter
+        if subprotocol == SUBPROTOCOL_MSGPACK:
+            import msgpack
+            self._encode = msgpack.packb
+            self._decode = msgpack.unpackb
+        else:
+            self._encode = lambda obj: json.dumps(obj, separators=(",", ":")).encode("utf-8")
+            self._decode = json.loads
+
+    def _next_sequence(self) -> int:
+        sequence, self._sequence = self._sequence, self._sequence + 1
+        return sequence
+
+    def _parse(self, data: Dict[str, Any]) -> Optional[IncomingMessage]:
+        if data.get("bytes") is None:
+            raise ProtocolError("Text messages aren't part of the framed protocol")
+        frame_type, turn, sequence, payload = unpack_frame(data["bytes"])
+        if frame_type == FRAME_AUDIO:
+            return IncomingMessage(audio=payload, sequence=sequence, turn=turn)
+        if frame_type == FRAME_CONTROL:
+            try:
+                message = self._decode(payload)
+            except ValueError as e: # Malformed JSON / msgpack
+                raise ProtocolError(f"Undecodable control payload: {e}") from e
+            if not isinstance(message, dict):
+                raise ProtocolError(f"Control payload must be a map, not {type(message).__name__}")
+            control = _CONTROL_TYPES.get(message.get("type"))
+            return IncomingMessage(control=control, sequence=sequence, turn=turn) if control else None
+        raise ProtocolError(f"Unknown frame type {frame_type}")
+
+    async def send_audio(self, audio: bytes):
+        await self._send_bytes(pack_frame(FRAME_AUDIO, self.turn, self._next_sequence(), audio))
+
+    async def send_event(self, event: str, text: Optional[str] = None, **fields: Any):
+        message = {"type": event, **fields, "last_audio_sequence": self.last_audio_sequence}
+        if text is not None:
+            message["text"] = text
+        await self._send_bytes(pack_frame(FRAME_CONTROL, self.turn, self._next_sequence(), self._encode(message)))
+
+
+async def accept(websocket: WebSocket, session_id: str) -> InterviewChannel:
+    """Accepts the WebSocket with the best protocol the client offered and returns its channel."""
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    if subprotocol is None:
+        return LegacyChannel(websocket, session_id)
+    return FramedChannel(websocket, session_id, subprotocol)
@@ -0,0 +1,316 @@
+"""
+Microbenchmarks for the backend's hot paths, run with the zero-latency simulation profile.
+
+Measures the per-call time (min and median over rounds) and the memory of each benchmark
+(peak traced allocation during one call, and bytes still held per call after a round), and
+compares them against a stored baseline:
+
+    python -m backend.benchmarks.microbench                     # run and compare with baseline.json
+    python -m backend.benchmarks.microbench --save-baseline     # record a new baseline
+    python -m backend.benchmarks.microbench --filter analyze --rounds 3
+
+Exits with status 1 if a benchmark's fastest round is slower than the baseline's by more than
+--time-tolerance, or uses more memory than --memory-tolerance allows. The fastest round is compared
+rather than the median because noise (scheduling, process pool IPC) only ever adds time. Timings only compare meaningfully on the
+machine (and Python version) the baseline was recorded on; the baseline records both.
+"""
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Benchmark the code paths themselves: no simulated delays, no TTS cache in front of synthesis, no log output
+os.environ.setdefault("VOCAHIRE_SIMULATION_PROFILE", "zero")
+os.environ.setdefault("VOCAHIRE_TTS_CACHE_ENABLED", "false")
+os.environ.setdefault("VOCAHIRE_LOG_LEVEL", "WARNING")
+
+from backend.app.models.interview_models import InterviewTurn, SessionSummary, EvaluationMetrics
+from backend.app.services import evaluation_service, llm_service, session_service, tts_service
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TRANSCRIPT_SIZES = (10, 100, 1000)
+MIN_ROUND_SECONDS = 0.05 # Calls per round are calibrated to take at least this long
+# Retained memory is averaged over at least this many calls: over a handful of calls, a few stray
+# allocations (an interned string, a cache entry) would read as hundreds of bytes leaked per call
+MIN_MEMORY_CALLS = 50
+PEAK_CALLS = 3 # Single calls whose peak allocation is measured
+# Absolute growth allowed on top of --memory-tolerance. Peaks of calls through a worker process vary by
+# about one pipe read buffer (64 KiB) from run to run; retained memory is already averaged per call.
+PEAK_SLACK_BYTES = 64 * 1024
+RETAINED_SLACK_BYTES = 1024
+
+_WORDS = ("team", "project", "design", "tests", "customer", "result", "problem", "solution", "latency",
+          "review", "deploy", "we", "the", "a", "then", "because", "system", "data", "users", "improve",
+          "um", "like", "you know", "basically", "measured", "shipped", "learned", "led", "api", "code")
+
+
+def make_transcript(turns: int, seed: int = 0) -> List[InterviewTurn]:
+    """A deterministic interview: AI questions alternating with 20-120 word candidate answers."""
+    rng = random.Random(seed)
+    transcript, timestamp = [], 1_700_000_000.0
+    for index in range(turns):
+        if index % 2 == 0:
+            transcript.append(InterviewTurn(speaker="AI", text=f"Okay, thank you. Now, {llm_service.interview_questions[index // 2 % len(llm_service.interview_questions)]}", timestamp=timestamp))
+            timestamp += 4.0
+        else:
+            words = rng.randint(20, 120)
+            text = " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+            timestamp += words / 2.3 # ~140 words per minute
+            transcript.append(InterviewTurn(speaker="Candidate", text=text, timestamp=timestamp))
+    return transcript
+
+def make_summary(transcript: List[InterviewTurn]) -> SessionSummary:
+    metrics = EvaluationMetrics(**evaluation_service.score_turns(evaluation_service._to_tuples(transcript)))
+    return SessionSummary(session_id="bench", full_transcript=transcript, evaluation=metrics,
+                          tips_for_improvement=["Great job overall!"], duration_seconds=transcript[-1].timestamp - transcript[0].timestamp,
+                          started_at=transcript[0].timestamp, ended_at=transcript[-1].timestamp)
+
+
+@dataclass
+class Benchmark:
+    """`setup()` runs before every round and returns the function (sync or async) to call repeatedly."""
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    number: Optional[int] = None # Calls per round; calibrated if None
+
+
+def _add_to_transcript_setup() -> Callable[[], Any]:
+    session_id = f"bench-{time.perf_counter_ns()}"
+    # Setup runs outside the runner's event loop (set as the current loop by main())
+    asyncio.get_event_loop().run_until_complete(session_service.initialize_session(session_id))
+    answer = make_transcript(2)[1].text
+    return partial(session_service.add_to_transcript, session_id, "Candidate", answer)
+
+def _history_setup(transcript: List[InterviewTurn]) -> Callable[[], List[Dict[str, str]]]:
+    def history_for_llm() -> List[Dict[str, str]]:
+        history = llm_service.ConversationHistory()
+        history.extend_from_transcript(transcript)
+        return history.messages()
+    return history_for_llm
+
+def _history_next_turn_setup() -> Callable[[], List[Dict[str, str]]]:
+    # Steady state during an interview: one new turn appended to a long-running history
+    history = llm_service.ConversationHistory()
+    history.extend_from_transcript(make_transcript(100))
+    turn = make_transcript(2)[1:]
+    def next_turn() -> List[Dict[str, str]]:
+        history.extend_from_transcript(turn)
+        return history.messages()
+    return next_turn
+
+def _tts_stream_setup() -> Callable[[], Any]:
+    reply = f"Thanks for sharing that. Now, {llm_service.interview_questions[1]} Take your time, and be as specific as you can."
+    async def speak_reply() -> int:
+        text_stream = asyncio.Queue()
+        for word in reply.split(" "):
+            text_stream.put_nowait(word + " ")
+        text_stream.put_nowait(None)
+        audio_queue = await tts_service.convert_text_to_speech_stream(text_stream, "bench")
+        audio_bytes = 0
+        while (audio := await audio_queue.get()) is not None:
+            audio_bytes += len(audio)
+        return audio_bytes
+    return speak_reply
+
+def benchmarks() -> List[Benchmark]:
+    transcripts = {size: make_transcript(size) for size in TRANSCRIPT_SIZES}
+    summaries = {size: make_summary(transcript) for size, transcript in transcripts.items()}
+    suite = [Benchmark("session_service.add_to_transcript", _add_to_transcript_setup, number=200)]
+    for size, transcript in transcripts.items():
+        suite.append(Benchmark(f"history_for_llm[{size}]", lambda t=transcript: _history_setup(t)))
+    suite.append(Benchmark("history_for_llm[+1 turn]", _history_next_turn_setup))
+    for size, transcript in transcripts.items():
+        suite.append(Benchmark(f"evaluation_service.score_turns[{size}]",
+                               lambda t=transcript: lambda: evaluation_service.score_turns(evaluation_service._to_tuples(t))))
+    for size, transcript in transcripts.items():
+        # Through the evaluation process pool, as the summary endpoint runs it
+        suite.append(Benchmark(f"evaluation_service.analyze_transcript[{size}]",
+                               lambda t=transcript: partial(evaluation_service.analyze_transcript, t, "bench")))
+    for size, summary in summaries.items():
+        suite.append(Benchmark(f"session_service.export_summary_to_json[{size}]",
+                               lambda s=summary: partial(session_service.export_summary_to_json, s, "bench")))
+    suite.append(Benchmark("tts_service.convert_text_to_speech_stream", _tts_stream_setup))
+    return suite
+
+
+class Runner:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def _call(self, function: Callable[[], Any], number: int) -> float:
+        """Calls `function` `number` times and returns the elapsed seconds."""
+        if inspect.iscoroutinefunction(function):
+            async def repeat() -> float:
+                started_at = time.perf_counter()
+                for _ in range(number):
+                    await function()
+                return time.perf_counter() - started_at
+            return self.loop.run_until_complete(repeat())
+        started_at = time.perf_counter()
+        for _ in range(number):
+            function()
+        return time.perf_counter() - started_at
+
+    def _calibrate(self, benchmark: Benchmark) -> int:
+        number = 1
+        while True:
+            if self._call(benchmark.setup(), number) >= MIN_ROUND_SECONDS or number >= 1_000_000:
+                return number
+            number *= 2
+
+    def _memory(self, benchmark: Benchmark, number: int) -> Dict[str, int]:
+        number = max(number, MIN_MEMORY_CALLS)
+        function = benchmark.setup()
+        self._call(function, 1) # Warm-up: lazily created state isn't attributed to the calls
+        gc.collect()
+        tracemalloc.start()
+        try:
+            # The largest peak of a few single calls: one call can land between the allocations
+            # of the event loop or a worker round trip and read low
+            peak = 0
+            for _ in range(PEAK_CALLS):
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                self._call(function, 1)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+            before, _ = tracemalloc.get_traced_memory()
+            self._call(function, number)
+            gc.collect()
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {"peak_bytes": peak, "retained_bytes_per_call": max(0, round((after - before) / number)),
+                "memory_calls": number}
+
+    def run(self, benchmark: Benchmark, rounds: int) -> Dict[str, Any]:
+        self._call(benchmark.setup(), 1) # Warm-up (e.g. starts the evaluation process pool)
+        number = benchmark.number or self._calibrate(benchmark)
+        per_call = []
+        for _ in range(rounds):
+            function = benchmark.setup()
+            gc.collect()
+            per_call.append(self._call(function, number) / number)
+        return {
+            "calls_per_round": number,
+            "rounds": rounds,
+            "min_us": round(min(per_call) * 1e6, 3),
+            "median_us": round(statistics.median(per_call) * 1e6, 3),
+            **self._memory(benchmark, number),
+        }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            time_tolerance: float, memory_tolerance: float) -> List[str]:
+    """Returns a description of every regression against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["min_us"] > reference["min_us"] * (1 + time_tolerance):
+            regressions.append(f"{name}: min {result['min_us']} us vs {reference['min_us']} us in the baseline")
+        slack = {"peak_bytes": PEAK_SLACK_BYTES}
+        if min(result.get("memory_calls", 0), reference.get("memory_calls", 0)) >= MIN_MEMORY_CALLS:
+            slack["retained_bytes_per_call"] = RETAINED_SLACK_BYTES # Not comparable if either was averaged over too few calls
+        for key, slack_bytes in slack.items():
+            if result[key] > reference[key] * (1 + memory_tolerance) + slack_bytes:
+                regressions.append(f"{name}: {key} {result[key]} vs {reference[key]} in the baseline")
+    return regressions
+
+def print_results(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]):
+    print(f"{'benchmark':<50}{'calls':>9}{'min us':>12}{'vs base':>9}{'median us':>12}{'peak B':>11}{'kept B/call':>12}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        change = f"{(result['min_us'] / reference['min_us'] - 1) * 100:+.0f}%" if reference and reference["min_us"] else "-"
+        print(f"{name:<50}{result['calls_per_round']:>9}{result['min_us']:>12}{change:>9}{result['median_us']:>12}"
+              f"{result['peak_bytes']:>11}{result['retained_bytes_per_call']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare with (or write)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed relative slowdown of the fastest round")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="Allowed relative growth of memory (plus 64 KiB of peak, 1 KiB retained per call)")
+    parser.add_argument("--output", help="Also write the results (with environment) to this JSON file")
+    args = parser.parse_args()
+
+    baseline_report = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline_report = json.load(f)
+    baseline = baseline_report.get("benchmarks", {})
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    runner = Runner(loop)
+    results = {}
+    try:
+        for benchmark in benchmarks():
+            if args.filter and args.filter not in benchmark.name:
+                continue
+            results[benchmark.name] = runner.run(benchmark, args.rounds)
+    finally:
+        evaluation_service.shutdown()
+        loop.close()
+
+    report = {"environment": environment(), "benchmarks": results}
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        if args.filter and os.path.exists(args.baseline):
+            # Keep the other benchmarks' baseline entries
+            with open(args.baseline) as f:
+                report["benchmarks"] = {**json.load(f).get("benchmarks", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return
+    recorded_on = baseline_report.get("environment", {})
+    if (recorded_on.get("python"), recorded_on.get("machine")) != (platform.python_version(), platform.machine()):
+        print(f"Note: the baseline was recorded on Python {recorded_on.get('python')} ({recorded_on.get('machine')}); timings may not compare")
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from backend.app.services import metrics_service
+from backend.app.services.audio_ingest import (
+    POLICY_DROP_NEWEST, POLICY_DROP_OLDEST, POLICY_PAUSE, AudioIngest, AudioRingBuffer,
+)
+from backend.app.services.ws_protocol import END_INTERVIEW, END_OF_STREAM, IncomingMessage
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class ScriptedChannel:
+    """Stands in for an InterviewChannel: replays a list of client messages, then blocks."""
+
+    def __init__(self, messages: List[IncomingMessage], turn: int = 0, interval: float = 0.0):
+        self.messages = list(messages)
+        self.turn = turn
+        self.interval = interval # Seconds between messages
+
+    async def receive(self) -> Optional[IncomingMessage]:
+        if not self.messages:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.interval)
+        return self.messages.pop(0)
+
+def audio(data: bytes, turn: Optional[int] = None) -> IncomingMessage:
+    return IncomingMessage(audio=data, turn=turn)
+
+def control(message: str, turn: Optional[int] = None) -> IncomingMessage:
+    return IncomingMessage(control=message, turn=turn)
+
+async def read_turn(ingest: AudioIngest, skip_stale_end_of_stream: bool) -> bytes:
+    stream = ingest.stream_turn(skip_stale_end_of_stream=skip_stale_end_of_stream)
+    received = b"".join([chunk async for chunk in stream])
+    await stream.aclose()
+    return received
+
+
+@pytest.mark.anyio
+async def test_tail_of_vad_ended_turn_is_dropped_with_its_end_of_stream():
+    channel = ScriptedChannel([
+        audio(b"\x01" * 320), audio(b"\x02" * 320), control(END_OF_STREAM), # Rest of the previous answer
+        audio(b"\x03" * 320), control(END_OF_STREAM),
+    ], turn=2)
+    ingest = AudioIngest(channel, "s1")
+    assert await read_turn(ingest, skip_stale_end_of_stream=True) == b"\x03" * 320
+    assert ingest.end_message == END_OF_STREAM
+    assert not channel.messages
+
+@pytest.mark.anyio
+async def test_without_stale_end_of_stream_everything_belongs_to_the_turn():
+    channel = ScriptedChannel([audio(b"\x01" * 320), control(END_OF_STREAM), audio(b"\x02" * 320)])
+    ingest = AudioIngest(channel, "s1")
+    assert await read_turn(ingest, skip_stale_end_of_stream=False) == b"\x01" * 320
+    assert channel.messages # The next turn's audio is left for the next turn
+
+@pytest.mark.anyio
+async def test_message_tagged_with_current_turn_ends_the_skip():
+    # A framed client that already moved on: nothing stale will arrive
+    channel = ScriptedChannel([audio(b"\x01" * 320, turn=4), control(END_OF_STREAM, turn=4)], turn=4)
+    ingest = AudioIngest(channel, "s1")
+    assert await read_turn(ingest, skip_stale_end_of_stream=True) == b"\x01" * 320
+    assert ingest.end_message == END_OF_STREAM
+
+@pytest.mark.anyio
+async def test_answer_without_stale_end_of_stream_is_kept_after_the_grace_period():
+    # A client relying on the VAD alone never sends an END_OF_STREAM for the previous answer
+    channel = ScriptedChannel([audio(bytes([i]) * 320) for i in range(1, 6)] + [control(END_OF_STREAM)],
+                              turn=2, interval=0.02)
+    ingest = AudioIngest(channel, "s1", stale_audio_grace_ms=50)
+    assert await read_turn(ingest, skip_stale_end_of_stream=True) == b"".join(bytes([i]) * 320 for i in range(1, 6))
+    assert ingest.end_message == END_OF_STREAM
+
+@pytest.mark.anyio
+async def test_end_interview_is_not_swallowed_while_skipping():
+    channel = ScriptedChannel([audio(b"\x01" * 320), control(END_INTERVIEW)], turn=2)
+    ingest = AudioIngest(channel, "s1")
+    await read_turn(ingest, skip_stale_end_of_stream=True)
+    assert ingest.end_message == END_INTERVIEW
+
+
+def test_ring_buffer_wraps_around():
+    ring = AudioRingBuffer(8)
+    assert ring.write(b"abcdef") == 0
+    assert ring.read(4) == b"abcd"
+    assert ring.write(b"ghijk") == 0 # Wraps past the end of the storage
+    assert (ring.size, ring.free) == (7, 1)
+    assert ring.read(3) == b"efg"
+    assert ring.read(100) == b"hijk"
+    assert ring.size == 0 and ring.read(4) == b""
+
+def test_ring_buffer_overflow():
+    ring = AudioRingBuffer(8)
+    ring.write(b"abcdef")
+    assert ring.write(b"ghij") == 2 # The part that doesn't fit is dropped
+    assert ring.read(8) == b"abcdefgh"
+
+    ring.write(b"abcdef")
+    assert ring.write(b"ghij", overwrite=True) == 2 # The oldest bytes make room
+    assert ring.read(8) == b"cdefghij"
+
+    assert ring.write(b"0123456789", overwrite=True) == 2 # Larger than the whole buffer
+    assert ring.read(8) == b"23456789"
+    assert ring.write(b"0123456789") == 2
+    assert ring.read(8) == b"01234567"
+
+def test_ring_buffer_discard():
+    ring = AudioRingBuffer(8)
+    ring.write(b"abcdef")
+    ring.read(5)
+    ring.write(b"ghijk")
+    assert ring.discard(3) == 3
+    assert ring.discard(100) == 3
+    assert ring.size == 0
+
+@pytest.mark.parametrize("policy, kept", [(POLICY_DROP_OLDEST, (2, 3)), (POLICY_DROP_NEWEST, (1, 2))])
+def test_drop_policies_keep_the_buffer_at_the_high_water_mark(policy, kept):
+    ingest = AudioIngest(ScriptedChannel([]), "drop-test", capacity=1024, high_water_mark=640, low_water_mark=320,
+                         overflow_policy=policy)
+    try:
+        for byte in (1, 2, 3):
+            ingest._buffer_audio(bytes([byte]) * 320)
+        assert ingest.ring.size == 640
+        assert metrics_service.ingest_dropped_bytes["drop-test"] == 320
+        assert metrics_service.ingest_buffered_bytes["drop-test"] == 640
+        assert ingest.ring.read(1024) == b"".join(bytes([byte]) * 320 for byte in kept)
+    finally:
+        ingest.close()
+    assert "drop-test" not in metrics_service.ingest_dropped_bytes
+
+@pytest.mark.anyio
+async def test_pause_policy_stops_reading_at_the_high_water_mark():
+    chunks = [bytes([i]) * 320 for i in range(1, 9)]
+    channel = ScriptedChannel([audio(chunk) for chunk in chunks] + [control(END_OF_STREAM)])
+    ingest = AudioIngest(channel, "pause-test", capacity=1024, high_water_mark=960, low_water_mark=320,
+                         overflow_policy=POLICY_PAUSE, max_read_bytes=320)
+    try:
+        stream = ingest.stream_turn()
+        received = [await stream.__anext__()]
+        await asyncio.sleep(0.05) # STT falls behind: the reader fills the buffer up to the high water mark, then waits
+        assert ingest.ring.size == 960
+        assert len(channel.messages) == 5
+        assert metrics_service.ingest_pauses["pause-test"] == 1
+
+        received.append(await stream.__anext__())
+        await asyncio.sleep(0.05)
+        assert len(channel.messages) == 5 # Still above the low water mark
+
+        received.append(await stream.__anext__())
+        await asyncio.sleep(0.05) # Drained to the low water mark: reading resumes until the next pause
+        assert ingest.ring.size == 960
+        assert len(channel.messages) == 3
+        assert metrics_service.ingest_pauses["pause-test"] == 2
+
+        received += [chunk async for chunk in stream]
+        await stream.aclose()
+        assert b"".join(received) == b"".join(chunks)
+        assert metrics_service.ingest_dropped_bytes.get("pause-test", 0) == 0
+    finally:
+        ingest.close()
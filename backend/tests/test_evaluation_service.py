@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from backend.app import config
+from backend.app.models.interview_models import InterviewTurn
+from backend.app.services import evaluation_service
+
+ANSWER_WORDS = ["I", "led", "the", "team", "on", "a", "project", "to", "improve", "customer", "results",
+                "um", "basically", "you know", "we", "shipped", "it", "and", "learned", "a", "lot", "challenge"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def thread_pool_scoring(monkeypatch):
+    monkeypatch.setattr(config, "EVALUATION_WORKERS", 0) # No worker processes in tests
+    evaluation_service.accumulators.clear()
+    yield
+    evaluation_service.accumulators.clear()
+
+def make_transcript(turns: int, first_speaker: str = "AI", seed: int = 7):
+    """Alternating turns with answers of varied length, fillers and keywords, and gaps both inside and outside ANSWER_DURATION_BOUNDS."""
+    rng = random.Random(seed)
+    speakers = ["AI", "Candidate"] if first_speaker == "AI" else ["Candidate", "AI"]
+    timestamp = 1_700_000_000.0
+    transcript = []
+    for i in range(turns):
+        speaker = speakers[i % 2]
+        if speaker == "AI":
+            text = "Tell me about a time you faced a problem."
+        else:
+            text = " ".join(rng.choice(ANSWER_WORDS) for _ in range(rng.randint(3, 150))) + "."
+        transcript.append(InterviewTurn(speaker=speaker, text=text, timestamp=timestamp))
+        timestamp += rng.choice([0.2, 4.5, 17.0, 42.25, 95.0, 420.0])
+    return transcript
+
+def record_all(session_id: str, transcript):
+    for index, turn in enumerate(transcript):
+        evaluation_service.record_turn(session_id, turn, index)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("first_speaker", ["AI", "Candidate"])
+async def test_accumulator_matches_full_analysis(first_speaker):
+    transcript = make_transcript(40, first_speaker)
+    record_all("s1", transcript)
+
+    accumulator = evaluation_service.accumulators.get("s1")
+    keywords = evaluation_service.get_role_keywords(config.EVALUATION_ROLE)
+    expected = evaluation_service.extract_features(evaluation_service._to_tuples(transcript), keywords)
+    assert accumulator.features.speaking_seconds == pytest.approx(expected.speaking_seconds)
+    accumulator.features.speaking_seconds = expected.speaking_seconds # Summation order differs
+    assert accumulator.features == expected
+
+    assert evaluation_service.finalize_session("s1", len(transcript)) == await evaluation_service.analyze_transcript(transcript, "s1")
+
+def test_accumulator_without_answers_scores_zero():
+    record_all("s1", [turn for turn in make_transcript(40) if turn.speaker == "AI"])
+    metrics = evaluation_service.finalize_session("s1", 20)
+    assert metrics.overall_score == 0.0
+
+def test_session_started_elsewhere_is_not_finalized():
+    transcript = make_transcript(40)
+    for index, turn in enumerate(transcript[2:], start=2): # This worker joined after the first two turns
+        evaluation_service.record_turn("s1", turn, index)
+    assert "s1" not in evaluation_service.accumulators
+    assert evaluation_service.finalize_session("s1", len(transcript)) is None
+
+def test_missed_turn_is_not_finalized():
+    transcript = make_transcript(40)
+    record_all("s1", transcript[:10])
+    for index, turn in enumerate(transcript[11:], start=11): # Turn 10 was handled by another worker
+        evaluation_service.record_turn("s1", turn, index)
+    assert evaluation_service.finalize_session("s1", len(transcript)) is None
+
+def test_turns_added_after_the_last_recorded_one_are_not_finalized():
+    transcript = make_transcript(40)
+    record_all("s1", transcript[:39])
+    assert evaluation_service.finalize_session("s1", 40) is None # The last turn was added by another worker
+    assert evaluation_service.finalize_session("s1", 39) is not None
@@ -0,0 +1,136 @@
+from contextlib import aclosing
+import asyncio
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from backend.app import config
+from backend.app.services import llm_service
+from backend.app.services.llm_providers import GeminiLLMProvider, LLMProviderError, LLMRequest
+from backend.tools import mock_gemini_server
+
+QUESTION = "What are your strengths?"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(scope="module")
+def mock_gemini_url():
+    server = uvicorn.Server(uvicorn.Config(mock_gemini_server.app, host="127.0.0.1", port=0, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/v1beta"
+    server.should_exit = True
+    thread.join()
+
+@pytest.fixture
+def mock_gemini(mock_gemini_url, monkeypatch):
+    monkeypatch.setattr(config, "LLM_RETRY_BASE_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(config, "LLM_RETRY_MAX_DELAY_SECONDS", 0.02)
+    monkeypatch.setitem(mock_gemini_server.settings, "first_token_ms", 0.0)
+    monkeypatch.setitem(mock_gemini_server.settings, "token_ms", 5.0)
+    mock_gemini_server.script.clear()
+    mock_gemini_server.stats.update(requests=0, failures=0, in_flight=0, max_in_flight=0)
+    yield mock_gemini_server
+    mock_gemini_server.script.clear()
+
+@pytest.fixture
+async def provider(mock_gemini_url):
+    gemini = GeminiLLMProvider(api_key="test", base_url=mock_gemini_url, max_concurrency=1, max_retries=2)
+    yield gemini
+    await gemini.close()
+
+def make_request() -> LLMRequest:
+    return LLMRequest(system_instruction=f"Ask exactly this next question: \"{QUESTION}\"",
+                      messages=[{"role": "user", "content": "I build APIs."}], session_id="s1")
+
+async def collect(provider: GeminiLLMProvider) -> str:
+    return "".join([chunk async for chunk in provider.stream(make_request())])
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("statuses", [[429], [503], [429, 503]])
+async def test_retryable_statuses_are_retried_until_success(provider, mock_gemini, statuses):
+    mock_gemini.script.extend(statuses)
+    assert (await collect(provider)).endswith(QUESTION)
+    assert mock_gemini.stats["requests"] == len(statuses) + 1
+    assert provider.stats() == {"requests": 1, "retries": len(statuses), "failures": 0, "in_flight": 0, "waiting": 0}
+
+@pytest.mark.anyio
+async def test_retries_are_bounded(provider, mock_gemini):
+    mock_gemini.script.extend([503, 503, 503, 503])
+    with pytest.raises(LLMProviderError, match="after 3 attempt"):
+        await collect(provider)
+    assert mock_gemini.stats["requests"] == 3
+    assert provider.failures == 1 and provider.in_flight == 0
+
+@pytest.mark.anyio
+async def test_client_error_fails_fast(provider, mock_gemini):
+    mock_gemini.script.append(400)
+    with pytest.raises(LLMProviderError, match="HTTP 400"):
+        await collect(provider)
+    assert mock_gemini.stats["requests"] == 1
+    assert provider.retries == 0 and provider.failures == 1 and provider.in_flight == 0
+
+@pytest.mark.anyio
+async def test_disconnect_after_first_token_is_not_retried(provider, mock_gemini):
+    mock_gemini.script.append(mock_gemini.DISCONNECT)
+    received = []
+    with pytest.raises(LLMProviderError):
+        async for chunk in provider.stream(make_request()):
+            received.append(chunk)
+    assert received == ["Thank "] # A retry would have repeated it
+    assert mock_gemini.stats["requests"] == 1
+    assert provider.retries == 0 and provider.failures == 1 and provider.in_flight == 0
+
+@pytest.mark.anyio
+async def test_consumer_stopping_early_frees_the_slot(provider, mock_gemini, monkeypatch):
+    monkeypatch.setattr(llm_service, "provider", provider)
+    await llm_service.reset_interview_state("s1")
+    (await llm_service.get_interview_state("s1")).next_question()
+
+    reply = llm_service.generate_interview_response("I build APIs.", [{"role": "AI", "content": "Hello."}], "s1")
+    assert await reply.__anext__()
+    assert provider.stats()["in_flight"] == 1
+
+    # Another request waits for the only slot, then gives up
+    waiter = asyncio.create_task(collect(provider))
+    await asyncio.sleep(0.05)
+    assert provider.stats()["waiting"] == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert provider.stats()["waiting"] == 0
+
+    await reply.aclose() # The consumer stops after the first chunk (e.g. barge-in)
+    assert provider.stats()["in_flight"] == 0
+    assert (await collect(provider)).endswith(QUESTION) # The slot is free again
+
+@pytest.mark.anyio
+async def test_cancelled_consumer_frees_the_slot(provider, mock_gemini, monkeypatch):
+    monkeypatch.setattr(llm_service, "provider", provider)
+    await llm_service.reset_interview_state("s1")
+    (await llm_service.get_interview_state("s1")).next_question()
+    started = asyncio.Event()
+
+    async def consume():
+        # Like the WebSocket pipeline: cancelled between chunks, while waiting on something else
+        reply = llm_service.generate_interview_response("I build APIs.", [{"role": "AI", "content": "Hello."}], "s1")
+        async with aclosing(reply):
+            async for _ in reply:
+                started.set()
+                await asyncio.Event().wait()
+
+    consumer = asyncio.create_task(consume())
+    await started.wait()
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    assert provider.stats()["in_flight"] == 0
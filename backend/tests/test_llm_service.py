@@ -0,0 +1,125 @@
+import pytest
+
+from backend.app.services import llm_service, session_service
+from backend.app.services.session_store import InMemorySessionStore
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def fresh_store(monkeypatch):
+    monkeypatch.setattr(session_service, "store", InMemorySessionStore())
+    monkeypatch.setattr(session_service.archive_service, "get_archive", lambda: None)
+
+
+@pytest.mark.anyio
+async def test_evicted_state_is_rebuilt_from_transcript():
+    questions = llm_service.interview_questions
+    await session_service.initialize_session("s1")
+    await session_service.add_to_transcript("s1", "AI", llm_service.GREETING + questions[0])
+    await session_service.add_to_transcript("s1", "Candidate", "I'm a backend engineer.")
+    await session_service.add_to_transcript("s1", "AI", f"Thanks. Now, {questions[1]}")
+
+    llm_service.interview_states.pop("s1") # Evicted by the TTL/LRU bounds between turns
+    state = await llm_service.get_interview_state("s1")
+    assert state.question_index == 2
+    assert state.asked_questions == {0, 1}
+    assert llm_service.interview_states.get("s1") is state
+
+@pytest.mark.anyio
+async def test_unknown_session_gets_fresh_state():
+    state = await llm_service.get_interview_state("new")
+    assert state.question_index == 0 and not state.asked_questions
+
+
+@pytest.fixture
+def zero_latency(monkeypatch):
+    monkeypatch.setattr(llm_service.simulation, "profile", llm_service.simulation.ZeroProfile(seed=5))
+
+async def start_interview(session_id: str) -> str:
+    await llm_service.reset_interview_state(session_id)
+    greeting = "".join([chunk async for chunk in llm_service.generate_interview_response("", [], session_id)])
+    await session_service.initialize_session(session_id)
+    await session_service.add_to_transcript(session_id, "AI", greeting)
+    return greeting
+
+async def reply(session_id: str, answer: str, prediction=None) -> str:
+    history = [{"role": "AI", "content": "..."}]
+    return "".join([chunk async for chunk in llm_service.generate_interview_response(answer, history, session_id, prediction)])
+
+@pytest.mark.anyio
+async def test_prediction_is_used_when_it_asks_the_next_question(zero_latency):
+    await start_interview("s1")
+    prediction = await llm_service.predict_next_response("s1")
+    assert prediction.question_index == 1
+
+    text = await reply("s1", "I build APIs.", prediction)
+    assert prediction.used
+    assert text == prediction.text
+    assert text.endswith(llm_service.interview_questions[1])
+    assert (await llm_service.get_interview_state("s1")).question_index == 2
+
+@pytest.mark.anyio
+async def test_prediction_for_another_question_is_discarded(zero_latency):
+    await start_interview("s1")
+    prediction = await llm_service.predict_next_response("s1")
+    (await llm_service.get_interview_state("s1")).next_question() # The interview moved on meanwhile
+
+    text = await reply("s1", "I build APIs.", prediction)
+    assert not prediction.used
+    assert text.endswith(llm_service.interview_questions[2])
+    assert text != prediction.text
+    prediction.cancel()
+
+@pytest.mark.anyio
+async def test_prediction_wording_does_not_depend_on_other_sessions(zero_latency):
+    await start_interview("s1")
+    prediction = await llm_service.predict_next_response("s1")
+    prediction.cancel()
+
+    llm_service.simulation.profile = llm_service.simulation.ZeroProfile(seed=5)
+    await start_interview("s1")
+    await start_interview("s2")
+    for _ in range(5): # Another session speculating meanwhile
+        (await llm_service.predict_next_response("s2")).cancel()
+    again = await llm_service.predict_next_response("s1")
+    again.cancel()
+    assert again.text == prediction.text
+
+
+def long_turn(index: int) -> str:
+    return f"Turn {index} starts with its gist. " + "Then it goes on with a lot more detail about the project. " * 6
+
+def test_history_stays_within_its_token_budget():
+    history = llm_service.ConversationHistory(token_budget=300, min_turns=2, summary_token_budget=50)
+    for index in range(40):
+        history.append("AI" if index % 2 == 0 else "user", long_turn(index))
+        assert history.window_tokens <= history.token_budget or len(history.messages()) - 1 == history.min_turns
+        assert len(history.rolling_summary) <= history.summary_token_budget * 4 + len("...")
+
+    summary, *window = history.messages()
+    assert summary["role"] == "system"
+    assert [message["content"] for message in window] == [long_turn(i) for i in range(40 - len(window), 40)]
+    assert summary["content"].endswith(f"Interviewer: Turn {39 - len(window)} starts with its gist.") # The newest folded turn
+    assert "Turn 0 " not in summary["content"] # The oldest context was dropped from the summary
+    assert history.token_estimate <= history.token_budget + history.summary_token_budget + 1
+
+@pytest.mark.anyio
+async def test_evicted_state_rebuilds_the_same_prompt_history():
+    await session_service.initialize_session("s1")
+
+    async def prompt_history():
+        # As respond_to_candidate does: only the turns added since the last prompt are passed in
+        seen_turns = (await llm_service.get_interview_state("s1")).history.turns_seen
+        return await llm_service.get_prompt_history("s1", await session_service.get_transcript_since("s1", seen_turns))
+
+    for index in range(30):
+        await session_service.add_to_transcript("s1", "AI" if index % 2 == 0 else "Candidate", long_turn(index))
+        messages = await prompt_history()
+    assert messages[0]["role"] == "system" # Long enough for the oldest turns to be summarized
+
+    llm_service.interview_states.pop("s1")
+    assert await prompt_history() == messages
+    assert (await llm_service.get_interview_state("s1")).history.turns_seen == 30
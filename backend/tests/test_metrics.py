@@ -0,0 +1,102 @@
+import math
+import re
+from typing import Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import config, main
+from backend.app.services import metrics_service, session_service, simulation
+from backend.app.services.session_store import InMemorySessionStore
+
+_SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$")
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="([^"]*)"')
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def parse_metrics(text: str) -> Tuple[Dict[str, str], List[Sample]]:
+    """Parses the Prometheus text exposition format, failing on any malformed line."""
+    assert text.endswith("\n")
+    types: Dict[str, str] = {}
+    samples: List[Sample] = []
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            assert len(line.split(" ", 3)) == 4, line
+        elif line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            assert metric_type in ("counter", "gauge", "histogram"), line
+            assert name not in types, f"{name} declared twice"
+            types[name] = metric_type
+        else:
+            match = _SAMPLE.match(line)
+            assert match, f"Malformed line: {line!r}"
+            name, labels, value = match.groups()
+            family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in types else name
+            assert family in types, f"{name} has no TYPE line before it"
+            parsed_labels = dict(_LABEL.findall(labels or ""))
+            assert ",".join(f'{k}="{v}"' for k, v in parsed_labels.items()) == (labels or ""), line
+            samples.append((name, parsed_labels, float(value)))
+    return types, samples
+
+def sample_value(samples: List[Sample], name: str, **labels: str) -> float:
+    values = [value for sample_name, sample_labels, value in samples if sample_name == name and sample_labels == labels]
+    assert len(values) == 1, f"{name}{labels}: {values}"
+    return values[0]
+
+def scrape(client: TestClient) -> Tuple[Dict[str, str], List[Sample]]:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return parse_metrics(response.text)
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(session_service, "store", InMemorySessionStore())
+    monkeypatch.setattr(session_service.archive_service, "get_archive", lambda: None)
+    monkeypatch.setattr(simulation, "profile", simulation.ZeroProfile(seed=5))
+    monkeypatch.setattr(config, "TTS_WARMUP_ENABLED", False)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_stage_histograms_are_cumulative(client):
+    metrics_service.observe_stage("ws_send", 0.003)
+    metrics_service.observe_stage("ws_send", 0.3)
+    metrics_service.observe_stage("ws_send", 60.0) # Beyond the last bucket
+    types, samples = scrape(client)
+    assert types["vocahire_stage_latency_seconds"] == "histogram"
+
+    for stage in metrics_service.STAGES:
+        buckets = [(labels["le"], value) for name, labels, value in samples
+                   if name == "vocahire_stage_latency_seconds_bucket" and labels["stage"] == stage]
+        bounds = [float(le) for le, _ in buckets]
+        counts = [count for _, count in buckets]
+        assert bounds == sorted(bounds) and math.isinf(bounds[-1])
+        assert bounds[:-1] == list(metrics_service.LATENCY_BUCKETS)
+        assert counts == sorted(counts) # Cumulative
+        assert counts[-1] == sample_value(samples, "vocahire_stage_latency_seconds_count", stage=stage)
+
+    histogram = metrics_service.stage_latency["ws_send"]
+    assert sample_value(samples, "vocahire_stage_latency_seconds_bucket", stage="ws_send", le="0.005") == histogram.cumulative_counts()[1]
+    assert sample_value(samples, "vocahire_stage_latency_seconds_sum", stage="ws_send") == pytest.approx(histogram.sum)
+    below_last_bucket = sample_value(samples, "vocahire_stage_latency_seconds_bucket", stage="ws_send", le="10.0")
+    assert sample_value(samples, "vocahire_stage_latency_seconds_count", stage="ws_send") == below_last_bucket + 1
+
+def test_session_gauges_are_removed_when_the_session_ends(client):
+    with client.websocket_connect("/ws/interview/metrics-test") as websocket:
+        while not (websocket.receive().get("text") or "").startswith("AI_ zegt:"): # Greeting audio, then its text
+            pass
+        websocket.send_bytes(b"\x00" * 3200)
+        types, samples = scrape(client)
+        assert types["vocahire_active_sessions"] == "gauge"
+        assert sample_value(samples, "vocahire_active_sessions") == 1
+        assert sample_value(samples, "vocahire_stage_latency_seconds_count", stage="turn_first_audio") >= 1
+        websocket.send_text("END_INTERVIEW")
+
+    types, samples = scrape(client)
+    assert sample_value(samples, "vocahire_active_sessions") == 0
+    assert sample_value(samples, "vocahire_ingest_buffered_bytes") == 0
+    assert "metrics-test" not in metrics_service.ingest_buffered_bytes
+    assert "metrics-test" not in metrics_service.ingest_report()
+    assert sample_value(samples, "vocahire_ws_messages_total", protocol="legacy", direction="in") >= 2
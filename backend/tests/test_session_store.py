@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from backend.app.models.interview_models import EvaluationMetrics, InterviewTurn
+from backend.app.services import session_service
+from backend.app.services.session_store import InMemorySessionStore, RedisSessionStore
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return InMemorySessionStore()
+    return RedisSessionStore(client=fakeredis.FakeAsyncRedis(), key_prefix="test:")
+
+def make_evaluation() -> EvaluationMetrics:
+    return EvaluationMetrics(clarity=0.8, confidence=0.9, relevance=0.7, depth=0.6,
+                             keyword_match_score=0.5, answer_length_score=0.9, overall_score=0.75)
+
+
+@pytest.mark.anyio
+async def test_create_session_only_once(store):
+    assert await store.create_session("s1", 100.0)
+    assert not await store.create_session("s1", 200.0)
+    metadata = await store.get_metadata("s1")
+    assert metadata["start_time"] == 100.0
+    assert metadata["status"] == "active"
+    assert metadata["evaluation"] is None and metadata["summary"] is None
+
+@pytest.mark.anyio
+async def test_concurrent_create_session_has_one_winner(store):
+    created = await asyncio.gather(*(store.create_session("s1", float(i)) for i in range(10)))
+    assert created.count(True) == 1
+    assert (await store.get_metadata("s1"))["status"] == "active"
+
+@pytest.mark.anyio
+async def test_transcript_is_append_only(store):
+    await store.create_session("s1", 0.0)
+    turns = [InterviewTurn(speaker="AI" if i % 2 == 0 else "Candidate", text=f"turn {i}", timestamp=float(i)) for i in range(5)]
+    lengths = [await store.append_turn("s1", turn) for turn in turns]
+    assert lengths == [1, 2, 3, 4, 5]
+    assert await store.turn_count("s1") == 5
+    assert await store.get_turns("s1") == turns
+    assert await store.get_turns("s1", 3) == turns[3:]
+
+@pytest.mark.anyio
+async def test_update_metadata_round_trips_fields(store):
+    await store.create_session("s1", 0.0)
+    evaluation = make_evaluation()
+    await store.update_metadata("s1", status="ended_pending_summary", evaluation=evaluation, last_active_at=12.5, disconnected_at=None)
+    metadata = await store.get_metadata("s1")
+    assert metadata["status"] == "ended_pending_summary"
+    assert metadata["evaluation"] == evaluation
+    assert metadata["last_active_at"] == 12.5
+    assert metadata["disconnected_at"] is None
+
+@pytest.mark.anyio
+async def test_update_metadata_does_not_recreate_deleted_session(store):
+    await store.create_session("s1", 0.0)
+    await store.append_turn("s1", InterviewTurn(speaker="AI", text="Hello", timestamp=0.0))
+    await store.delete_session("s1")
+    await store.update_metadata("s1", status="summarized")
+    assert not await store.session_exists("s1")
+    assert await store.get_metadata("s1") is None
+    assert await store.turn_count("s1") == 0
+
+@pytest.mark.anyio
+async def test_list_session_ids(store):
+    for session_id in ("a", "b", "c"):
+        await store.create_session(session_id, 0.0)
+    await store.delete_session("b")
+    assert sorted(await store.list_session_ids()) == ["a", "c"]
+
+
+@pytest.fixture
+def redis_session_service(monkeypatch):
+    monkeypatch.setattr(session_service, "store", RedisSessionStore(client=fakeredis.FakeAsyncRedis(), key_prefix="test:"))
+    monkeypatch.setattr(session_service.archive_service, "get_archive", lambda: None)
+    return session_service
+
+@pytest.mark.anyio
+async def test_session_service_through_redis_store(redis_session_service):
+    service = redis_session_service
+    await service.initialize_session("s1")
+    await service.add_to_transcript("s1", "AI", "Tell me about yourself.")
+    await service.add_to_transcript("s1", "Candidate", "I build backend services in Python.")
+    assert [turn.text for turn in await service.get_transcript("s1")] == ["Tell me about yourself.", "I build backend services in Python."]
+
+    evaluation = make_evaluation()
+    await service.store_evaluation("s1", evaluation)
+    assert await service.get_evaluation("s1") == evaluation
+
+    summary = await service.generate_session_summary("s1")
+    assert summary.evaluation == evaluation
+    stored = await service.get_session_summary_from_store("s1")
+    assert stored == summary
+    assert (await service.get_session_data("s1"))["status"] == "summarized"
+
+@pytest.mark.anyio
+async def test_add_to_transcript_ignores_unknown_session(redis_session_service):
+    await redis_session_service.add_to_transcript("missing", "AI", "Hello")
+    assert await redis_session_service.get_transcript("missing") == []
+
+@pytest.mark.anyio
+async def test_summary_reevaluates_when_transcript_moved_on(redis_session_service):
+    service = redis_session_service
+    await service.initialize_session("s1")
+    await service.add_to_transcript("s1", "AI", "Tell me about yourself.")
+    await service.add_to_transcript("s1", "Candidate", "Um, well.")
+    stale = await service.evaluate_session("s1")
+
+    await service.add_to_transcript("s1", "AI", "What are your strengths?")
+    await service.add_to_transcript("s1", "Candidate", "I design reliable distributed systems and mentor engineers on testing and observability.")
+    summary = await service.generate_session_summary("s1")
+    assert len(summary.full_transcript) == 4
+    assert summary.evaluation != stale
+    assert summary.evaluation == await service.get_evaluation("s1")
+    assert (await service.get_session_data("s1"))["evaluation_turns"] == 4
@@ -0,0 +1,37 @@
+import pytest
+
+from backend.app.services import simulation
+from backend.app.services.simulation import RealisticProfile
+
+SESSIONS = ["s1", "s2", "s3"]
+DRAWS = [("stt_chunk", 1), ("llm_first_token", 1), ("llm_token", 3), ("tts_word", 5)] * 4
+
+
+def run(profile: RealisticProfile, order: list) -> dict:
+    """Draws every session's delays and acknowledgements, interleaving the sessions in `order`."""
+    drawn = {session_id: [] for session_id in SESSIONS}
+    for session_id in order:
+        for operation, units in DRAWS:
+            drawn[session_id].append(profile.delay(operation, units, session_id))
+        drawn[session_id].append(profile.choice(["Okay.", "Got it.", "Thanks."], "acknowledgement", session_id))
+    return drawn
+
+
+def test_seeded_runs_are_reproducible_whatever_the_interleaving():
+    first = run(RealisticProfile(seed=7), SESSIONS * 3)
+    second = run(RealisticProfile(seed=7), list(reversed(SESSIONS)) * 3)
+    assert first == second
+    assert first["s1"] != first["s2"] # Sessions don't share a stream
+
+def test_streams_depend_on_the_seed():
+    assert run(RealisticProfile(seed=7), SESSIONS) != run(RealisticProfile(seed=8), SESSIONS)
+
+def test_delays_stay_within_the_operation_distribution():
+    profile = RealisticProfile(seed=1, time_scale=1.0)
+    fixed, jitter = simulation.OPERATIONS["llm_first_token"]
+    for session_id in SESSIONS:
+        assert fixed <= profile.delay("llm_first_token", session_id=session_id) <= fixed + jitter
+
+@pytest.mark.parametrize("seed", [None, 3])
+def test_zero_profile_never_waits(seed):
+    assert simulation.ZeroProfile(seed=seed).delay("tts_word", 10, "s1") == 0.0
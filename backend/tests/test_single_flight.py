@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from backend.app.services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_concurrent_callers_share_one_run():
+    flights: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    callers = [asyncio.create_task(flights.run("k", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert "k" in flights and len(flights) == 1
+    release.set()
+    assert await asyncio.gather(*callers) == [42] * 5
+    assert calls == 1
+    assert "k" not in flights
+
+@pytest.mark.anyio
+async def test_cancelling_the_starting_caller_does_not_cancel_the_work():
+    flights: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 7
+
+    leader = asyncio.create_task(flights.run("k", work))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.run("k", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+    release.set()
+    assert await follower == 7
+
+@pytest.mark.anyio
+async def test_exception_reaches_every_caller_and_is_not_remembered():
+    flights: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("boom")
+
+    callers = [asyncio.create_task(flights.run("k", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def succeeding():
+        return 1
+
+    assert await flights.run("k", succeeding) == 1
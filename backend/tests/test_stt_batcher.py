@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import List, Optional
+
+import pytest
+
+from backend.app.services.stt_batcher import MicroBatcher
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+class RecordingModel:
+    """Stands in for the STT model: records every batch it is given and echoes the inputs back."""
+
+    def __init__(self, error: Optional[Exception] = None):
+        self.batches: List[List[str]] = []
+        self.error = error
+
+    async def __call__(self, items: List[str]) -> List[str]:
+        self.batches.append(list(items))
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return [f"text of {item}" for item in items]
+
+@pytest.fixture
+async def make_batcher():
+    batchers = []
+
+    def make(model: RecordingModel, **kwargs) -> MicroBatcher:
+        batchers.append(MicroBatcher(model, **kwargs))
+        return batchers[-1]
+
+    yield make
+    for batcher in batchers:
+        await batcher.close()
+
+
+@pytest.mark.anyio
+async def test_full_batch_runs_without_waiting_for_the_window(make_batcher):
+    model = RecordingModel()
+    batcher = make_batcher(model, max_batch_size=3, max_wait_ms=10_000)
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(f"a{i}") for i in range(3))), timeout=1)
+    assert results == ["text of a0", "text of a1", "text of a2"]
+    assert model.batches == [["a0", "a1", "a2"]]
+
+@pytest.mark.anyio
+async def test_requests_are_split_into_batches_of_the_maximum_size(make_batcher):
+    model = RecordingModel()
+    batcher = make_batcher(model, max_batch_size=3, max_wait_ms=20)
+    results = await asyncio.gather(*(batcher.submit(f"a{i}") for i in range(7)))
+    assert results == [f"text of a{i}" for i in range(7)]
+    assert [len(batch) for batch in model.batches] == [3, 3, 1]
+    assert batcher.stats() == {"batches": 3, "items": 7, "mean_batch_size": 2.33, "largest_batch": 3, "queued": 0}
+
+@pytest.mark.anyio
+async def test_partial_batch_runs_when_the_window_closes(make_batcher):
+    model = RecordingModel()
+    batcher = make_batcher(model, max_batch_size=10, max_wait_ms=50)
+    started = time.perf_counter()
+    first = asyncio.create_task(batcher.submit("a0"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(batcher.submit("a1")) # Joins the batch while its window is open
+    assert await asyncio.gather(first, second) == ["text of a0", "text of a1"]
+    assert time.perf_counter() - started >= 0.045
+    assert model.batches == [["a0", "a1"]]
+
+@pytest.mark.anyio
+async def test_batch_error_reaches_every_waiter(make_batcher):
+    model = RecordingModel(error=RuntimeError("model crashed"))
+    batcher = make_batcher(model, max_batch_size=3, max_wait_ms=20)
+    results = await asyncio.gather(*(batcher.submit(f"a{i}") for i in range(3)), return_exceptions=True)
+    assert [str(result) for result in results] == ["model crashed"] * 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    model.error = None # The dispatcher survives the failed batch
+    assert await batcher.submit("b0") == "text of b0"
+
+@pytest.mark.anyio
+async def test_cancelled_request_is_not_run(make_batcher):
+    model = RecordingModel()
+    batcher = make_batcher(model, max_batch_size=10, max_wait_ms=30)
+    cancelled = asyncio.create_task(batcher.submit("a0"))
+    kept = asyncio.create_task(batcher.submit("a1"))
+    await asyncio.sleep(0)
+    cancelled.cancel() # The turn ended before its batch ran
+    assert await kept == "text of a1"
+    assert model.batches == [["a1"]]
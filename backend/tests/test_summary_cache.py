@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import config, main
+from backend.app.models.interview_models import EvaluationMetrics, SessionSummary
+from backend.app.services import session_service, simulation
+from backend.app.services.session_store import InMemorySessionStore
+from backend.app.services.summary_cache import SummaryCache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+def make_summary() -> SessionSummary:
+    evaluation = EvaluationMetrics(clarity=0.7, confidence=0.7, relevance=0.7, depth=0.7,
+                                   keyword_match_score=0.7, answer_length_score=0.7, overall_score=0.7)
+    return SessionSummary(session_id="s1", full_transcript=[], evaluation=evaluation,
+                          duration_seconds=60.0, started_at=0.0, ended_at=60.0)
+
+
+@pytest.mark.anyio
+async def test_cancelled_leader_does_not_cancel_followers():
+    cache = SummaryCache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return make_summary()
+
+    leader = asyncio.create_task(cache.get_or_compute("s1", 2, compute))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_compute("s1", 2, compute))
+    await asyncio.sleep(0)
+
+    leader.cancel() # The client that triggered the summary disconnects
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+    release.set()
+    entry = await follower
+    assert entry is not None and entry.summary.session_id == "s1"
+    assert calls == 1
+    assert cache.get("s1", 2) is entry
+    assert cache.hits == 1 and cache.misses == 1
+
+@pytest.mark.anyio
+async def test_failure_reaches_every_caller_and_is_not_cached():
+    cache = SummaryCache()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        raise RuntimeError("model unavailable")
+
+    callers = [asyncio.create_task(cache.get_or_compute("s1", 2, compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("s1", 2) is None
+
+    async def recovered():
+        return make_summary()
+
+    assert await cache.get_or_compute("s1", 2, recovered) is not None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(session_service, "store", InMemorySessionStore())
+    monkeypatch.setattr(session_service.archive_service, "get_archive", lambda: None)
+    monkeypatch.setattr(simulation, "profile", simulation.ZeroProfile(seed=5))
+    monkeypatch.setattr(config, "TTS_WARMUP_ENABLED", False)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+def test_summary_endpoints_serve_the_documented_schema(client):
+    with client.websocket_connect("/ws/interview/summary-test") as websocket:
+        while not (websocket.receive().get("text") or "").startswith("AI_ zegt:"):
+            pass
+        websocket.send_text("END_INTERVIEW")
+
+    generated = client.post("/api/interview/summary", json={"session_id": "summary-test"})
+    retrieved = client.get("/api/interview/summary-test/summary")
+    assert generated.status_code == retrieved.status_code == 200
+    assert SessionSummary.model_validate_json(generated.content) == SessionSummary.model_validate_json(retrieved.content)
+    assert client.get("/api/interview/unknown/summary").status_code == 404
+
+    paths = client.get("/openapi.json").json()["paths"]
+    for path, method in (("/api/interview/summary", "post"), ("/api/interview/{session_id}/summary", "get")):
+        schema = paths[path][method]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema == {"$ref": "#/components/schemas/SessionSummary"}
@@ -0,0 +1,68 @@
+import pytest
+
+from backend.app.services.text_segmenter import TextSegmenter, segment_text
+
+
+def feed_words(text: str, segmenter: TextSegmenter) -> list:
+    """Feeds `text` the way the LLM streams it (word by word) and returns every segment, flushed included."""
+    segments = []
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        segments += segmenter.feed(word + (" " if i < len(words) - 1 else ""))
+    remaining = segmenter.flush()
+    return segments + ([remaining] if remaining else [])
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I worked with Dr. Smith on it. Then I left.", ["I worked with Dr. Smith on it.", "Then I left."]),
+    ("Mostly backend work, e.g. APIs and queues. It was fun.", ["Mostly backend work, e.g. APIs and queues.", "It was fun."]),
+    ("My favourite author is J. R. R. Tolkien. Why?", ["My favourite author is J. R. R. Tolkien.", "Why?"]),
+    ("We used Python, Go, etc. That was it.", ["We used Python, Go, etc.", "That was it."]),
+])
+def test_abbreviations_do_not_end_sentences(text, expected):
+    assert segment_text(text) == expected
+    assert feed_words(text, TextSegmenter()) == expected
+
+def test_decimals_do_not_end_sentences():
+    text = "I have 3.5 years of experience. It grew by 2.75 percent."
+    assert segment_text(text) == ["I have 3.5 years of experience.", "It grew by 2.75 percent."]
+    segmenter = TextSegmenter()
+    assert segmenter.feed("I have 3.") == [] # The rest of the number hasn't arrived yet
+    assert segmenter.feed("5 years. ") == ["I have 3.5 years."]
+
+def test_sentence_closes_only_once_whitespace_follows():
+    segmenter = TextSegmenter()
+    assert segmenter.feed("Is that right?") == []
+    assert segmenter.feed("\" She") == ["Is that right?\""]
+    assert segmenter.flush() == "She"
+
+def test_text_without_final_punctuation_is_returned_by_flush():
+    segmenter = TextSegmenter()
+    assert segmenter.feed("Tell me about yourself") == []
+    assert segmenter.flush() == "Tell me about yourself"
+    assert segment_text("Great. Tell me about yourself") == ["Great.", "Tell me about yourself"]
+
+def test_flush_at_end_of_stream():
+    segmenter = TextSegmenter()
+    assert segmenter.feed("Thanks. Now, what ") == ["Thanks."]
+    assert segmenter.feed("are your strengths?") == []
+    assert segmenter.flush() == "Now, what are your strengths?"
+    assert segmenter.flush() is None # Nothing left after a flush
+    assert TextSegmenter().flush() is None
+    segmenter.feed("  \n")
+    assert segmenter.flush() is None
+
+def test_long_sentences_are_cut_at_clauses_then_hard_cut():
+    segmenter = TextSegmenter(min_clause_chars=20, max_chars=40)
+    assert segmenter.feed("Short, not cut yet ") == []
+    assert segmenter.feed("because it keeps going, and going ") == ["Short, not cut yet because it keeps going,"]
+    words = "word " * 20
+    segmenter = TextSegmenter(min_clause_chars=20, max_chars=40)
+    segments = segmenter.feed(words)
+    assert segments and all(len(segment) <= 40 for segment in segments)
+    assert " ".join(segments + [segmenter.flush()]).split() == words.split()
+
+def test_streaming_matches_segment_text():
+    text = ("Thank you for sharing that, it sounds like a demanding project. Dr. Lee mentioned 1.5 million users! "
+            "How did you handle the load... and what would you change? Take your time")
+    assert feed_words(text, TextSegmenter()) == segment_text(text)
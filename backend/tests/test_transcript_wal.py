@@ -0,0 +1,85 @@
+import pytest
+
+from backend.app.services import archive_service, session_service, transcript_wal
+from backend.app.services.session_store import InMemorySessionStore
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def worker(monkeypatch, tmp_path):
+    """A worker with its own store and log (a new one per call, as after a restart), sharing the archive."""
+    archive = archive_service.SessionArchive(str(tmp_path / "archive.sqlite3"))
+    monkeypatch.setattr(archive_service, "get_archive", lambda: archive)
+    wals = []
+
+    def start_worker() -> transcript_wal.TranscriptWAL:
+        monkeypatch.setattr(session_service, "store", InMemorySessionStore())
+        wal = transcript_wal.TranscriptWAL(directory=str(tmp_path / "wal"))
+        wal.start(live_sessions=session_service.list_session_ids)
+        monkeypatch.setattr(transcript_wal, "_wal", wal)
+        wals.append(wal)
+        return wal
+
+    yield start_worker
+    archive.close()
+    for wal in wals:
+        if wal._file is not None:
+            wal._file.close()
+
+async def run_first_worker(start_worker) -> transcript_wal.TranscriptWAL:
+    wal = start_worker()
+    for session_id in ("live", "ended", "evicted", "archived"):
+        await session_service.initialize_session(session_id)
+        await session_service.add_to_transcript(session_id, "AI", "Tell me about yourself.")
+        await session_service.add_to_transcript(session_id, "Candidate", "I build backend services.")
+    for session_id in ("ended", "evicted", "archived"):
+        await session_service.end_session(session_id)
+    # Archived and evicted by the lifecycle task
+    session_data, transcript = await session_service.snapshot_session("evicted")
+    archive_service.get_archive().archive("evicted", session_data, transcript)
+    assert await session_service.evict_session("evicted", session_data["last_active_at"])
+    # Archived, but the worker died before its eviction record reached the log
+    session_data, transcript = await session_service.snapshot_session("archived")
+    archive_service.get_archive().archive("archived", session_data, transcript)
+    await wal.flush()
+    return wal
+
+async def check_recovery(start_worker):
+    start_worker()
+    recovered = await session_service.recover_sessions_from_wal()
+    assert sorted(recovered) == ["ended", "live"]
+    live = await session_service.store.get_metadata("live")
+    assert live["status"] == "active"
+    assert live["disconnected_at"] is not None # Ended by the lifecycle task after the resume window
+    assert (await session_service.store.get_metadata("ended"))["status"] == "ended_pending_summary"
+    assert len(await session_service.store.get_turns("live")) == 2
+    assert not await session_service.store.session_exists("evicted")
+    assert not await session_service.store.session_exists("archived")
+
+
+@pytest.mark.anyio
+async def test_replay_after_crash(worker):
+    wal = await run_first_worker(worker)
+    # Crash: the lock goes with the process, nothing is compacted
+    wal._task.cancel()
+    wal._file.close()
+    wal._file = None
+    await check_recovery(worker)
+
+@pytest.mark.anyio
+async def test_replay_after_clean_stop(worker):
+    wal = await run_first_worker(worker)
+    await wal.stop()
+    with open(wal.path, encoding="utf-8") as f:
+        assert '"evicted"' not in f.read() # Compacted out on stop
+    await check_recovery(worker)
+
+@pytest.mark.anyio
+async def test_logs_of_running_workers_are_skipped(worker, tmp_path):
+    running = await run_first_worker(worker)
+    sessions, paths = transcript_wal.read_orphaned_logs(str(tmp_path / "wal"), own_path=None)
+    assert sessions == {} and paths == []
+    await running.stop()
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from backend.app.services.tts_cache import TTSCache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_cancelled_first_request_still_fills_the_cache(tmp_path):
+    cache = TTSCache(max_entries=8, cache_dir=str(tmp_path), audio_format="mp3")
+    release = asyncio.Event()
+    calls = 0
+
+    async def synthesize():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return b"audio"
+
+    leader = asyncio.create_task(cache.get_or_synthesize("Hello there.", synthesize))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_synthesize("Hello  there.", synthesize))
+    await asyncio.sleep(0)
+    leader.cancel() # Barge-in cancels the turn that started the synthesis
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+    release.set()
+    assert await follower == b"audio"
+    assert calls == 1
+    assert len(list(tmp_path.glob("*.mp3"))) == 1
+    assert await cache.get_or_synthesize("Hello there.", synthesize) == b"audio"
+    assert cache.stats() == {"memory_entries": 1, "memory_hits": 2, "disk_hits": 0, "misses": 1}
+
+@pytest.mark.anyio
+async def test_disk_tier_is_shared_between_caches(tmp_path):
+    async def synthesize():
+        return b"audio"
+
+    await TTSCache(cache_dir=str(tmp_path), audio_format="mp3").get_or_synthesize("Hi.", synthesize)
+
+    async def unexpected():
+        raise AssertionError("should be served from disk")
+
+    other_worker = TTSCache(cache_dir=str(tmp_path), audio_format="mp3")
+    assert await other_worker.get_or_synthesize("Hi.", unexpected) == b"audio"
+    assert other_worker.disk_hits == 1
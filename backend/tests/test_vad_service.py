@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from backend.app.services.vad_service import END_OF_TURN, SPEECH_END, SPEECH_START, VoiceActivityDetector
+
+RATE = 16000
+
+
+def tone(seconds: float, dbfs: float = -10.0, frequency: float = 220.0) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return 10 ** (dbfs / 20) * np.sqrt(2) * np.sin(2 * np.pi * frequency * t) # RMS of `dbfs`
+
+def noise(seconds: float, dbfs: float) -> np.ndarray:
+    return np.random.default_rng(0).normal(0.0, 10 ** (dbfs / 20), int(RATE * seconds))
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(RATE * seconds))
+
+def pcm(*parts: np.ndarray) -> bytes:
+    return (np.clip(np.concatenate(parts), -1, 1) * 32767).astype("<i2").tobytes()
+
+def make_detector(**overrides) -> VoiceActivityDetector:
+    settings = dict(sample_rate=RATE, frame_ms=20, energy_threshold_db=-45.0, noise_margin_db=10.0,
+                    max_zero_crossing_rate=0.35, min_speech_ms=60, hangover_ms=400, end_of_turn_ms=1500)
+    settings.update(overrides)
+    return VoiceActivityDetector(**settings)
+
+def events(detector: VoiceActivityDetector, audio: bytes, chunk_bytes: int = 3200) -> list:
+    found = []
+    for offset in range(0, len(audio), chunk_bytes):
+        found += [(event.kind, round(event.stream_time, 2)) for event in detector.process(audio[offset:offset + chunk_bytes]).events]
+    return found
+
+
+def test_silence_has_no_speech():
+    detector = make_detector()
+    result = detector.process(pcm(silence(3.0)))
+    assert result.events == [] and result.speech_frames == 0 and not result.contains_speech
+    assert not detector.turn_ended # No utterance, so silence alone never ends the turn
+
+def test_tone_starts_an_utterance():
+    detector = make_detector()
+    result = detector.process(pcm(silence(0.3), tone(1.0)))
+    assert [(event.kind, round(event.stream_time, 2)) for event in result.events] == [(SPEECH_START, 0.3)]
+    assert result.in_speech and result.speech_frames == 50
+
+def test_tone_then_long_silence_ends_utterance_and_turn():
+    detector = make_detector()
+    assert events(detector, pcm(silence(0.3), tone(1.0), silence(2.5))) == [
+        (SPEECH_START, 0.3),
+        (SPEECH_END, 1.3), # Reported at the end of the speech, once the 400 ms hangover has passed
+        (END_OF_TURN, 3.2), # After the hangover and 1500 ms of further silence
+    ]
+    assert detector.turn_ended
+
+def test_silence_shorter_than_end_of_turn_keeps_the_turn_open():
+    detector = make_detector()
+    assert events(detector, pcm(tone(1.0), silence(1.5))) == [(SPEECH_START, 0.0), (SPEECH_END, 1.0)]
+    assert not detector.turn_ended
+
+def test_pause_shorter_than_hangover_does_not_split_the_utterance():
+    detector = make_detector()
+    assert events(detector, pcm(tone(0.5), silence(0.3), tone(0.5), silence(0.5))) == [(SPEECH_START, 0.0), (SPEECH_END, 1.3)]
+
+def test_pause_longer_than_hangover_splits_the_utterance():
+    detector = make_detector()
+    assert events(detector, pcm(tone(0.5), silence(0.5), tone(0.5), silence(0.5))) == [
+        (SPEECH_START, 0.0), (SPEECH_END, 0.5), (SPEECH_START, 1.0), (SPEECH_END, 1.5)]
+
+def test_bursts_shorter_than_min_speech_are_ignored():
+    detector = make_detector()
+    assert events(detector, pcm(silence(0.2), tone(0.04), silence(2.5))) == [] # A click: 2 frames < 3
+
+@pytest.mark.parametrize("dbfs, is_speech", [(-60.0, False), (-40.0, True), (-20.0, True)])
+def test_energy_threshold(dbfs, is_speech):
+    assert make_detector().process(pcm(tone(0.5, dbfs=dbfs))).in_speech is is_speech
+
+@pytest.mark.parametrize("dbfs, is_speech", [
+    (-40.0, False), # Loud enough, but the zero-crossing rate says noise
+    (-20.0, True), # So loud it counts as speech anyway (e.g. a fricative)
+])
+def test_zero_crossing_rate_rejects_noise_unless_very_loud(dbfs, is_speech):
+    assert make_detector().process(pcm(noise(0.5, dbfs))).in_speech is is_speech
+
+def test_threshold_adapts_to_the_noise_floor():
+    detector = make_detector()
+    detector.process(pcm(noise(1.0, -40.0))) # Steady background noise, judged non-speech
+    # A tone as loud as the background no longer counts as speech
+    assert not detector.process(pcm(tone(0.5, dbfs=-40.0))).in_speech
+    assert detector.process(pcm(tone(0.5, dbfs=-10.0))).in_speech
+
+def test_chunking_does_not_change_the_events():
+    audio = pcm(silence(0.3), tone(1.0), silence(2.5))
+    expected = events(make_detector(), audio, chunk_bytes=len(audio))
+    assert events(make_detector(), audio, chunk_bytes=1234) == expected # Frames straddle chunks
+
+def test_end_of_turn_is_reported_once_per_turn():
+    detector = make_detector()
+    assert [kind for kind, _ in events(detector, pcm(tone(0.5), silence(4.0)))].count(END_OF_TURN) == 1
+    detector.reset_turn()
+    assert not detector.turn_ended
+    assert [kind for kind, _ in events(detector, pcm(tone(0.5), silence(2.5)))] == [SPEECH_START, SPEECH_END, END_OF_TURN]
+
+def test_end_of_turn_can_be_disabled():
+    detector = make_detector(end_of_turn_ms=0)
+    assert [kind for kind, _ in events(detector, pcm(tone(0.5), silence(4.0)))] == [SPEECH_START, SPEECH_END]
@@ -0,0 +1,30 @@
+import pytest
+
+from backend.app.services import ws_protocol
+from backend.app.services.ws_protocol import FRAME_AUDIO, FRAME_CONTROL, FramedChannel, InterviewChannel, ProtocolError, pack_frame
+
+
+def parse(payload: bytes, frame_type: int = FRAME_CONTROL):
+    channel = FramedChannel(websocket=None, session_id="s1")
+    return channel._parse({"bytes": pack_frame(frame_type, 3, 7, payload)})
+
+
+def test_interview_channel_is_abstract():
+    with pytest.raises(TypeError):
+        InterviewChannel(websocket=None, session_id="s1")
+
+def test_control_frame():
+    message = parse(b'{"type":"end_of_stream"}')
+    assert message.control == ws_protocol.END_OF_STREAM
+    assert (message.turn, message.sequence) == (3, 7)
+
+def test_audio_frame():
+    assert parse(b"\x01\x02", FRAME_AUDIO).audio == b"\x01\x02"
+
+def test_unknown_control_type_is_ignored():
+    assert parse(b'{"type":"ping"}') is None
+
+@pytest.mark.parametrize("payload", [b"[1, 2]", b'"end_of_stream"', b"42", b"null", b"{not json"])
+def test_malformed_control_payload_is_a_protocol_error(payload):
+    with pytest.raises(ProtocolError):
+        parse(payload)
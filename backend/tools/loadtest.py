@@ -0,0 +1,360 @@
+"""
+End-to-end load test for the interview WebSocket.
+
+Opens N concurrent interview sessions against /ws/interview/{session_id}. Each client waits
+for the greeting, then for every turn streams candidate audio at real-time pace (synthetic
+speech, or a 16 kHz mono 16-bit WAV), sends END_OF_STREAM and times the AI's reply. After the
+last turn it ends the interview and requests /api/interview/summary. Prints p50/p95/p99 per
+metric and optionally writes a JSON report to diff between builds.
+
+Against the built-in simulated STT/LLM/TTS, with a server started for the run:
+
+    python -m backend.tools.loadtest --spawn-server --clients 20 --turns 3 --output loadtest.json
+
+Against a running server:
+
+    python -m backend.tools.loadtest --url http://127.0.0.1:8000 --clients 50 --ramp-up 10
+
+Latencies are measured from the moment the candidate's turn ends (END_OF_STREAM sent, or
+END_OF_TURN_DETECTED received if the server's VAD ended it first):
+    transcript_ms   until the final transcript of the answer (Candidate_says)
+    first_audio_ms  until the first audio byte of the AI reply
+    turn_ms         until the AI reply is complete (AI_says, sent after its audio)
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 100
+
+# Text messages of the legacy protocol, mapped to the event names of the framed protocol
+LEGACY_EVENTS = {
+    "AI_ zegt: ": "ai_greeting",
+    "AI_says: ": "ai_response",
+    "STT_part: ": "stt_partial",
+    "Candidate_says: ": "candidate_text",
+    "END_OF_TURN_DETECTED": "end_of_turn_detected",
+    "INTERVIEW_ENDED_BY_AI": "interview_ended",
+}
+
+
+def synthetic_answer(speech_seconds: float, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Voiced, syllable-modulated audio the VAD treats as speech, framed by short silences."""
+    t = np.arange(int(sample_rate * speech_seconds)) / sample_rate
+    voice = sum(np.sin(2 * np.pi * 140 * harmonic * t) / harmonic for harmonic in (1, 2, 3, 4))
+    syllables = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t) # ~4 syllables per second
+    speech = (0.25 * 32767 * voice / 2.1 * syllables).astype("<i2")
+    lead, tail = np.zeros(int(sample_rate * 0.3), dtype="<i2"), np.zeros(int(sample_rate * 0.5), dtype="<i2")
+    return np.concatenate([lead, speech, tail]).tobytes()
+
+def load_wav(path: str) -> bytes:
+    with wave.open(path) as reader:
+        if (reader.getframerate(), reader.getnchannels(), reader.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+            raise SystemExit(f"{path}: expected {SAMPLE_RATE} Hz mono 16-bit PCM")
+        return reader.readframes(reader.getnframes())
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        # Nearest-rank percentile
+        return ordered[min(len(ordered) - 1, max(0, int(np.ceil(q * len(ordered))) - 1))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 1),
+        "p50": round(rank(0.50), 1),
+        "p95": round(rank(0.95), 1),
+        "p99": round(rank(0.99), 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+@dataclass
+class ClientResult:
+    session_id: str
+    greeting_first_audio_ms: Optional[float] = None
+    greeting_ms: Optional[float] = None
+    turns: List[Dict[str, float]] = field(default_factory=list)
+    summary_ms: Optional[float] = None
+    summary_status: Optional[int] = None
+    audio_bytes_sent: int = 0
+    audio_bytes_received: int = 0
+    interview_ended: bool = False
+    error: Optional[str] = None
+
+
+class InterviewClient:
+    """One simulated candidate: speaks each answer at real-time pace and records when replies arrive."""
+
+    def __init__(self, base_url: str, session_id: str, protocol: str, answer: bytes, timeout: float):
+        self.ws_url = base_url.replace("http", "ws", 1) + f"/ws/interview/{session_id}"
+        self.result = ClientResult(session_id)
+        self.protocol = protocol
+        self.answer = answer
+        self.timeout = timeout
+        self._events: "asyncio.Queue[tuple]" = asyncio.Queue() # (kind, received_at, text)
+        self._sequence = 0
+
+    async def _receive(self, websocket):
+        from backend.app.services import ws_protocol
+        async for message in websocket:
+            received_at = time.perf_counter()
+            if self.protocol == "framed":
+                frame_type, _, _, payload = ws_protocol.unpack_frame(message)
+                if frame_type == ws_protocol.FRAME_AUDIO:
+                    self.result.audio_bytes_received += len(payload)
+                    await self._events.put(("audio", received_at, None))
+                else:
+                    event = json.loads(payload)
+                    await self._events.put((event["type"], received_at, event.get("text")))
+            elif isinstance(message, bytes):
+                self.result.audio_bytes_received += len(message)
+                await self._events.put(("audio", received_at, None))
+            else:
+                for prefix, kind in LEGACY_EVENTS.items():
+                    if message.startswith(prefix):
+                        await self._events.put((kind, received_at, message[len(prefix):]))
+                        break
+        await self._events.put(("closed", time.perf_counter(), None))
+
+    async def _next_event(self) -> tuple:
+        return await asyncio.wait_for(self._events.get(), timeout=self.timeout)
+
+    async def _send_audio(self, websocket, chunk: bytes):
+        if self.protocol == "framed":
+            from backend.app.services import ws_protocol
+            chunk = ws_protocol.pack_frame(ws_protocol.FRAME_AUDIO, 0, self._sequence, chunk)
+            self._sequence += 1
+        await websocket.send(chunk)
+
+    async def _send_control(self, websocket, control: str):
+        if self.protocol == "framed":
+            from backend.app.services import ws_protocol
+            payload = json.dumps({"type": control.lower()}).encode("utf-8")
+            await websocket.send(ws_protocol.pack_frame(ws_protocol.FRAME_CONTROL, 0, self._sequence, payload))
+            self._sequence += 1
+        else:
+            await websocket.send(control)
+
+    async def _speak(self, websocket) -> float:
+        """Streams the answer at real-time pace; returns when the turn ended (see module docstring)."""
+        chunk_bytes = SAMPLE_RATE * 2 * CHUNK_MS // 1000
+        started_at = time.perf_counter()
+        for index, offset in enumerate(range(0, len(self.answer), chunk_bytes)):
+            # Scheduled against the start time, so pacing doesn't drift with send latency
+            delay = started_at + index * CHUNK_MS / 1000 - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._send_audio(websocket, self.answer[offset:offset + chunk_bytes])
+            self.result.audio_bytes_sent += len(self.answer[offset:offset + chunk_bytes])
+        await self._send_control(websocket, "END_OF_STREAM")
+        return time.perf_counter()
+
+    async def _wait_for_reply(self, turn_ended_at: float) -> Dict[str, float]:
+        turn: Dict[str, float] = {}
+        while True:
+            kind, received_at, text = await self._next_event()
+            if kind == "end_of_turn_detected":
+                turn_ended_at = min(turn_ended_at, received_at)
+            elif kind == "candidate_text":
+                turn["transcript_ms"] = (received_at - turn_ended_at) * 1000
+            elif kind == "audio" and "first_audio_ms" not in turn and "transcript_ms" in turn:
+                turn["first_audio_ms"] = (received_at - turn_ended_at) * 1000
+            elif kind == "ai_response":
+                turn["turn_ms"] = (received_at - turn_ended_at) * 1000
+                return turn
+            elif kind == "interview_ended":
+                self.result.interview_ended = True
+            elif kind == "closed":
+                raise ConnectionError("Server closed the connection during the turn")
+
+    async def run(self, turns: int):
+        import websockets
+
+        subprotocols = ["vocahire.v1"] if self.protocol == "framed" else None
+        connected_at = time.perf_counter()
+        async with websockets.connect(self.ws_url, subprotocols=subprotocols, max_size=None) as websocket:
+            receiver = asyncio.create_task(self._receive(websocket))
+            try:
+                while True:
+                    kind, received_at, _ = await self._next_event()
+                    if kind == "audio" and self.result.greeting_first_audio_ms is None:
+                        self.result.greeting_first_audio_ms = (received_at - connected_at) * 1000
+                    if kind == "ai_greeting":
+                        self.result.greeting_ms = (received_at - connected_at) * 1000
+                        break
+                for _ in range(turns):
+                    turn_ended_at = await self._speak(websocket)
+                    self.result.turns.append(await self._wait_for_reply(turn_ended_at))
+                    # The server ends the interview after its closing line
+                    try:
+                        kind, _, _ = await asyncio.wait_for(self._events.get(), timeout=0.05)
+                        if kind == "interview_ended":
+                            self.result.interview_ended = True
+                            break
+                    except asyncio.TimeoutError:
+                        pass
+                if not self.result.interview_ended:
+                    await self._send_control(websocket, "END_INTERVIEW")
+            finally:
+                receiver.cancel()
+
+
+def post_summary(base_url: str, session_id: str, timeout: float) -> int:
+    request = urllib.request.Request(f"{base_url}/api/interview/summary", method="POST",
+                                     data=json.dumps({"session_id": session_id}).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+async def run_client(args: argparse.Namespace, index: int, answer: bytes) -> ClientResult:
+    await asyncio.sleep(args.ramp_up * index / max(1, args.clients))
+    client = InterviewClient(args.url, f"{args.session_prefix}-{index}", args.protocol, answer, args.timeout)
+    try:
+        await client.run(args.turns)
+        await asyncio.sleep(0.2) # Let the server record the end of the session
+        started_at = time.perf_counter()
+        client.result.summary_status = await asyncio.to_thread(post_summary, args.url, client.result.session_id, args.timeout)
+        client.result.summary_ms = (time.perf_counter() - started_at) * 1000
+    except Exception as e:
+        client.result.error = f"{type(e).__name__}: {e}"
+    return client.result
+
+
+def build_report(args: argparse.Namespace, results: List[ClientResult], wall_seconds: float) -> dict:
+    turns = [turn for result in results for turn in result.turns]
+    completed = [result for result in results if result.error is None]
+
+    def collect(key: str) -> List[float]:
+        return [turn[key] for turn in turns if key in turn]
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "build": {"git_commit": commit, "python": platform.python_version(), "host": platform.node()},
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "spawn_server")},
+        "totals": {
+            "clients": len(results),
+            "clients_completed": len(completed),
+            "clients_failed": len(results) - len(completed),
+            "turns": len(turns),
+            "wall_seconds": round(wall_seconds, 2),
+            "turns_per_second": round(len(turns) / wall_seconds, 3) if wall_seconds else None,
+            "audio_sent_bytes_per_second": round(sum(r.audio_bytes_sent for r in results) / wall_seconds) if wall_seconds else None,
+            "audio_received_bytes_per_second": round(sum(r.audio_bytes_received for r in results) / wall_seconds) if wall_seconds else None,
+            "summary_errors": sum(1 for r in completed if r.summary_status != 200),
+        },
+        "latency_ms": {
+            "greeting_first_audio": percentiles([r.greeting_first_audio_ms for r in results if r.greeting_first_audio_ms is not None]),
+            "transcript": percentiles(collect("transcript_ms")),
+            "first_audio": percentiles(collect("first_audio_ms")),
+            "turn": percentiles(collect("turn_ms")),
+            "summary": percentiles([r.summary_ms for r in completed if r.summary_ms is not None]),
+        },
+        "errors": sorted({r.error for r in results if r.error}),
+        "clients": [asdict(r) for r in results] if args.include_clients else None,
+    }
+
+def print_report(report: dict):
+    totals = report["totals"]
+    print(f"\nClients: {totals['clients_completed']}/{totals['clients']} completed, {totals['turns']} turns "
+          f"in {totals['wall_seconds']} s ({totals['turns_per_second']} turns/s), summary errors: {totals['summary_errors']}")
+    print(f"{'latency (ms)':<22}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, stats in report["latency_ms"].items():
+        cells = [stats[key] if stats[key] is not None else "-" for key in ("mean", "p50", "p95", "p99", "max")]
+        print(f"{name:<22}{stats['count']:>7}" + "".join(f"{cell:>10}" for cell in cells))
+    for error in report["errors"]:
+        print(f"error: {error}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def spawn_server() -> tuple:
+    """Starts the backend with uvicorn on a free local port; returns (process, base URL)."""
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+                               env={**os.environ, "VOCAHIRE_LOG_LEVEL": os.environ.get("VOCAHIRE_LOG_LEVEL", "WARNING")})
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=1).read()
+            return process, base_url
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit("The backend exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("The backend didn't start within 30 s")
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    answer = load_wav(args.audio) if args.audio else synthetic_answer(args.speech_seconds)
+    started_at = time.perf_counter()
+    results = await asyncio.gather(*(run_client(args, index, answer) for index in range(args.clients)))
+    return build_report(args, list(results), time.perf_counter() - started_at)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Backend base URL")
+    parser.add_argument("--spawn-server", action="store_true", help="Start a local backend (simulated STT/LLM/TTS by default) for the run")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent interview sessions")
+    parser.add_argument("--turns", type=int, default=3, help="Candidate answers per session")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds over which clients are started")
+    parser.add_argument("--protocol", choices=("legacy", "framed"), default="legacy")
+    parser.add_argument("--audio", help="16 kHz mono 16-bit WAV to use as every answer (default: synthetic speech)")
+    parser.add_argument("--speech-seconds", type=float, default=2.0, help="Length of the synthetic answer's speech")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for any single server event")
+    parser.add_argument("--session-prefix", default=f"load-{uuid.uuid4().hex[:8]}")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--include-clients", action="store_true", help="Include per-client results in the JSON report")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server, args.url = spawn_server()
+    try:
+        report = asyncio.run(main_async(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    if report["totals"]["clients_failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Local stand-in for the Gemini streamGenerateContent API, for testing the gemini LLM provider
+without an API key or network access.
+
+Run it and point the backend at it:
+
+    python -m backend.tools.mock_gemini_server --port 8001 --first-token-ms 300 --failure-rate 0.1
+    VOCAHIRE_LLM_PROVIDER=gemini VOCAHIRE_GEMINI_API_KEY=test \\
+        VOCAHIRE_GEMINI_BASE_URL=http://127.0.0.1:8001/v1beta uvicorn backend.app.main:app
+
+Responses acknowledge the answer and ask the question named in the system instruction, streamed
+word by word as server-sent events. A share of requests fails with HTTP 503 (--failure-rate) to
+exercise retries; --script answers the first requests with the given outcomes instead (an HTTP
+status, or "disconnect" to drop the connection after the first word), e.g. --script 429,503.
+GET /stats reports request counts and the highest concurrency seen.
+"""
+from typing import List, Optional, Union
+import argparse
+import asyncio
+import json
+import random
+import re
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Mock Gemini API")
+
+settings = {
+    "first_token_ms": 300.0, # Delay before the first chunk
+    "token_ms": 30.0, # Delay between chunks
+    "failure_rate": 0.0, # Share of requests answered with HTTP 503
+}
+# Outcomes of the next requests, consumed in order: an HTTP status to fail with, or DISCONNECT
+script: List[Union[int, str]] = []
+DISCONNECT = "disconnect"
+stats = {"requests": 0, "failures": 0, "in_flight": 0, "max_in_flight": 0}
+_random = random.Random()
+
+
+def _next_question(body: dict) -> Optional[str]:
+    parts = (body.get("systemInstruction") or {}).get("parts") or []
+    instruction = " ".join(part.get("text", "") for part in parts)
+    match = re.search(r'next question: "(.+?)"', instruction)
+    return match.group(1) if match else None
+
+def _event(text: str) -> str:
+    chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}]}
+    return f"data: {json.dumps(chunk)}\r\n\r\n"
+
+
+@app.post("/v1beta/models/{model_action}")
+async def stream_generate_content(model_action: str, request: Request):
+    model, _, action = model_action.partition(":")
+    if action != "streamGenerateContent":
+        raise HTTPException(status_code=404, detail=f"Unsupported action: {action}")
+    if not request.headers.get("x-goog-api-key"):
+        raise HTTPException(status_code=403, detail="Missing API key")
+    body = await request.json()
+    stats["requests"] += 1
+    outcome = script.pop(0) if script else None
+    if isinstance(outcome, int):
+        stats["failures"] += 1
+        raise HTTPException(status_code=outcome, detail=f"Scripted failure {outcome}")
+    if outcome is None and _random.random() < settings["failure_rate"]:
+        stats["failures"] += 1
+        raise HTTPException(status_code=503, detail="The model is overloaded (simulated)")
+
+    question = _next_question(body) or "Could you tell me more about that?"
+    words = f"Thank you, that's helpful. {question}".split()
+
+    async def events():
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(settings["first_token_ms"] / 1000)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(settings["token_ms"] / 1000)
+                yield _event(word + (" " if i < len(words) - 1 else ""))
+                if outcome == DISCONNECT:
+                    stats["failures"] += 1
+                    # Raising mid-body makes the server drop the connection without finishing the response
+                    raise ConnectionResetError("Scripted disconnect")
+        finally:
+            stats["in_flight"] -= 1
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--first-token-ms", type=float, default=settings["first_token_ms"])
+    parser.add_argument("--token-ms", type=float, default=settings["token_ms"])
+    parser.add_argument("--failure-rate", type=float, default=settings["failure_rate"])
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the failure injection")
+    parser.add_argument("--script", default="", help="Comma-separated outcomes of the first requests (e.g. 429,503,disconnect)")
+    args = parser.parse_args()
+    settings.update(first_token_ms=args.first_token_ms, token_ms=args.token_ms, failure_rate=args.failure_rate)
+    script.extend(outcome if outcome == DISCONNECT else int(outcome) for outcome in args.script.split(",") if outcome)
+    _random.seed(args.seed)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()